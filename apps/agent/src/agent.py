@@ -1,86 +1,134 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import os
-import shutil
-import subprocess
 import sys
-import urllib.error
+import time
 import urllib.parse
-import urllib.request
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
-from typing import Any, AsyncIterator
+from typing import Any, AsyncIterable, AsyncIterator
 
-from dotenv import load_dotenv
-from livekit import agents, rtc
-from livekit.agents import (
+from agent_config import run_cli_preflight
+
+if __name__ == "__main__":
+    # `doctor` exits here, and missing secrets are loaded into os.environ,
+    # before the settings below are read and before LiveKit, the model plugins
+    # and httpx are imported.
+    run_cli_preflight(sys.argv)
+
+import httpx  # noqa: E402
+from livekit import agents, rtc  # noqa: E402
+from livekit.agents import (  # noqa: E402
     Agent,
     AgentSession,
     JobContext,
+    JobProcess,
+    ModelSettings,
     RunContext,
     function_tool,
     inference,
+    telemetry,
 )
-from livekit.plugins import cartesia, openai
-
-from agent_web_search import (
+from livekit.plugins import cartesia, openai  # noqa: E402
+
+from agent_config import (  # noqa: E402
+    AGENT_NAME,
+    AGENT_PROVIDER,
+    LLM_MODEL,
+    OPENAI_LLM_MODEL,
+    OPENAI_STT_MODEL,
+    OPENAI_TTS_MODEL,
+    OPENAI_TTS_VOICE,
+    SESSION_RECORD_AUDIO_ENV,
+    SESSION_RECORD_LOGS_ENV,
+    SESSION_RECORD_TRACES_ENV,
+    SESSION_RECORD_TRANSCRIPT_ENV,
+    SESSION_RECORDING_ENABLED_ENV,
+    STT_LANGUAGE,
+    STT_MODEL,
+    TTS_MODEL,
+    TTS_VOICE_ID,
+    env_bool,
+    validate_agent_provider,
+)
+from agent_web_search import (  # noqa: E402
     LiveKitRpcSearchToolStatusNotifier,
+    SearchCoalescer,
     SearchToolStatusNotifier,
+    ToolStatusSender,
+    create_tool_status_sender,
+    get_shared_search_coalescer,
     run_web_search_tool,
 )
-from web_search import (
+from greeting_cache import (  # noqa: E402
+    GreetingAudioCache,
+    GreetingRecorder,
+    create_greeting_cache,
+    greeting_cache_key,
+)
+from persona_cache import (  # noqa: E402
+    PersonaCacheLookup,
+    PersonaConfigCache,
+    PersonaFetchResult,
+)
+from session_metrics import (  # noqa: E402
+    STAGE_RESPONSE,
+    STAGE_TOOL,
+    LogSampler,
+    TurnMetrics,
+    create_metrics_dumper,
+    get_shared_turn_metrics,
+    load_log_sample_rate,
+)
+from startup_trace import StartupTrace  # noqa: E402
+from tts_pool import TtsEnginePool, TtsSwitchLatency  # noqa: E402
+from voice_tracing import (  # noqa: E402
+    TurnSpanRecorder,
+    configure_tracing,
+    flush_tracing,
+    tracer,
+)
+from web_search import (  # noqa: E402
+    SearchCostBudget,
+    SharedHttpClientPool,
     WebSearchSettings,
-    create_default_http_client,
     create_search_provider,
+    get_shared_http_client_pool,
     load_web_search_settings,
 )
-from web_search_constants import (
-    DEFAULT_WEB_SEARCH_MAX_RESULTS,
-    DEFAULT_WEB_SEARCH_PROVIDER,
-    DEFAULT_WEB_SEARCH_TIMEOUT_SECONDS,
-    PROVIDER_SECRET_NAMES,
-    WEB_SEARCH_MAX_RESULTS_ENV,
-    WEB_SEARCH_PROVIDER_ENV,
-    WEB_SEARCH_TIMEOUT_SECONDS_ENV,
+from web_search_cache import (  # noqa: E402
+    SearchResultCache,
+    close_shared_search_cache,
+    get_shared_search_cache,
+)
+from web_search_constants import DEFAULT_WEB_SEARCH_WARM_UP_TIMEOUT_SECONDS  # noqa: E402
+from web_search_health import get_shared_provider_health  # noqa: E402
+from web_search_prefetch import (  # noqa: E402
+    SearchPrefetcher,
+    create_search_prefetcher,
 )
-
-load_dotenv()
 
 logger = logging.getLogger("portfolio_agent")
 
-INFISICAL_PROJECT_ID = os.getenv("INFISICAL_PROJECT_ID")
-INFISICAL_ENV = os.getenv("INFISICAL_ENV", "dev")
-INFISICAL_BOOTSTRAPPED = "LIVEKIT_AGENT_INFISICAL_BOOTSTRAPPED"
-BASE_REQUIRED_ENV_VARS = (
-    "LIVEKIT_URL",
-    "LIVEKIT_API_KEY",
-    "LIVEKIT_API_SECRET",
-)
-
-AGENT_NAME = os.getenv("LIVEKIT_AGENT_NAME", "dennis-portfolio-agent")
-VALID_AGENT_PROVIDERS = ("openai", "livekit")
-AGENT_PROVIDER = "openai"
-STT_MODEL = os.getenv("LIVEKIT_AGENT_STT_MODEL", "deepgram/nova-3")
-STT_LANGUAGE = os.getenv("LIVEKIT_AGENT_STT_LANGUAGE", "en")
-LLM_MODEL = os.getenv("LIVEKIT_AGENT_LLM_MODEL", "google/gemini-2.5-flash-lite")
-TTS_MODEL = os.getenv("LIVEKIT_AGENT_TTS_MODEL", "cartesia/sonic-3.5")
-TTS_VOICE_ID = os.getenv("LIVEKIT_AGENT_TTS_VOICE_ID")
-OPENAI_STT_MODEL = os.getenv("OPENAI_AGENT_STT_MODEL", "whisper-1")
-OPENAI_LLM_MODEL = os.getenv("OPENAI_AGENT_LLM_MODEL", "gpt-4o-mini")
-OPENAI_TTS_MODEL = os.getenv("OPENAI_AGENT_TTS_MODEL", "tts-1")
-OPENAI_TTS_VOICE = os.getenv("OPENAI_AGENT_TTS_VOICE", "alloy")
 CARTESIA_API_KEY = os.getenv("CARTESIA_API_KEY")
 PERSONA_BASE_URL = os.getenv("LIVEKIT_AGENT_PERSONA_BASE_URL")
 PERSONA_READ_SECRET = os.getenv("PERSONA_AGENT_READ_SECRET")
 DEFAULT_PERSONA_ID = os.getenv("LIVEKIT_AGENT_DEFAULT_PERSONA_ID", "portfolio-agent")
+PERSONA_CACHE_TTL_SECONDS = float(
+    os.getenv("LIVEKIT_AGENT_PERSONA_CACHE_TTL_SECONDS", "60")
+)
+PERSONA_CACHE_STALE_SECONDS = float(
+    os.getenv("LIVEKIT_AGENT_PERSONA_CACHE_STALE_SECONDS", "30")
+)
 PERSONA_TTS_SWITCH_RPC_METHOD = "persona.switch_tts"
-SESSION_RECORDING_ENABLED_ENV = "LIVEKIT_AGENT_SESSION_RECORDING_ENABLED"
-SESSION_RECORD_AUDIO_ENV = "LIVEKIT_AGENT_RECORD_AUDIO"
-SESSION_RECORD_LOGS_ENV = "LIVEKIT_AGENT_RECORD_LOGS"
-SESSION_RECORD_TRACES_ENV = "LIVEKIT_AGENT_RECORD_TRACES"
-SESSION_RECORD_TRANSCRIPT_ENV = "LIVEKIT_AGENT_RECORD_TRANSCRIPT"
+PERSONA_HTTP_CLIENT_KEY = "persona"
+WORKER_STATE_KEY = "portfolio_agent_worker_state"
+TTS_POOL_SIZE = int(os.getenv("LIVEKIT_AGENT_TTS_POOL_SIZE", "4"))
+TTS_POOL_IDLE_SECONDS = float(os.getenv("LIVEKIT_AGENT_TTS_POOL_IDLE_SECONDS", "300"))
+PERSONA_FETCH_TIMEOUT_SECONDS = 5.0
 
 DEFAULT_INSTRUCTIONS = " ".join(
     [
@@ -148,7 +196,20 @@ def get_job_metadata(ctx: JobContext) -> dict[str, Any]:
     return parsed if isinstance(parsed, dict) else {}
 
 
-def fetch_persona_config(persona_id: str, user_id: str | None) -> PersonaConfig:
+async def fetch_persona_config(
+    persona_id: str,
+    user_id: str | None,
+    http_client: httpx.AsyncClient | None = None,
+) -> PersonaConfig:
+    return (await fetch_persona(persona_id, user_id, http_client=http_client)).persona
+
+
+async def fetch_persona(
+    persona_id: str,
+    user_id: str | None,
+    etag: str | None = None,
+    http_client: httpx.AsyncClient | None = None,
+) -> PersonaFetchResult:
     fallback = default_persona()
 
     if not PERSONA_BASE_URL:
@@ -156,25 +217,55 @@ def fetch_persona_config(persona_id: str, user_id: str | None) -> PersonaConfig:
             raise RuntimeError(
                 "LIVEKIT_AGENT_PERSONA_BASE_URL is required for non-default persona dispatch."
             )
-        return fallback
+        return PersonaFetchResult(fallback, cacheable=False)
 
     base_url = PERSONA_BASE_URL.rstrip("/")
     query = urllib.parse.urlencode({"user_id": user_id or ""})
     url = f"{base_url}/api/personas/{urllib.parse.quote(persona_id)}/agent?{query}"
-    request = urllib.request.Request(url)
+    headers: dict[str, str] = {}
 
     if PERSONA_READ_SECRET:
-        request.add_header("Authorization", f"Bearer {PERSONA_READ_SECRET}")
+        headers["Authorization"] = f"Bearer {PERSONA_READ_SECRET}"
+    if etag:
+        headers["If-None-Match"] = etag
 
+    client = http_client or get_shared_http_client_pool().client(
+        PERSONA_HTTP_CLIENT_KEY
+    )
     try:
-        with urllib.request.urlopen(request, timeout=5) as response:
-            payload = json.loads(response.read().decode("utf-8"))
-    except (OSError, urllib.error.URLError, json.JSONDecodeError) as error:
-        if persona_id != DEFAULT_PERSONA_ID:
-            raise RuntimeError(f"Could not load persona `{persona_id}`. {error}") from error
-        logger.warning("Could not load persona `%s`; using default. %s", persona_id, error)
-        return fallback
+        response = await client.get(
+            url,
+            headers=headers,
+            timeout=PERSONA_FETCH_TIMEOUT_SECONDS,
+        )
+        if response.status_code == 304 and etag:
+            return PersonaFetchResult(None, etag)
+        response.raise_for_status()
+        payload = response.json()
+    except (httpx.HTTPError, json.JSONDecodeError) as error:
+        return _persona_fetch_failed(persona_id, error, fallback)
+
+    persona = persona_config_from_payload(payload, fallback)
+    response_etag = response.headers.get("ETag")
+    return PersonaFetchResult(
+        persona,
+        response_etag,
+        cacheable=persona is not fallback,
+    )
 
+
+def _persona_fetch_failed(
+    persona_id: str,
+    error: Exception,
+    fallback: PersonaConfig,
+) -> PersonaFetchResult:
+    if persona_id != DEFAULT_PERSONA_ID:
+        raise RuntimeError(f"Could not load persona `{persona_id}`. {error}") from error
+    logger.warning("Could not load persona `%s`; using default. %s", persona_id, error)
+    return PersonaFetchResult(fallback, cacheable=False)
+
+
+def persona_config_from_payload(payload: Any, fallback: PersonaConfig) -> PersonaConfig:
     if not isinstance(payload, dict):
         return fallback
 
@@ -212,6 +303,34 @@ def fetch_persona_config(persona_id: str, user_id: str | None) -> PersonaConfig:
     )
 
 
+def persona_may_be_served_stale(persona: PersonaConfig) -> bool:
+    # A cloned voice depends on consent and source rights that can be revoked,
+    # so those personas are revalidated before reuse once past the TTL.
+    return not persona.requires_cartesia_plugin
+
+
+_shared_persona_cache: PersonaConfigCache | None = None
+
+
+def get_shared_persona_cache() -> PersonaConfigCache:
+    global _shared_persona_cache
+    if _shared_persona_cache is None:
+        _shared_persona_cache = PersonaConfigCache(
+            fetch_persona,
+            ttl_seconds=PERSONA_CACHE_TTL_SECONDS,
+            stale_seconds=PERSONA_CACHE_STALE_SECONDS,
+            serve_stale=persona_may_be_served_stale,
+        )
+    return _shared_persona_cache
+
+
+async def get_persona_config(
+    persona_id: str,
+    user_id: str | None,
+) -> PersonaCacheLookup:
+    return await get_shared_persona_cache().get(persona_id, user_id)
+
+
 def cartesia_plugin_model(model: str) -> str:
     return model.removeprefix("cartesia/")
 
@@ -250,12 +369,38 @@ def create_tts(persona: PersonaConfig):
     return inference.TTS(**tts_kwargs)
 
 
-def update_session_tts(session: AgentSession, persona: PersonaConfig) -> None:
+def update_session_tts(
+    session: AgentSession,
+    persona: PersonaConfig,
+    tts_pool: TtsEnginePool | None = None,
+) -> bool:
     # LiveKit reads the session TTS at speech generation time, but the current
     # SDK does not expose a public setter. Keep this helper isolated so it is
     # easy to replace if the SDK adds one.
-    session._tts = create_tts(persona)
+    if tts_pool is None:
+        session._tts = create_tts(persona)
+        session._tts_error_counts = 0
+        return False
+
+    previous_tts = session._tts
+    session._tts, pool_hit = tts_pool.acquire(persona)
     session._tts_error_counts = 0
+    tts_pool.release(previous_tts)
+    return pool_hit
+
+
+_shared_tts_pool: TtsEnginePool | None = None
+
+
+def get_shared_tts_pool() -> TtsEnginePool:
+    global _shared_tts_pool
+    if _shared_tts_pool is None:
+        _shared_tts_pool = TtsEnginePool(
+            create_tts,
+            max_size=TTS_POOL_SIZE,
+            idle_seconds=TTS_POOL_IDLE_SECONDS,
+        )
+    return _shared_tts_pool
 
 
 async def interrupt_active_speech(session: AgentSession) -> None:
@@ -265,7 +410,11 @@ async def interrupt_active_speech(session: AgentSession) -> None:
         logger.debug("Skipping persona TTS switch interrupt before session start.")
 
 
-def create_persona_tts_switch_rpc_handler(session: AgentSession):
+def create_persona_tts_switch_rpc_handler(
+    session: AgentSession,
+    tts_pool: TtsEnginePool | None = None,
+    switch_latency: TtsSwitchLatency | None = None,
+):
     async def switch_persona_tts(data: rtc.RpcInvocationData) -> str:
         try:
             payload = json.loads(data.payload or "{}")
@@ -281,19 +430,24 @@ def create_persona_tts_switch_rpc_handler(session: AgentSession):
         if not isinstance(persona_id, str) or not persona_id.strip():
             raise rtc.RpcError(1400, "Missing persona_id.")
 
-        persona = fetch_persona_config(
-            persona_id,
-            user_id if isinstance(user_id, str) else None,
-        )
-        update_session_tts(session, persona)
+        persona = (
+            await get_persona_config(
+                persona_id,
+                user_id if isinstance(user_id, str) else None,
+            )
+        ).persona
+        pool_hit = update_session_tts(session, persona, tts_pool)
         await interrupt_active_speech(session)
+        if switch_latency is not None:
+            switch_latency.switched(pool_hit)
 
         logger.info(
-            "portfolio_agent_tts_switched persona_id=%s voice_id=%s model=%s caller=%s",
+            "portfolio_agent_tts_switched persona_id=%s voice_id=%s model=%s caller=%s tts_pool_hit=%s",
             persona.id,
             persona.tts_voice_id,
             persona.tts_model,
             data.caller_identity,
+            pool_hit,
         )
 
         return json.dumps(
@@ -308,23 +462,21 @@ def create_persona_tts_switch_rpc_handler(session: AgentSession):
     return switch_persona_tts
 
 
-def validate_agent_provider() -> str | None:
-    if AGENT_PROVIDER in VALID_AGENT_PROVIDERS:
-        return None
-
-    return (
-        f"Unsupported LIVEKIT_AGENT_PROVIDER={AGENT_PROVIDER!r}. "
-        f"Expected one of: {', '.join(VALID_AGENT_PROVIDERS)}."
-    )
+@dataclass(frozen=True)
+class SessionModels:
+    stt: Any
+    llm: Any
+    # None when the TTS voice depends on the persona.
+    tts: Any | None
 
 
-def create_agent_session(persona: PersonaConfig) -> AgentSession:
+def create_session_models() -> SessionModels:
     provider_error = validate_agent_provider()
     if provider_error:
         raise ValueError(provider_error)
 
     if AGENT_PROVIDER == "openai":
-        return AgentSession(
+        return SessionModels(
             stt=openai.STT(
                 model=OPENAI_STT_MODEL,
                 language=STT_LANGUAGE,
@@ -339,7 +491,7 @@ def create_agent_session(persona: PersonaConfig) -> AgentSession:
             ),
         )
 
-    return AgentSession(
+    return SessionModels(
         stt=inference.STT(
             model=STT_MODEL,
             language=STT_LANGUAGE,
@@ -347,17 +499,25 @@ def create_agent_session(persona: PersonaConfig) -> AgentSession:
         llm=inference.LLM(
             model=LLM_MODEL,
         ),
-        tts=create_tts(persona),
+        tts=None,
     )
 
 
-def env_bool(name: str, default: bool) -> bool:
-    value = os.getenv(name)
-
-    if value is None:
-        return default
-
-    return value.strip().lower() not in {"0", "false", "no", "off"}
+def create_agent_session(
+    persona: PersonaConfig,
+    models: SessionModels | None = None,
+    tts_pool: TtsEnginePool | None = None,
+) -> AgentSession:
+    models = models or create_session_models()
+    if models.tts is not None:
+        tts = models.tts
+    elif tts_pool is not None:
+        # Taken from the pool so a switch back to this persona is a hit and the
+        # engine is released with the session.
+        tts, _ = tts_pool.acquire(persona)
+    else:
+        tts = create_tts(persona)
+    return AgentSession(stt=models.stt, llm=models.llm, tts=tts)
 
 
 def session_recording_options() -> bool | dict[str, bool]:
@@ -372,8 +532,18 @@ def session_recording_options() -> bool | dict[str, bool]:
     }
 
 
-def _default_provider_factory(settings: WebSearchSettings, http_client):
-    return create_search_provider(settings, http_client)
+# Ingress, egress and SIP participants cannot register RPC handlers.
+_NON_RPC_PARTICIPANT_KINDS = frozenset(
+    {
+        rtc.ParticipantKind.PARTICIPANT_KIND_INGRESS,
+        rtc.ParticipantKind.PARTICIPANT_KIND_EGRESS,
+        rtc.ParticipantKind.PARTICIPANT_KIND_SIP,
+    }
+)
+
+
+def is_tool_status_destination(participant: object) -> bool:
+    return getattr(participant, "kind", None) not in _NON_RPC_PARTICIPANT_KINDS
 
 
 def _default_notifier_factory() -> SearchToolStatusNotifier:
@@ -389,15 +559,68 @@ class PortfolioAgent(Agent):
         agent_id: str,
         instructions: str,
         search_settings: WebSearchSettings | None = None,
-        provider_factory=_default_provider_factory,
-        http_client_factory=create_default_http_client,
+        provider_factory=None,
+        http_client_pool: SharedHttpClientPool | None = None,
+        search_cache: SearchResultCache | None = None,
+        search_coalescer: SearchCoalescer | None = None,
+        search_prefetcher: SearchPrefetcher | None = None,
+        turn_metrics: TurnMetrics | None = None,
         notifier_factory=_default_notifier_factory,
     ) -> None:
         super().__init__(id=agent_id, instructions=instructions)
         self.search_settings = search_settings or load_web_search_settings(os.environ)
-        self.provider_factory = provider_factory
-        self.http_client_factory = http_client_factory
+        self.search_budget = SearchCostBudget(self.search_settings.session_budget_usd)
+        self.provider_factory = provider_factory or self._create_search_provider
+        self.http_client_pool = http_client_pool or get_shared_http_client_pool()
+        self.search_cache = (
+            search_cache
+            if search_cache is not None
+            else get_shared_search_cache(os.environ)
+        )
+        self.search_coalescer = search_coalescer or get_shared_search_coalescer()
+        self.search_prefetcher = (
+            search_prefetcher
+            if search_prefetcher is not None
+            else create_search_prefetcher(
+                os.environ,
+                self._prefetch_search_provider,
+                max_results=self.search_settings.max_results,
+                timeout_seconds=self.search_settings.timeout_seconds,
+                cache=self.search_cache,
+            )
+        )
+        self.turn_metrics = turn_metrics or get_shared_turn_metrics()
         self.notifier_factory = notifier_factory
+        self.greeting_recorder: GreetingRecorder | None = None
+
+    async def tts_node(
+        self,
+        text: AsyncIterable[str],
+        model_settings: ModelSettings,
+    ) -> AsyncIterator[rtc.AudioFrame]:
+        recorder = self.greeting_recorder
+        async for frame in Agent.default.tts_node(self, text, model_settings):
+            if recorder is not None:
+                recorder.add(frame)
+            yield frame
+
+    def _create_search_provider(
+        self,
+        settings: WebSearchSettings,
+        http_client,
+        budget: SearchCostBudget | None = None,
+    ):
+        return create_search_provider(
+            settings,
+            http_client,
+            budget=budget or self.search_budget,
+            health=get_shared_provider_health(os.environ),
+        )
+
+    def _prefetch_search_provider(self, budget: SearchCostBudget):
+        return self._create_search_provider(
+            self.search_settings, self.http_client_pool, budget=budget
+        )
 
     @function_tool()
     async def search_web(
@@ -426,23 +649,41 @@ class PortfolioAgent(Agent):
             summary,
             _truncate_for_log(query),
         )
-        async with _search_progress_context(context):
-            async with self.http_client_factory() as http_client:
-                return await run_web_search_tool(
-                    summary=summary,
-                    query=query,
-                    provider=self.provider_factory(self.search_settings, http_client),
-                    notifier=self.notifier_factory(),
-                    max_results=self.search_settings.max_results,
-                    timeout_seconds=self.search_settings.timeout_seconds,
-                )
+        started = time.perf_counter()
+        try:
+            with tracer().start_as_current_span(
+                "search_web",
+                attributes={
+                    "web_search.provider": self.search_settings.provider,
+                    "web_search.query_chars": len(query),
+                },
+            ):
+                async with _search_progress_context(context):
+                    return await run_web_search_tool(
+                        summary=summary,
+                        query=query,
+                        provider=self.provider_factory(
+                            self.search_settings, self.http_client_pool
+                        ),
+                        notifier=self.notifier_factory(),
+                        max_results=self.search_settings.max_results,
+                        timeout_seconds=self.search_settings.timeout_seconds,
+                        cache=self.search_cache,
+                        coalescer=self.search_coalescer,
+                        prefetcher=self.search_prefetcher,
+                    )
+        finally:
+            self.turn_metrics.observe(STAGE_TOOL, time.perf_counter() - started)
 
 
 def _truncate_for_log(value: str, max_chars: int = 240) -> str:
-    value = " ".join(value.split())
-    if len(value) <= max_chars:
-        return value
-    return f"{value[: max_chars - 3].rstrip()}..."
+    # Collapse whitespace in a bounded prefix only, so a long transcript is
+    # not split and rejoined in full just to log its first few words.
+    prefix = value[: max_chars * 2]
+    collapsed = " ".join(prefix.split())
+    if len(collapsed) <= max_chars and len(prefix) == len(value):
+        return collapsed
+    return f"{collapsed[: max_chars - 3].rstrip()}..."
 
 
 @asynccontextmanager
@@ -459,155 +700,227 @@ async def _search_progress_context(context: RunContext | None) -> AsyncIterator[
         yield
 
 
-def missing_required_env() -> list[str]:
-    required = list(BASE_REQUIRED_ENV_VARS)
+def start_search_provider_warm_up(
+    ctx: JobContext,
+    settings: WebSearchSettings | None,
+) -> asyncio.Task[None] | None:
+    if settings is None:
+        logger.warning("Skipping web search warm-up: web search is not configured")
+        return None
 
-    if AGENT_PROVIDER == "openai":
-        required.append("OPENAI_API_KEY")
-    else:
-        required.append("LIVEKIT_AGENT_TTS_VOICE_ID")
+    # Same construction as PortfolioAgent, so a failed warm-up trips the same
+    # circuit breaker and warms the same per-provider connection pools.
+    provider = create_search_provider(
+        settings,
+        get_shared_http_client_pool(),
+        health=get_shared_provider_health(os.environ),
+    )
+    task = asyncio.create_task(
+        _warm_up_search_provider(provider),
+        name="web_search_warm_up",
+    )
 
-    return [key for key in required if not os.getenv(key)]
+    async def _cancel_warm_up() -> None:
+        task.cancel()
 
+    ctx.add_shutdown_callback(_cancel_warm_up)
+    return task
 
-def print_env_doctor() -> int:
-    provider_error = validate_agent_provider()
-    missing = missing_required_env()
-    print("LiveKit agent environment")
-    print(f"  INFISICAL_PROJECT_ID: {'set' if INFISICAL_PROJECT_ID else 'missing'}")
-    print(f"  INFISICAL_ENV: {INFISICAL_ENV}")
-    print(f"  LIVEKIT_AGENT_NAME: {AGENT_NAME}")
-    print(f"  LIVEKIT_AGENT_PROVIDER: {AGENT_PROVIDER}")
-    print(f"  LIVEKIT_AGENT_STT_MODEL: {STT_MODEL}")
-    print(f"  LIVEKIT_AGENT_STT_LANGUAGE: {STT_LANGUAGE}")
-    print(f"  LIVEKIT_AGENT_LLM_MODEL: {LLM_MODEL}")
-    print(f"  LIVEKIT_AGENT_TTS_MODEL: {TTS_MODEL}")
-    print(f"  LIVEKIT_AGENT_TTS_VOICE_ID: {'set' if TTS_VOICE_ID else 'missing'}")
-    print(f"  OPENAI_AGENT_STT_MODEL: {OPENAI_STT_MODEL}")
-    print(f"  OPENAI_AGENT_LLM_MODEL: {OPENAI_LLM_MODEL}")
-    print(f"  OPENAI_AGENT_TTS_MODEL: {OPENAI_TTS_MODEL}")
-    print(f"  OPENAI_AGENT_TTS_VOICE: {OPENAI_TTS_VOICE}")
-    print(f"  OPENAI_API_KEY: {'set' if os.getenv('OPENAI_API_KEY') else 'missing'}")
-    print(
-        "  LIVEKIT_AGENT_SESSION_RECORDING_ENABLED: "
-        f"{env_bool(SESSION_RECORDING_ENABLED_ENV, True)}"
-    )
-    print(f"  LIVEKIT_AGENT_RECORD_AUDIO: {env_bool(SESSION_RECORD_AUDIO_ENV, True)}")
-    print(f"  LIVEKIT_AGENT_RECORD_LOGS: {env_bool(SESSION_RECORD_LOGS_ENV, True)}")
-    print(f"  LIVEKIT_AGENT_RECORD_TRACES: {env_bool(SESSION_RECORD_TRACES_ENV, True)}")
-    print(
-        "  LIVEKIT_AGENT_RECORD_TRANSCRIPT: "
-        f"{env_bool(SESSION_RECORD_TRANSCRIPT_ENV, True)}"
-    )
-    print(
-        "  WEB_SEARCH_PROVIDER: "
-        f"{os.getenv(WEB_SEARCH_PROVIDER_ENV, DEFAULT_WEB_SEARCH_PROVIDER)}"
-    )
-    print(
-        "  WEB_SEARCH_MAX_RESULTS: "
-        f"{os.getenv(WEB_SEARCH_MAX_RESULTS_ENV, str(DEFAULT_WEB_SEARCH_MAX_RESULTS))}"
+
+async def _warm_up_search_provider(provider) -> None:
+    started = time.perf_counter()
+    warmed = await provider.warm_up(
+        timeout_seconds=DEFAULT_WEB_SEARCH_WARM_UP_TIMEOUT_SECONDS,
     )
-    print(
-        "  WEB_SEARCH_TIMEOUT_SECONDS: "
-        f"{os.getenv(
-            WEB_SEARCH_TIMEOUT_SECONDS_ENV,
-            str(int(DEFAULT_WEB_SEARCH_TIMEOUT_SECONDS)),
-        )}"
+    logger.info(
+        "web_search_warm_up provider=%s ok=%s elapsed_ms=%s",
+        provider.name,
+        warmed,
+        round((time.perf_counter() - started) * 1000),
     )
-    for key in PROVIDER_SECRET_NAMES.values():
-        print(f"  {key}: {'set' if os.getenv(key) else 'missing'}")
 
-    for key in (*BASE_REQUIRED_ENV_VARS, "LIVEKIT_AGENT_TTS_VOICE_ID"):
-        print(f"  {key}: {'set' if os.getenv(key) else 'missing'}")
 
-    if provider_error:
-        print()
-        print(provider_error)
-        return 1
-
-    if missing:
-        print()
-        print("Missing required env vars:")
-        for key in missing:
-            print(f"  - {key}")
-        print()
-        print("Fill these in Infisical, then rerun the same command.")
-        return 1
-
-    print()
-    print("Environment looks ready for local LiveKit agent testing.")
-    return 0
-
-
-def bootstrap_from_infisical_if_needed() -> None:
-    if not missing_required_env():
-        return
+@dataclass(frozen=True)
+class WorkerState:
+    """Process-wide state built once per job process by the prewarm hook."""
+
+    search_settings: WebSearchSettings | None
+    default_persona: PersonaConfig
+    # None when the models could not be built; each job then builds its own.
+    session_models: SessionModels | None
+    prewarmed: bool = False
 
-    if os.getenv(INFISICAL_BOOTSTRAPPED) == "1":
-        raise SystemExit(print_env_doctor())
 
-    infisical = shutil.which("infisical")
-    if not infisical:
-        raise SystemExit(
-            "Missing required LiveKit/agent env vars and could not find the "
-            "`infisical` CLI. Install/login to Infisical or run the agent with "
-            "`infisical run --projectId ... --env=dev -- <command>`."
+def load_worker_state(prewarmed: bool = False) -> WorkerState:
+    try:
+        search_settings = load_web_search_settings(os.environ)
+    except ValueError as error:
+        logger.warning("Web search settings are not available: %s", error)
+        search_settings = None
+
+    # Create the process-wide pools and caches now so the first job reuses them.
+    get_shared_http_client_pool()
+    get_shared_search_cache(os.environ)
+    get_shared_provider_health(os.environ)
+    get_shared_persona_cache()
+    get_shared_tts_pool()
+
+    tracer_provider = configure_tracing(os.environ)
+    if tracer_provider is not None:
+        # LiveKit's own user_turn/agent_turn/llm_node/tts_node spans go to the
+        # same exporters, so search_web spans nest under its function_tool span.
+        telemetry.set_tracer_provider(tracer_provider)
+
+    try:
+        session_models = create_session_models()
+    except Exception as error:
+        logger.warning(
+            "Session models are not available; building them per job: %s", error
         )
+        session_models = None
+
+    return WorkerState(
+        search_settings=search_settings,
+        default_persona=default_persona(),
+        session_models=session_models,
+        prewarmed=prewarmed,
+    )
 
-    command = [
-        infisical,
-        "run",
-        "--env",
-        INFISICAL_ENV,
-    ]
-    if INFISICAL_PROJECT_ID:
-        command.extend(["--projectId", INFISICAL_PROJECT_ID])
-    command.extend(["--", sys.executable, *sys.argv])
-    env = {
-        **os.environ,
-        INFISICAL_BOOTSTRAPPED: "1",
-        "INFISICAL_ENV": INFISICAL_ENV,
-    }
-    if INFISICAL_PROJECT_ID:
-        env["INFISICAL_PROJECT_ID"] = INFISICAL_PROJECT_ID
 
-    completed = subprocess.run(command, env=env, check=False)
-    raise SystemExit(completed.returncode)
+def prewarm(proc: JobProcess) -> None:
+    started = time.perf_counter()
+    proc.userdata[WORKER_STATE_KEY] = load_worker_state(prewarmed=True)
+    logger.info(
+        "portfolio_agent_prewarmed elapsed_ms=%s",
+        round((time.perf_counter() - started) * 1000),
+    )
+
+
+async def close_process_resources() -> None:
+    # A job process exits after its job, so the job's shutdown is also the end
+    # of the process-wide pools created in prewarm.
+    await get_shared_http_client_pool().aclose()
+    # The disk cache writer is a daemon thread; closing it writes out the
+    # results still queued before the process exits.
+    await asyncio.to_thread(close_shared_search_cache)
+
+
+def get_worker_state(ctx: JobContext) -> WorkerState:
+    proc = getattr(ctx, "proc", None)
+    userdata = getattr(proc, "userdata", None)
+    state = userdata.get(WORKER_STATE_KEY) if isinstance(userdata, dict) else None
+    if isinstance(state, WorkerState):
+        return state
+    return load_worker_state()
 
 
 async def entrypoint(ctx: JobContext) -> None:
-    await ctx.connect()
+    trace = StartupTrace(str(getattr(ctx.job, "id", "unknown")))
+    with trace.stage("worker_state"):
+        worker_state = get_worker_state(ctx)
+    trace.attributes["prewarmed"] = worker_state.prewarmed
+    trace.track(
+        "search_warm_up",
+        start_search_provider_warm_up(ctx, worker_state.search_settings),
+    )
     metadata = get_job_metadata(ctx)
     persona_id = str(metadata.get("persona_id") or DEFAULT_PERSONA_ID)
     user_id = metadata.get("user_id")
-    persona = fetch_persona_config(
-        persona_id,
-        user_id if isinstance(user_id, str) else None,
+
+    # Job metadata is available before the room connection, so the room
+    # connect and persona lookup run together. The STT and LLM plugins come
+    # from the worker state; only persona-dependent pieces wait for the lookup.
+    connect_task = asyncio.create_task(trace.run("room_connect", ctx.connect()))
+    persona_task = asyncio.create_task(
+        trace.run(
+            "persona_fetch",
+            get_persona_config(
+                persona_id,
+                user_id if isinstance(user_id, str) else None,
+            ),
+        )
     )
+    try:
+        persona_lookup = await persona_task
+        persona = persona_lookup.persona
+        tts_pool = get_shared_tts_pool()
+        with trace.stage("session_build"):
+            session = create_agent_session(
+                persona, worker_state.session_models, tts_pool
+            )
+            status_sender = create_tool_status_sender(
+                ctx.room,
+                os.environ,
+                destination_filter=is_tool_status_destination,
+            )
+            agent = PortfolioAgent(
+                agent_id=persona.agent_id,
+                instructions=persona.instructions,
+                search_settings=worker_state.search_settings,
+                notifier_factory=lambda: LiveKitRpcSearchToolStatusNotifier(
+                    ctx.room, status_sender
+                ),
+            )
+        await connect_task
+    except BaseException:
+        connect_task.cancel()
+        persona_task.cancel()
+        raise
 
+    persona_cache_stats = get_shared_persona_cache().stats
     logger.info(
-        "portfolio_agent_job_connected agent_name=%s persona_id=%s room=%s job_id=%s",
+        "portfolio_agent_job_connected agent_name=%s persona_id=%s room=%s job_id=%s persona_cache=%s persona_cache_hit_ratio=%.2f persona_refresh_ms=%s",
         AGENT_NAME,
         persona.id,
         ctx.room.name,
         getattr(ctx.job, "id", "unknown"),
+        persona_lookup.status,
+        persona_cache_stats.hit_ratio,
+        (
+            round(persona_cache_stats.last_refresh_ms)
+            if persona_cache_stats.last_refresh_ms is not None
+            else None
+        ),
     )
 
-    session = create_agent_session(persona)
-
-    register_session_observability(session)
+    turn_metrics = get_shared_turn_metrics()
+    turn_spans = TurnSpanRecorder()
+    register_session_observability(session, turn_metrics, turn_spans=turn_spans)
+    register_startup_trace(session, trace)
+    ctx.add_shutdown_callback(log_web_search_stats)
+    ctx.add_shutdown_callback(close_process_resources)
+    ctx.add_shutdown_callback(lambda: close_tool_status_sender(status_sender))
+    ctx.add_shutdown_callback(lambda: log_turn_metrics(turn_metrics))
+    metrics_dumper = create_metrics_dumper(turn_metrics, os.environ)
+    if metrics_dumper is not None:
+        metrics_dumper.start()
+        ctx.add_shutdown_callback(metrics_dumper.aclose)
+    ctx.add_shutdown_callback(lambda: close_turn_spans(turn_spans))
+    tts_switch_latency = TtsSwitchLatency()
+    register_tts_switch_latency(session, tts_switch_latency)
+    ctx.add_shutdown_callback(lambda: log_tts_pool_stats(tts_pool, session))
     ctx.room.local_participant.register_rpc_method(
         PERSONA_TTS_SWITCH_RPC_METHOD,
-        create_persona_tts_switch_rpc_handler(session),
+        create_persona_tts_switch_rpc_handler(
+            session,
+            tts_pool=tts_pool,
+            switch_latency=tts_switch_latency,
+        ),
     )
 
-    await session.start(
-        room=ctx.room,
-        agent=PortfolioAgent(
-            agent_id=persona.agent_id,
-            instructions=persona.instructions,
+    if agent.search_prefetcher is not None:
+        register_search_prefetch(session, agent.search_prefetcher)
+        ctx.add_shutdown_callback(
+            lambda: log_search_prefetch_stats(agent.search_prefetcher)
+        )
+
+    await trace.run(
+        "session_start",
+        session.start(
+            room=ctx.room,
+            agent=agent,
+            record=session_recording_options(),
         ),
-        record=session_recording_options(),
     )
 
     logger.info(
@@ -619,13 +932,250 @@ async def entrypoint(ctx: JobContext) -> None:
         OPENAI_LLM_MODEL if AGENT_PROVIDER == "openai" else LLM_MODEL,
     )
 
-    await session.generate_reply(instructions=persona.greeting)
+    trace.mark("greeting_requested")
+    await play_greeting(session, agent, persona, create_greeting_cache(os.environ))
+
+
+async def play_greeting(
+    session: AgentSession,
+    agent: PortfolioAgent,
+    persona: PersonaConfig,
+    greeting_cache: GreetingAudioCache | None,
+) -> None:
+    if greeting_cache is None:
+        await session.generate_reply(instructions=persona.greeting)
+        return
+
+    key = persona_greeting_cache_key(persona, session.tts)
+    cached = await asyncio.to_thread(greeting_cache.load, key)
+    if cached is not None:
+        logger.info(
+            "portfolio_agent_greeting_cache hit=true persona_id=%s audio_seconds=%.2f",
+            persona.id,
+            cached.duration_seconds,
+        )
+        await session.say(cached.text, audio=cached.frames(), add_to_chat_ctx=True)
+        return
+
+    logger.info("portfolio_agent_greeting_cache hit=false persona_id=%s", persona.id)
+    # Record the greeting as it is spoken instead of synthesizing it again.
+    recorder = GreetingRecorder()
+    agent.greeting_recorder = recorder
+    try:
+        handle = session.generate_reply(instructions=persona.greeting)
+        await handle
+    finally:
+        agent.greeting_recorder = None
+    text = _spoken_text(handle)
+    if handle.interrupted or not text:
+        return
+
+    greeting = recorder.greeting(text)
+    if greeting is None:
+        return
+    try:
+        await asyncio.to_thread(greeting_cache.store, key, greeting)
+    except Exception:
+        logger.warning("Could not cache greeting audio.", exc_info=True)
+
+
+def persona_greeting_cache_key(persona: PersonaConfig, tts: Any) -> str:
+    # `instructions` is the per-user compiled prompt and shapes what the LLM
+    # says, so greetings are never shared across prompts or LLM models.
+    return greeting_cache_key(
+        persona.id,
+        persona.greeting,
+        persona.instructions,
+        OPENAI_LLM_MODEL if AGENT_PROVIDER == "openai" else LLM_MODEL,
+        persona.tts_model,
+        persona.tts_voice_id,
+        persona.tts_language,
+        sorted(persona.tts_options.items()),
+        getattr(tts, "provider", None),
+        getattr(tts, "model", None),
+        OPENAI_TTS_VOICE if AGENT_PROVIDER == "openai" else None,
+    )
+
+
+def _spoken_text(handle: Any) -> str:
+    texts = [
+        text
+        for item in handle.chat_items
+        if getattr(item, "role", None) == "assistant"
+        and (text := getattr(item, "text_content", None))
+    ]
+    return " ".join(texts).strip()
 
 
-def register_session_observability(session: AgentSession) -> None:
+def register_startup_trace(session: AgentSession, trace: StartupTrace) -> None:
+    logged = False
+
+    @session.on("agent_state_changed")
+    def _on_agent_state_changed(event) -> None:
+        nonlocal logged
+        if logged or event.new_state != "speaking":
+            return
+        logged = True
+        trace.mark("first_greeting_speech")
+        trace.log()
+
+
+def register_tts_switch_latency(
+    session: AgentSession,
+    switch_latency: TtsSwitchLatency,
+) -> None:
+    @session.on("agent_state_changed")
+    def _on_agent_state_changed(event) -> None:
+        if event.new_state != "speaking":
+            return
+        measured = switch_latency.speech_started()
+        if measured is None:
+            return
+        latency_ms, pool_hit = measured
+        logger.info(
+            "portfolio_agent_tts_switch_first_audio latency_ms=%s tts_pool_hit=%s",
+            round(latency_ms),
+            pool_hit,
+        )
+
+
+async def log_tts_pool_stats(
+    tts_pool: TtsEnginePool,
+    session: AgentSession | None = None,
+) -> None:
+    if session is not None:
+        # The ending session no longer holds its engine, so it can idle out.
+        tts_pool.release(session._tts)
+    tts_pool.close_idle()
+    logger.info(
+        "portfolio_agent_tts_pool_stats engines=%s hits=%s misses=%s evictions=%s idle_closed=%s",
+        len(tts_pool),
+        tts_pool.stats.hits,
+        tts_pool.stats.misses,
+        tts_pool.stats.evictions,
+        tts_pool.stats.idle_closed,
+    )
+
+
+async def log_web_search_stats() -> None:
+    stats = get_shared_http_client_pool().stats
+    logger.info(
+        "web_search_http_pool_stats clients_created=%s client_hits=%s requests=%s new_connections=%s reused_connections=%s",
+        stats.clients_created,
+        stats.client_hits,
+        stats.requests,
+        stats.new_connections,
+        stats.reused_connections,
+    )
+
+    for health in get_shared_provider_health(os.environ).snapshot():
+        logger.info(
+            "web_search_provider_health provider=%s circuit=%s successes=%s failures=%s latency_ewma_ms=%s error_rate_ewma=%.3f",
+            health.provider,
+            health.state,
+            health.successes,
+            health.failures,
+            round(health.latency_ewma_ms) if health.latency_ewma_ms is not None else None,
+            health.error_rate_ewma,
+        )
+
+    coalescer_stats = get_shared_search_coalescer().stats
+    logger.info(
+        "web_search_coalescer_stats requests=%s coalesced=%s",
+        coalescer_stats.requests,
+        coalescer_stats.coalesced,
+    )
+
+    search_cache = get_shared_search_cache(os.environ)
+    if search_cache is not None:
+        logger.info(
+            "web_search_cache_stats entries=%s bytes=%s hits=%s disk_hits=%s misses=%s evictions=%s expirations=%s",
+            len(search_cache),
+            search_cache.size_bytes,
+            search_cache.stats.hits,
+            search_cache.stats.disk_hits,
+            search_cache.stats.misses,
+            search_cache.stats.evictions,
+            search_cache.stats.expirations,
+        )
+
+
+async def log_turn_metrics(turn_metrics: TurnMetrics) -> None:
+    logger.info(
+        "portfolio_agent_turn_metrics %s",
+        json.dumps(turn_metrics.as_dict(), separators=(",", ":")),
+    )
+
+
+async def close_turn_spans(turn_spans: TurnSpanRecorder) -> None:
+    turn_spans.close(time.time())
+    await asyncio.to_thread(flush_tracing)
+
+
+async def close_tool_status_sender(sender: ToolStatusSender) -> None:
+    await sender.aclose()
+    stats = sender.stats
+    logger.info(
+        "web_search_status_sender_stats enqueued=%s sent=%s coalesced=%s dropped=%s failed=%s queue_depth=%s",
+        stats.enqueued,
+        stats.sent,
+        stats.coalesced,
+        stats.dropped,
+        stats.failed,
+        sender.queue_depth,
+    )
+
+
+async def log_search_prefetch_stats(prefetcher: SearchPrefetcher) -> None:
+    prefetcher.close()
+    stats = prefetcher.stats
+    logger.info(
+        "web_search_prefetch_stats prefetches=%s hits=%s misses=%s skipped=%s failures=%s hit_rate=%.2f spent_usd=%.4f",
+        stats.prefetches,
+        stats.hits,
+        stats.misses,
+        stats.skipped,
+        stats.failures,
+        stats.hit_rate,
+        prefetcher.budget.spent_usd,
+    )
+
+
+def register_search_prefetch(
+    session: AgentSession,
+    prefetcher: SearchPrefetcher,
+) -> None:
     @session.on("user_input_transcribed")
     def _on_user_input_transcribed(event) -> None:
-        if event.is_final:
+        prefetcher.on_transcript(event.transcript, event.is_final)
+
+
+def register_session_observability(
+    session: AgentSession,
+    turn_metrics: TurnMetrics | None = None,
+    log_sampler: LogSampler | None = None,
+    turn_spans: TurnSpanRecorder | None = None,
+) -> None:
+    turn_metrics = turn_metrics or get_shared_turn_metrics()
+    log_sampler = log_sampler or LogSampler(load_log_sample_rate(os.environ))
+    turn_spans = turn_spans or TurnSpanRecorder()
+    speech_ended_at: float | None = None
+
+    @session.on("metrics_collected")
+    def _on_metrics_collected(event) -> None:
+        turn_metrics.observe_livekit_metrics(event.metrics)
+        turn_spans.add_livekit_metrics(event.metrics)
+
+    @session.on("user_state_changed")
+    def _on_user_state_changed(event) -> None:
+        nonlocal speech_ended_at
+        if event.old_state == "speaking" and event.new_state != "speaking":
+            speech_ended_at = event.created_at
+            turn_spans.speech_ended(event.created_at)
+
+    @session.on("user_input_transcribed")
+    def _on_user_input_transcribed(event) -> None:
+        if event.is_final and log_sampler.sample():
             logger.info(
                 "user_input_transcribed text=%r",
                 _truncate_for_log(event.transcript),
@@ -633,6 +1183,11 @@ def register_session_observability(session: AgentSession) -> None:
 
     @session.on("agent_state_changed")
     def _on_agent_state_changed(event) -> None:
+        nonlocal speech_ended_at
+        if event.new_state == "speaking" and speech_ended_at is not None:
+            turn_metrics.observe(STAGE_RESPONSE, event.created_at - speech_ended_at)
+            turn_spans.agent_speaking(event.created_at)
+            speech_ended_at = None
         logger.debug(
             "agent_state_changed old=%s new=%s",
             event.old_state,
@@ -641,6 +1196,8 @@ def register_session_observability(session: AgentSession) -> None:
 
     @session.on("conversation_item_added")
     def _on_conversation_item_added(event) -> None:
+        if not log_sampler.sample():
+            return
         item = event.item
         text = getattr(item, "text_content", None)
         role = getattr(item, "role", "unknown")
@@ -653,6 +1210,8 @@ def register_session_observability(session: AgentSession) -> None:
 
     @session.on("function_tools_executed")
     def _on_function_tools_executed(event) -> None:
+        if not log_sampler.sample():
+            return
         for function_call, function_output in event.zipped():
             logger.info(
                 "function_tool_executed name=%s call_id=%s is_error=%s output_chars=%s arguments=%r",
@@ -680,14 +1239,10 @@ def register_session_observability(session: AgentSession) -> None:
 
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1 and sys.argv[1] == "doctor":
-        raise SystemExit(print_env_doctor())
-
-    bootstrap_from_infisical_if_needed()
-
     agents.cli.run_app(
         agents.WorkerOptions(
             entrypoint_fnc=entrypoint,
+            prewarm_fnc=prewarm,
             agent_name=AGENT_NAME,
         )
     )
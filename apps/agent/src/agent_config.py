@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import os
+import shutil
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Mapping, NoReturn
+
+from dotenv import load_dotenv
+
+from infisical_secrets import SecretLoadError, inject_secrets, load_secrets
+from web_search_constants import (
+    DEFAULT_WEB_SEARCH_MAX_RESULTS,
+    DEFAULT_WEB_SEARCH_PROVIDER,
+    DEFAULT_WEB_SEARCH_TIMEOUT_SECONDS,
+    PROVIDER_SECRET_NAMES,
+    WEB_SEARCH_CACHE_ENABLED_ENV,
+    WEB_SEARCH_MAX_RESULTS_ENV,
+    WEB_SEARCH_PROVIDER_ENV,
+    WEB_SEARCH_TIMEOUT_SECONDS_ENV,
+)
+
+# Configuration and CLI preflight for agent.py. This module must stay free of
+# LiveKit, plugin and HTTP client imports so `agent.py doctor` and Infisical
+# secret loading do not pay for loading the worker runtime.
+
+load_dotenv()
+
+INFISICAL_BOOTSTRAPPED = "LIVEKIT_AGENT_INFISICAL_BOOTSTRAPPED"
+INFISICAL_IN_PROCESS_ENV = "LIVEKIT_AGENT_INFISICAL_IN_PROCESS"
+BASE_REQUIRED_ENV_VARS = (
+    "LIVEKIT_URL",
+    "LIVEKIT_API_KEY",
+    "LIVEKIT_API_SECRET",
+)
+
+VALID_AGENT_PROVIDERS = ("openai", "livekit")
+AGENT_PROVIDER = "openai"
+SESSION_RECORDING_ENABLED_ENV = "LIVEKIT_AGENT_SESSION_RECORDING_ENABLED"
+SESSION_RECORD_AUDIO_ENV = "LIVEKIT_AGENT_RECORD_AUDIO"
+SESSION_RECORD_LOGS_ENV = "LIVEKIT_AGENT_RECORD_LOGS"
+SESSION_RECORD_TRACES_ENV = "LIVEKIT_AGENT_RECORD_TRACES"
+SESSION_RECORD_TRANSCRIPT_ENV = "LIVEKIT_AGENT_RECORD_TRANSCRIPT"
+
+
+@dataclass(frozen=True)
+class AgentSettings:
+    infisical_project_id: str | None
+    infisical_env: str
+    agent_name: str
+    stt_model: str
+    stt_language: str
+    llm_model: str
+    tts_model: str
+    tts_voice_id: str | None
+    openai_stt_model: str
+    openai_llm_model: str
+    openai_tts_model: str
+    openai_tts_voice: str
+
+
+def load_agent_settings(env: Mapping[str, str]) -> AgentSettings:
+    return AgentSettings(
+        infisical_project_id=env.get("INFISICAL_PROJECT_ID"),
+        infisical_env=env.get("INFISICAL_ENV", "dev"),
+        agent_name=env.get("LIVEKIT_AGENT_NAME", "dennis-portfolio-agent"),
+        stt_model=env.get("LIVEKIT_AGENT_STT_MODEL", "deepgram/nova-3"),
+        stt_language=env.get("LIVEKIT_AGENT_STT_LANGUAGE", "en"),
+        llm_model=env.get("LIVEKIT_AGENT_LLM_MODEL", "google/gemini-2.5-flash-lite"),
+        tts_model=env.get("LIVEKIT_AGENT_TTS_MODEL", "cartesia/sonic-3.5"),
+        tts_voice_id=env.get("LIVEKIT_AGENT_TTS_VOICE_ID"),
+        openai_stt_model=env.get("OPENAI_AGENT_STT_MODEL", "whisper-1"),
+        openai_llm_model=env.get("OPENAI_AGENT_LLM_MODEL", "gpt-4o-mini"),
+        openai_tts_model=env.get("OPENAI_AGENT_TTS_MODEL", "tts-1"),
+        openai_tts_voice=env.get("OPENAI_AGENT_TTS_VOICE", "alloy"),
+    )
+
+
+_settings: AgentSettings | None = None
+
+
+def get_agent_settings() -> AgentSettings:
+    global _settings
+    if _settings is None:
+        _settings = load_agent_settings(os.environ)
+    return _settings
+
+
+def refresh_agent_settings() -> AgentSettings:
+    """Re-read the settings from os.environ, such as after injecting secrets."""
+    global _settings
+    _settings = load_agent_settings(os.environ)
+    return _settings
+
+
+# Module-level names such as `AGENT_NAME` resolve against the current settings
+# when they are looked up, so `from agent_config import AGENT_NAME` after the
+# preflight sees values from injected secrets.
+_SETTING_ATTRIBUTES = {
+    "INFISICAL_PROJECT_ID": "infisical_project_id",
+    "INFISICAL_ENV": "infisical_env",
+    "AGENT_NAME": "agent_name",
+    "STT_MODEL": "stt_model",
+    "STT_LANGUAGE": "stt_language",
+    "LLM_MODEL": "llm_model",
+    "TTS_MODEL": "tts_model",
+    "TTS_VOICE_ID": "tts_voice_id",
+    "OPENAI_STT_MODEL": "openai_stt_model",
+    "OPENAI_LLM_MODEL": "openai_llm_model",
+    "OPENAI_TTS_MODEL": "openai_tts_model",
+    "OPENAI_TTS_VOICE": "openai_tts_voice",
+}
+
+
+def __getattr__(name: str) -> object:
+    attribute = _SETTING_ATTRIBUTES.get(name)
+    if attribute is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(get_agent_settings(), attribute)
+
+
+def validate_agent_provider() -> str | None:
+    if AGENT_PROVIDER in VALID_AGENT_PROVIDERS:
+        return None
+
+    return (
+        f"Unsupported LIVEKIT_AGENT_PROVIDER={AGENT_PROVIDER!r}. "
+        f"Expected one of: {', '.join(VALID_AGENT_PROVIDERS)}."
+    )
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+
+    if value is None:
+        return default
+
+    return value.strip().lower() not in {"0", "false", "no", "off"}
+
+
+def missing_required_env() -> list[str]:
+    required = list(BASE_REQUIRED_ENV_VARS)
+
+    if AGENT_PROVIDER == "openai":
+        required.append("OPENAI_API_KEY")
+    else:
+        required.append("LIVEKIT_AGENT_TTS_VOICE_ID")
+
+    return [key for key in required if not os.getenv(key)]
+
+
+def print_env_doctor() -> int:
+    settings = get_agent_settings()
+    provider_error = validate_agent_provider()
+    missing = missing_required_env()
+    print("LiveKit agent environment")
+    print(
+        "  INFISICAL_PROJECT_ID: "
+        f"{'set' if settings.infisical_project_id else 'missing'}"
+    )
+    print(f"  INFISICAL_ENV: {settings.infisical_env}")
+    print(f"  LIVEKIT_AGENT_NAME: {settings.agent_name}")
+    print(f"  LIVEKIT_AGENT_PROVIDER: {AGENT_PROVIDER}")
+    print(f"  LIVEKIT_AGENT_STT_MODEL: {settings.stt_model}")
+    print(f"  LIVEKIT_AGENT_STT_LANGUAGE: {settings.stt_language}")
+    print(f"  LIVEKIT_AGENT_LLM_MODEL: {settings.llm_model}")
+    print(f"  LIVEKIT_AGENT_TTS_MODEL: {settings.tts_model}")
+    print(
+        "  LIVEKIT_AGENT_TTS_VOICE_ID: "
+        f"{'set' if settings.tts_voice_id else 'missing'}"
+    )
+    print(f"  OPENAI_AGENT_STT_MODEL: {settings.openai_stt_model}")
+    print(f"  OPENAI_AGENT_LLM_MODEL: {settings.openai_llm_model}")
+    print(f"  OPENAI_AGENT_TTS_MODEL: {settings.openai_tts_model}")
+    print(f"  OPENAI_AGENT_TTS_VOICE: {settings.openai_tts_voice}")
+    print(f"  OPENAI_API_KEY: {'set' if os.getenv('OPENAI_API_KEY') else 'missing'}")
+    print(
+        "  LIVEKIT_AGENT_SESSION_RECORDING_ENABLED: "
+        f"{env_bool(SESSION_RECORDING_ENABLED_ENV, True)}"
+    )
+    print(f"  LIVEKIT_AGENT_RECORD_AUDIO: {env_bool(SESSION_RECORD_AUDIO_ENV, True)}")
+    print(f"  LIVEKIT_AGENT_RECORD_LOGS: {env_bool(SESSION_RECORD_LOGS_ENV, True)}")
+    print(f"  LIVEKIT_AGENT_RECORD_TRACES: {env_bool(SESSION_RECORD_TRACES_ENV, True)}")
+    print(
+        "  LIVEKIT_AGENT_RECORD_TRANSCRIPT: "
+        f"{env_bool(SESSION_RECORD_TRANSCRIPT_ENV, True)}"
+    )
+    print(
+        "  WEB_SEARCH_PROVIDER: "
+        f"{os.getenv(WEB_SEARCH_PROVIDER_ENV, DEFAULT_WEB_SEARCH_PROVIDER)}"
+    )
+    print(
+        "  WEB_SEARCH_MAX_RESULTS: "
+        f"{os.getenv(WEB_SEARCH_MAX_RESULTS_ENV, str(DEFAULT_WEB_SEARCH_MAX_RESULTS))}"
+    )
+    timeout_seconds = os.getenv(
+        WEB_SEARCH_TIMEOUT_SECONDS_ENV,
+        str(int(DEFAULT_WEB_SEARCH_TIMEOUT_SECONDS)),
+    )
+    print(f"  WEB_SEARCH_TIMEOUT_SECONDS: {timeout_seconds}")
+    print(
+        "  WEB_SEARCH_CACHE_ENABLED: "
+        f"{os.getenv(WEB_SEARCH_CACHE_ENABLED_ENV, 'true')}"
+    )
+    for key in PROVIDER_SECRET_NAMES.values():
+        print(f"  {key}: {'set' if os.getenv(key) else 'missing'}")
+
+    for key in (*BASE_REQUIRED_ENV_VARS, "LIVEKIT_AGENT_TTS_VOICE_ID"):
+        print(f"  {key}: {'set' if os.getenv(key) else 'missing'}")
+
+    if provider_error:
+        print()
+        print(provider_error)
+        return 1
+
+    if missing:
+        print()
+        print("Missing required env vars:")
+        for key in missing:
+            print(f"  - {key}")
+        print()
+        print("Fill these in Infisical, then rerun the same command.")
+        return 1
+
+    print()
+    print("Environment looks ready for local LiveKit agent testing.")
+    return 0
+
+
+def bootstrap_from_infisical_if_needed() -> None:
+    if not missing_required_env():
+        return
+
+    if os.getenv(INFISICAL_BOOTSTRAPPED) == "1":
+        raise SystemExit(print_env_doctor())
+
+    if env_bool(INFISICAL_IN_PROCESS_ENV, True):
+        settings = get_agent_settings()
+        try:
+            secrets, source = load_secrets(
+                os.environ,
+                settings.infisical_env,
+                settings.infisical_project_id,
+            )
+        except SecretLoadError as error:
+            print(
+                f"In-process secret loading failed ({error}); "
+                "falling back to `infisical run`.",
+                file=sys.stderr,
+            )
+        else:
+            injected = inject_secrets(secrets, os.environ)
+            refresh_agent_settings()
+            print(
+                f"Loaded {len(injected)} secrets from {source} "
+                f"(INFISICAL_ENV={settings.infisical_env}).",
+                file=sys.stderr,
+            )
+            if missing_required_env():
+                raise SystemExit(print_env_doctor())
+            return
+
+    reexec_through_infisical()
+
+
+def reexec_through_infisical() -> NoReturn:
+    infisical = shutil.which("infisical")
+    if not infisical:
+        raise SystemExit(
+            "Missing required LiveKit/agent env vars and could not find the "
+            "`infisical` CLI. Install/login to Infisical or run the agent with "
+            "`infisical run --projectId ... --env=dev -- <command>`."
+        )
+
+    settings = get_agent_settings()
+    command = [
+        infisical,
+        "run",
+        "--env",
+        settings.infisical_env,
+    ]
+    if settings.infisical_project_id:
+        command.extend(["--projectId", settings.infisical_project_id])
+    command.extend(["--", sys.executable, *sys.argv])
+    env = {
+        **os.environ,
+        INFISICAL_BOOTSTRAPPED: "1",
+        "INFISICAL_ENV": settings.infisical_env,
+    }
+    if settings.infisical_project_id:
+        env["INFISICAL_PROJECT_ID"] = settings.infisical_project_id
+
+    completed = subprocess.run(command, env=env, check=False)
+    raise SystemExit(completed.returncode)
+
+
+def run_cli_preflight(argv: list[str]) -> None:
+    """Handle `doctor` and Infisical secret loading before the worker loads."""
+    if len(argv) > 1 and argv[1] == "doctor":
+        raise SystemExit(print_env_doctor())
+
+    bootstrap_from_infisical_if_needed()
@@ -1,20 +1,41 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import time
+import uuid
+from collections import deque
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
 from json import JSONDecodeError
 from typing import Protocol
 
+from opentelemetry import trace
+
+from voice_tracing import tracer
 from web_search import SearchResult
+from web_search_cache import CacheKey, SearchResultCache, search_cache_key
+from web_search_constants import WEB_SEARCH_STATUS_BROADCAST_ENV
+from web_search_prefetch import SearchPrefetcher
+from web_search_providers import SearchProgressCallback, search_with_progress
 
 logger = logging.getLogger(__name__)
 
-MAX_STATUS_SOURCES = 5
-MAX_STATUS_SOURCE_TITLE_CHARS = 160
-MAX_STATUS_SOURCE_DESCRIPTION_CHARS = 280
 MAX_STATUS_SOURCE_URL_CHARS = 2_048
 LIVEKIT_RPC_MAX_PAYLOAD_BYTES = 15 * 1024
 MAX_STATUS_RPC_PAYLOAD_BYTES = 14 * 1024
+# Payloads over the limit are split into at most this many chunk messages,
+# which the browser reassembles by `chunk_id`. Must match MAX_STATUS_CHUNKS in
+# the web app's tool-call-status.tsx.
+MAX_STATUS_RPC_CHUNKS = 64
+STATUS_RPC_CHUNK_ENVELOPE_BYTES = 128
+STATUS_RPC_METHOD = "livekit_agent_tool_status"
+STATUS_RPC_SPAN = "web_search.status_rpc"
+STATUS_RPC_RESPONSE_TIMEOUT_SECONDS = 5.0
+MAX_STATUS_QUEUE_SIZE = 8
+STATUS_SENDER_CLOSE_TIMEOUT_SECONDS = 2.0
+_TERMINAL_STATUS_STATES = frozenset({"completed", "failed"})
 
 
 class SearchProvider(Protocol):
@@ -28,10 +49,96 @@ class SearchProvider(Protocol):
     ) -> list[SearchResult]: ...
 
 
+@dataclass
+class SearchCoalescerStats:
+    requests: int = 0
+    coalesced: int = 0
+
+
+class SearchCoalescer:
+    """Single-flight wrapper so identical concurrent searches share one call.
+
+    The provider call runs in its own task and every caller awaits it through
+    `asyncio.shield`, so cancelling one caller does not cancel the others.
+    When the last waiting caller is cancelled, for example because the user
+    interrupted, the provider call is cancelled too instead of running on
+    and spending the search budget for nobody.
+    """
+
+    def __init__(self) -> None:
+        self.stats = SearchCoalescerStats()
+        self._in_flight: dict[CacheKey, asyncio.Task[list[SearchResult]]] = {}
+        self._waiters: dict[asyncio.Task[list[SearchResult]], int] = {}
+
+    async def search(
+        self,
+        provider: SearchProvider,
+        query: str,
+        max_results: int,
+        timeout_seconds: float,
+        on_progress: SearchProgressCallback | None = None,
+    ) -> list[SearchResult]:
+        key = search_cache_key(provider.name, query, max_results)
+        self.stats.requests += 1
+
+        task = self._in_flight.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self.stats.coalesced += 1
+        else:
+            # Only the caller that starts the search receives partial results.
+            task = asyncio.create_task(
+                search_with_progress(
+                    provider,
+                    query=query,
+                    max_results=max_results,
+                    timeout_seconds=timeout_seconds,
+                    on_progress=on_progress,
+                )
+            )
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return list(await asyncio.shield(task))
+        except asyncio.CancelledError:
+            if self._waiters[task] == 1 and not task.done():
+                # Later identical searches start a fresh call instead of
+                # joining one that is being cancelled.
+                if self._in_flight.get(key) is task:
+                    del self._in_flight[key]
+                task.cancel()
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if self._waiters[task] == 0:
+                del self._waiters[task]
+
+    def _forget(self, key: CacheKey, task: asyncio.Task[list[SearchResult]]) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every caller went away.
+            task.exception()
+
+
+_shared_search_coalescer: SearchCoalescer | None = None
+
+
+def get_shared_search_coalescer() -> SearchCoalescer:
+    global _shared_search_coalescer
+    if _shared_search_coalescer is None:
+        _shared_search_coalescer = SearchCoalescer()
+    return _shared_search_coalescer
+
+
 class SearchToolStatusNotifier:
     async def started(self, summary: str, provider: str) -> None:
         return None
 
+    async def progress(self, results: list[SearchResult]) -> None:
+        return None
+
     async def finished(self, results: list[SearchResult]) -> None:
         return None
 
@@ -39,37 +146,207 @@ class SearchToolStatusNotifier:
         return None
 
 
-class LiveKitRpcSearchToolStatusNotifier(SearchToolStatusNotifier):
-    def __init__(self, room: object) -> None:
+@dataclass
+class ToolStatusSenderStats:
+    enqueued: int = 0
+    sent: int = 0
+    coalesced: int = 0
+    dropped: int = 0
+    failed: int = 0
+
+
+class ToolStatusSender:
+    """Per-room background sender for tool status RPCs.
+
+    `enqueue` returns immediately and a single worker task delivers payloads in
+    order, so the search path never waits on the browser. Queued "running"
+    updates are superseded by a later "running" or terminal update, so a full
+    queue only holds terminal updates. Those are never dropped: once
+    `max_queue` payloads are waiting, new "running" updates are dropped and
+    terminal ones are still queued.
+
+    By default only the first remote participant is notified. With `broadcast`
+    every remote participant accepted by `destination_filter` receives the
+    same encoded messages concurrently, each under its own timeout.
+    """
+
+    def __init__(
+        self,
+        room: object,
+        *,
+        max_queue: int = MAX_STATUS_QUEUE_SIZE,
+        broadcast: bool = False,
+        destination_filter: Callable[[object], bool] | None = None,
+        response_timeout_seconds: float = STATUS_RPC_RESPONSE_TIMEOUT_SECONDS,
+    ) -> None:
         self.room = room
-        self.active_provider: str | None = None
-        self.active_summary: str | None = None
+        self.max_queue = max(1, max_queue)
+        self.broadcast = broadcast
+        self.destination_filter = destination_filter
+        self.response_timeout_seconds = response_timeout_seconds
+        self.stats = ToolStatusSenderStats()
+        self._queue: deque[dict[str, object]] = deque()
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def enqueue(self, payload: dict[str, object]) -> None:
+        self.stats.enqueued += 1
+        state = payload.get("state")
+        if state == "running" or state in _TERMINAL_STATUS_STATES:
+            while self._queue and self._queue[-1].get("state") == "running":
+                self._queue.pop()
+                self.stats.coalesced += 1
+        if len(self._queue) >= self.max_queue and state not in _TERMINAL_STATUS_STATES:
+            self.stats.dropped += 1
+            return
+        self._queue.append(payload)
 
-    async def _send(self, payload: dict[str, object]) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def drain(self) -> None:
+        while self._task is not None and not self._task.done():
+            await asyncio.shield(self._task)
+
+    async def aclose(
+        self, timeout_seconds: float = STATUS_SENDER_CLOSE_TIMEOUT_SECONDS
+    ) -> None:
+        try:
+            await asyncio.wait_for(self.drain(), timeout_seconds)
+        except asyncio.TimeoutError:
+            self.stats.dropped += len(self._queue)
+            self._queue.clear()
+            if self._task is not None:
+                self._task.cancel()
+                await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        while self._queue:
+            payload = self._queue.popleft()
+            try:
+                await self._deliver(payload)
+            except Exception:
+                self.stats.failed += 1
+                logger.exception(
+                    "Failed to send LiveKit tool status RPC",
+                    extra={"payload_state": payload.get("state")},
+                )
+
+    def _destinations(self) -> list[str]:
         remote_participants = getattr(self.room, "remote_participants", {})
-        if not remote_participants:
+        if not self.broadcast:
+            return list(remote_participants)[:1]
+        return [
+            identity
+            for identity, participant in remote_participants.items()
+            if self.destination_filter is None or self.destination_filter(participant)
+        ]
+
+    async def _deliver(self, payload: dict[str, object]) -> None:
+        destinations = self._destinations()
+        if not destinations:
             return
 
-        destination_identity = next(iter(remote_participants))
-        payload_json = _fit_rpc_payload(payload)
-        try:
-            await self.room.local_participant.perform_rpc(
-                destination_identity=destination_identity,
-                method="livekit_agent_tool_status",
-                payload=payload_json,
-                response_timeout=5,
+        with tracer().start_as_current_span(
+            STATUS_RPC_SPAN,
+            attributes={
+                "web_search.status_state": str(payload.get("state")),
+                "web_search.status_queue_depth": len(self._queue),
+                "rpc.destination_count": len(destinations),
+            },
+        ) as span:
+            started = time.perf_counter()
+            # Encoded once; every destination gets the same messages.
+            messages = _encode_status_messages(payload)
+            span.set_attribute(
+                "web_search.fit_rpc_payload_ms",
+                round((time.perf_counter() - started) * 1000, 3),
+            )
+            span.set_attribute(
+                "rpc.payload_bytes", sum(_payload_bytes(message) for message in messages)
             )
-        except Exception:
-            logger.warning(
-                "Failed to send LiveKit tool status RPC",
-                exc_info=True,
-                extra={"payload_state": payload.get("state")},
+            span.set_attribute("rpc.message_count", len(messages))
+            sends = [
+                (destination_identity, message)
+                for destination_identity in destinations
+                for message in messages
+            ]
+            # Chunks go to every destination together rather than each waiting
+            # for the previous response; the browser reassembles them in any
+            # order. Each call has its own timeout, so one slow participant
+            # does not hold up the rest.
+            outcomes = await asyncio.gather(
+                *(
+                    self._send_message(destination_identity, message)
+                    for destination_identity, message in sends
+                ),
+                return_exceptions=True,
             )
+            # Timed-out and cancelled sends are failures too, not just errors.
+            errors = {
+                destination_identity: outcome
+                for (destination_identity, _), outcome in zip(sends, outcomes)
+                if isinstance(outcome, BaseException)
+            }
+            span.set_attribute("rpc.failed_destinations", len(errors))
+            if errors:
+                self.stats.failed += 1
+                logger.warning(
+                    "Failed to send LiveKit tool status RPC",
+                    exc_info=next(iter(errors.values())),
+                    extra={
+                        "payload_state": payload.get("state"),
+                        "failed_destinations": len(errors),
+                    },
+                )
+            else:
+                self.stats.sent += 1
+
+    async def _send_message(self, destination_identity: str, message: str) -> str:
+        return await asyncio.wait_for(
+            self.room.local_participant.perform_rpc(
+                destination_identity=destination_identity,
+                method=STATUS_RPC_METHOD,
+                payload=message,
+                response_timeout=self.response_timeout_seconds,
+            ),
+            self.response_timeout_seconds,
+        )
+
+
+def create_tool_status_sender(
+    room: object,
+    env: Mapping[str, str | None],
+    *,
+    destination_filter: Callable[[object], bool] | None = None,
+) -> ToolStatusSender:
+    broadcast = (env.get(WEB_SEARCH_STATUS_BROADCAST_ENV) or "false").strip().lower()
+    return ToolStatusSender(
+        room,
+        broadcast=broadcast in {"1", "true", "yes", "on"},
+        destination_filter=destination_filter,
+    )
+
+
+class LiveKitRpcSearchToolStatusNotifier(SearchToolStatusNotifier):
+    def __init__(self, room: object, sender: ToolStatusSender | None = None) -> None:
+        self.room = room
+        self.sender = sender or ToolStatusSender(room)
+        self.active_provider: str | None = None
+        self.active_summary: str | None = None
+        self._progress_sources_sent = 0
+
+    async def flush(self) -> None:
+        await self.sender.drain()
 
     async def started(self, summary: str, provider: str) -> None:
         self.active_summary = summary
         self.active_provider = provider
-        await self._send(
+        self._progress_sources_sent = 0
+        self.sender.enqueue(
             {
                 "provider": provider,
                 "state": "running",
@@ -77,40 +354,29 @@ class LiveKitRpcSearchToolStatusNotifier(SearchToolStatusNotifier):
             }
         )
 
-    async def finished(self, results: list[SearchResult]) -> None:
-        sources = []
-        for result in results:
-            url = _get_status_source_url(result.url)
-            if not url:
-                continue
-
-            sources.append(
-                {
-                    "description": _truncate_status_text(
-                        result.snippet or "",
-                        MAX_STATUS_SOURCE_DESCRIPTION_CHARS,
-                    ),
-                    "provider": result.provider or "",
-                    "published_at": result.published_at,
-                    "title": _truncate_status_text(
-                        result.title or "",
-                        MAX_STATUS_SOURCE_TITLE_CHARS,
-                    ),
-                    "url": url,
-                }
-            )
-            if len(sources) >= MAX_STATUS_SOURCES:
-                break
+    async def progress(self, results: list[SearchResult]) -> None:
+        sources = _status_sources(results)
+        if len(sources) <= self._progress_sources_sent:
+            return
+
+        self._progress_sources_sent = len(sources)
+        payload: dict[str, object] = {"sources": sources, "state": "running"}
+        if self.active_provider:
+            payload["provider"] = self.active_provider
+        if self.active_summary:
+            payload["summary"] = self.active_summary
+        self.sender.enqueue(payload)
 
+    async def finished(self, results: list[SearchResult]) -> None:
         payload: dict[str, object] = {
-            "sources": sources,
+            "sources": _status_sources(results),
             "state": "completed",
         }
         if self.active_provider:
             payload["provider"] = self.active_provider
         if self.active_summary:
             payload["summary"] = self.active_summary
-        await self._send(payload)
+        self.sender.enqueue(payload)
 
     async def failed(self, message: str) -> None:
         payload = {"error": message, "state": "failed"}
@@ -118,7 +384,22 @@ class LiveKitRpcSearchToolStatusNotifier(SearchToolStatusNotifier):
             payload["provider"] = self.active_provider
         if self.active_summary:
             payload["summary"] = self.active_summary
-        await self._send(payload)
+        self.sender.enqueue(payload)
+
+
+def _status_sources(results: list[SearchResult]) -> list[dict[str, object]]:
+    # Every source is sent in full; oversized statuses are chunked, not trimmed.
+    return [
+        {
+            "description": result.snippet or "",
+            "provider": result.provider or "",
+            "published_at": result.published_at,
+            "title": result.title or "",
+            "url": url,
+        }
+        for result in results
+        if (url := _get_status_source_url(result.url))
+    ]
 
 
 def _format_results(results: list[SearchResult]) -> str:
@@ -141,22 +422,57 @@ async def run_web_search_tool(
     notifier: SearchToolStatusNotifier,
     max_results: int,
     timeout_seconds: float,
+    cache: SearchResultCache | None = None,
+    coalescer: SearchCoalescer | None = None,
+    prefetcher: SearchPrefetcher | None = None,
 ) -> str:
     await notifier.started(summary, provider.name)
-
+    span = trace.get_current_span()
+
+    if cache is not None:
+        cached_results = await cache.get(provider.name, query, max_results)
+        if cached_results is not None:
+            logger.debug("web_search_cache_hit provider=%s", provider.name)
+            span.set_attribute("web_search.cache_status", "hit")
+            await notifier.finished(cached_results)
+            return _format_results(cached_results)
+
+    if prefetcher is not None:
+        prefetched_results = await prefetcher.claim(provider.name, query, max_results)
+        if prefetched_results:
+            logger.debug("web_search_prefetch_hit provider=%s", provider.name)
+            span.set_attribute("web_search.cache_status", "prefetch_hit")
+            await notifier.finished(prefetched_results)
+            return _format_results(prefetched_results)
+
+    span.set_attribute("web_search.cache_status", "miss" if cache is not None else "disabled")
     try:
-        results = await provider.search(
-            query=query,
-            max_results=max_results,
-            timeout_seconds=timeout_seconds,
-        )
+        if coalescer is not None:
+            results = await coalescer.search(
+                provider,
+                query=query,
+                max_results=max_results,
+                timeout_seconds=timeout_seconds,
+                on_progress=notifier.progress,
+            )
+        else:
+            results = await search_with_progress(
+                provider,
+                query=query,
+                max_results=max_results,
+                timeout_seconds=timeout_seconds,
+                on_progress=notifier.progress,
+            )
     except Exception as error:
         message = _safe_error_message(error)
+        span.set_attribute("web_search.error", message)
         await notifier.failed(message)
         if "API_KEY is missing" in message:
             return f"Web search is not configured: {message}."
         return f"Web search failed: {message}."
 
+    if cache is not None and results:
+        cache.put(provider.name, query, max_results, results)
     await notifier.finished(results)
     return _format_results(results)
 
@@ -179,53 +495,69 @@ def _get_status_source_url(value: str) -> str:
     return value
 
 
-def _fit_rpc_payload(payload: dict[str, object]) -> str:
+def _encode_status_messages(payload: dict[str, object]) -> list[str]:
+    """Encode a status payload as one RPC message, or as chunks if too large."""
     payload_json = _dump_rpc_payload(payload)
     if _payload_bytes(payload_json) <= MAX_STATUS_RPC_PAYLOAD_BYTES:
-        return payload_json
-
-    fitted = dict(payload)
-    sources = fitted.get("sources")
-    if isinstance(sources, list):
-        fitted["sources"] = list(sources)
-        while fitted["sources"]:
-            payload_json = _dump_rpc_payload(fitted)
-            if _payload_bytes(payload_json) <= MAX_STATUS_RPC_PAYLOAD_BYTES:
-                return payload_json
-            fitted["sources"].pop()
-
-    for key in ("summary", "error"):
-        if isinstance(fitted.get(key), str):
-            fitted[key] = _truncate_payload_field(fitted, key)
-            payload_json = _dump_rpc_payload(fitted)
-            if _payload_bytes(payload_json) <= MAX_STATUS_RPC_PAYLOAD_BYTES:
-                return payload_json
-
-    minimal_payload = _minimal_status_payload(fitted)
-    payload_json = _dump_rpc_payload(minimal_payload)
-    if _payload_bytes(payload_json) <= LIVEKIT_RPC_MAX_PAYLOAD_BYTES:
-        return payload_json
-
-    return _dump_rpc_payload({"state": str(payload.get("state") or "completed")})
-
-
-def _truncate_payload_field(payload: dict[str, object], key: str) -> str:
-    value = str(payload.get(key) or "")
-    low = 0
-    high = len(value)
-    best = ""
-
-    while low <= high:
-        mid = (low + high) // 2
-        candidate = _truncate_status_text(value, max(mid, 3))
-        test_payload = {**payload, key: candidate}
-        if _payload_bytes(_dump_rpc_payload(test_payload)) <= MAX_STATUS_RPC_PAYLOAD_BYTES:
-            best = candidate
-            low = mid + 1
-        else:
-            high = mid - 1
-
-    return best
+        return [payload_json]
+    chunks = _chunk_rpc_payload(payload_json)
+    if chunks is not None:
+        return chunks
+
+    logger.error(
+        "web_search_status_payload_too_large state=%s payload_bytes=%s max_chunks=%s",
+        payload.get("state"),
+        _payload_bytes(payload_json),
+        MAX_STATUS_RPC_CHUNKS,
+    )
+    return [_dump_rpc_payload(_minimal_status_payload(payload))]
+
+
+def _chunk_rpc_payload(
+    payload_json: str,
+    chunk_id: str | None = None,
+) -> list[str] | None:
+    """Split `payload_json` into chunk messages that each fit the RPC budget.
+
+    Each message carries a slice of the payload text in `data`, plus
+    `chunk_id`, `chunk_index` and `chunk_count`; joining the `data` strings
+    in index order gives back `payload_json`. Returns None when more than
+    `MAX_STATUS_RPC_CHUNKS` messages would be needed.
+    """
+    body = _dump_rpc_payload(payload_json)[1:-1].encode("utf-8")
+    piece_bytes = MAX_STATUS_RPC_PAYLOAD_BYTES - STATUS_RPC_CHUNK_ENVELOPE_BYTES
+    pieces: list[str] = []
+    start = 0
+    while start < len(body):
+        if len(pieces) == MAX_STATUS_RPC_CHUNKS:
+            return None
+        piece = _json_body_prefix(body[start : start + piece_bytes])
+        pieces.append(piece)
+        start += _payload_bytes(piece)
+
+    chunk_id = chunk_id or uuid.uuid4().hex
+    return [
+        f'{{"chunk_id":"{chunk_id}","chunk_index":{index},'
+        f'"chunk_count":{len(pieces)},"data":"{piece}"}}'
+        for index, piece in enumerate(pieces)
+    ]
+
+
+def _json_body_prefix(body: bytes) -> str:
+    """Longest prefix of an encoded JSON string body that is itself complete.
+
+    Drops a partial UTF-8 character or escape sequence, such as `\\u00`,
+    left where `body` was cut.
+    """
+    text = body.decode("utf-8", errors="ignore")
+    # An escape sequence is at most six characters, such as `\u001f`.
+    for end in range(len(text), max(len(text) - 6, 0), -1):
+        try:
+            json.loads(f'"{text[:end]}"')
+        except json.JSONDecodeError:
+            continue
+        return text[:end]
+    return ""
 
 
 def _minimal_status_payload(payload: dict[str, object]) -> dict[str, object]:
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from voice_tracing import DEFAULT_TRACE_FILE, TRACE_FILE_ENV
+
+# Offline latency report for exported spans. Reads the JSON Lines file written
+# by the file exporter, or OTLP/JSON files (one export request per line, as
+# written by the collector's file exporter), and prints percentiles per span.
+
+PERCENTILES = (0.5, 0.95, 0.99)
+
+
+def iter_span_records(lines: Iterable[str]) -> Iterator[dict[str, Any]]:
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            payload = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(payload, dict):
+            continue
+        if "resourceSpans" in payload:
+            yield from _iter_otlp_spans(payload)
+        elif "name" in payload:
+            yield payload
+
+
+def _iter_otlp_spans(payload: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    for resource_spans in payload.get("resourceSpans") or []:
+        for scope_spans in resource_spans.get("scopeSpans") or []:
+            for span in scope_spans.get("spans") or []:
+                yield {
+                    "name": span.get("name"),
+                    "start_time_unix_nano": span.get("startTimeUnixNano"),
+                    "end_time_unix_nano": span.get("endTimeUnixNano"),
+                }
+
+
+def span_duration_ms(record: dict[str, Any]) -> float | None:
+    try:
+        start = int(record["start_time_unix_nano"])
+        end = int(record["end_time_unix_nano"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if end < start:
+        return None
+    return (end - start) / 1_000_000
+
+
+def durations_by_span(records: Iterable[dict[str, Any]]) -> dict[str, list[float]]:
+    durations: dict[str, list[float]] = {}
+    for record in records:
+        duration = span_duration_ms(record)
+        if duration is None or not record.get("name"):
+            continue
+        durations.setdefault(str(record["name"]), []).append(duration)
+    return durations
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    index = min(int(fraction * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def summarize_spans(records: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    summaries = []
+    for name, values in sorted(durations_by_span(records).items()):
+        values.sort()
+        summary: dict[str, Any] = {"span": name, "count": len(values)}
+        for fraction in PERCENTILES:
+            summary[f"p{round(fraction * 100)}_ms"] = round(
+                percentile(values, fraction), 1
+            )
+        summaries.append(summary)
+    return summaries
+
+
+def format_summary_table(summaries: list[dict[str, Any]]) -> str:
+    width = max([len("span"), *(len(summary["span"]) for summary in summaries)])
+    lines = [
+        f"{'span':<{width}}  {'count':>6}  {'p50_ms':>9}  {'p95_ms':>9}  "
+        f"{'p99_ms':>9}"
+    ]
+    for summary in summaries:
+        lines.append(
+            f"{summary['span']:<{width}}  {summary['count']:>6}  "
+            f"{summary['p50_ms']:>9.1f}  {summary['p95_ms']:>9.1f}  "
+            f"{summary['p99_ms']:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    paths = [Path(arg) for arg in argv] or [
+        Path(os.getenv(TRACE_FILE_ENV) or DEFAULT_TRACE_FILE)
+    ]
+
+    records: list[dict[str, Any]] = []
+    for path in paths:
+        try:
+            with path.open(encoding="utf-8") as file:
+                records.extend(iter_span_records(file))
+        except OSError as error:
+            print(f"Could not read {path}: {error}", file=sys.stderr)
+            return 1
+
+    summaries = summarize_spans(records)
+    if not summaries:
+        print("No finished spans found.", file=sys.stderr)
+        return 1
+    print(format_summary_table(summaries))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from statistics import median
+from typing import Any, Mapping
+
+SRC_DIR = Path(__file__).resolve().parent
+IMPORT_BENCHMARK_OUTPUT_ENV = "AGENT_IMPORT_BENCHMARK_OUTPUT"
+IMPORT_BENCHMARK_RUNS_ENV = "AGENT_IMPORT_BENCHMARK_RUNS"
+DEFAULT_IMPORT_BENCHMARK_OUTPUT = "import-time-benchmark.json"
+DEFAULT_IMPORT_BENCHMARK_RUNS = 5
+TOP_MODULES_IN_REPORT = 15
+
+
+@dataclass(frozen=True)
+class ImportTarget:
+    name: str
+    module: str
+    budget_env: str
+    default_budget_ms: float | None
+    # Top-level packages this target must never import.
+    forbidden_packages: tuple[str, ...] = ()
+
+
+IMPORT_TARGETS = (
+    # `agent.py doctor` and the Infisical re-exec only load agent_config.
+    ImportTarget(
+        name="doctor",
+        module="agent_config",
+        budget_env="AGENT_IMPORT_BUDGET_DOCTOR_MS",
+        default_budget_ms=250,
+        forbidden_packages=("livekit", "httpx", "openai", "aiohttp"),
+    ),
+    ImportTarget(
+        name="worker",
+        module="agent",
+        budget_env="AGENT_IMPORT_BUDGET_WORKER_MS",
+        default_budget_ms=None,
+    ),
+)
+
+
+@dataclass(frozen=True)
+class ModuleImportTime:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass(frozen=True)
+class ImportTimeRun:
+    target: str
+    total_ms: float
+    modules: list[ModuleImportTime]
+
+
+def parse_importtime(stderr: str) -> list[ModuleImportTime]:
+    """Parse `python -X importtime` output into one entry per module."""
+    modules: list[ModuleImportTime] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3:
+            continue
+        self_us, cumulative_us, name = fields
+        try:
+            self_value = int(self_us)
+            cumulative_value = int(cumulative_us)
+        except ValueError:
+            # Header line: "self [us] | cumulative | imported package".
+            continue
+        # The module name is indented by two spaces per nesting level after
+        # the single separator space.
+        indent = len(name) - len(name.lstrip(" ")) - 1
+        modules.append(
+            ModuleImportTime(
+                module=name.strip(),
+                self_us=self_value,
+                cumulative_us=cumulative_value,
+                depth=max(indent // 2, 0),
+            )
+        )
+    return modules
+
+
+def total_import_ms(modules: list[ModuleImportTime]) -> float:
+    return sum(module.cumulative_us for module in modules if module.depth == 0) / 1000
+
+
+def without_startup_imports(
+    modules: list[ModuleImportTime],
+    startup_modules: frozenset[str],
+) -> list[ModuleImportTime]:
+    """Drop the top-level imports in `startup_modules` and their children.
+
+    `-X importtime` lists a module's nested imports before the module itself,
+    so each entry belongs to the next depth-0 entry after it.
+    """
+    kept: list[ModuleImportTime] = []
+    pending: list[ModuleImportTime] = []
+    for module in modules:
+        pending.append(module)
+        if module.depth == 0:
+            if module.module not in startup_modules:
+                kept.extend(pending)
+            pending = []
+    kept.extend(pending)
+    return kept
+
+
+def _run_importtime(code: str, python: str) -> list[ModuleImportTime]:
+    completed = subprocess.run(
+        [python, "-X", "importtime", "-c", code],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{code} failed: {completed.stderr.strip()[-500:]}")
+    return parse_importtime(completed.stderr)
+
+
+def measure_startup_modules(python: str = sys.executable) -> frozenset[str]:
+    """Top-level modules a bare interpreter imports before running any code."""
+    return frozenset(
+        module.module
+        for module in _run_importtime("pass", python)
+        if module.depth == 0
+    )
+
+
+def measure_import_time(
+    target: ImportTarget,
+    python: str = sys.executable,
+    startup_modules: frozenset[str] | None = None,
+) -> ImportTimeRun:
+    # Interpreter startup (site, encodings, ...) is the same for every target,
+    # so it is left out and the budget covers only what the import adds.
+    if startup_modules is None:
+        startup_modules = measure_startup_modules(python)
+    modules = without_startup_imports(
+        _run_importtime(f"import {target.module}", python),
+        startup_modules,
+    )
+    return ImportTimeRun(
+        target=target.name,
+        total_ms=total_import_ms(modules),
+        modules=modules,
+    )
+
+
+def summarize_target(
+    target: ImportTarget,
+    runs: list[ImportTimeRun],
+    budget_ms: float | None,
+) -> dict[str, Any]:
+    median_ms = median(run.total_ms for run in runs)
+    # Per-module costs come from the fastest run, which has the least noise.
+    fastest = min(runs, key=lambda run: run.total_ms)
+    loaded_packages = {module.module.split(".")[0] for module in fastest.modules}
+    forbidden_loaded = sorted(loaded_packages & set(target.forbidden_packages))
+    top_modules = sorted(fastest.modules, key=lambda module: -module.self_us)
+    return {
+        "target": target.name,
+        "module": target.module,
+        "runs": len(runs),
+        "median_ms": round(median_ms, 1),
+        "min_ms": round(fastest.total_ms, 1),
+        "max_ms": round(max(run.total_ms for run in runs), 1),
+        "module_count": len(fastest.modules),
+        "budget_ms": budget_ms,
+        "over_budget": budget_ms is not None and median_ms > budget_ms,
+        "forbidden_loaded": forbidden_loaded,
+        "top_modules": [
+            {
+                "module": module.module,
+                "self_ms": round(module.self_us / 1000, 1),
+                "cumulative_ms": round(module.cumulative_us / 1000, 1),
+            }
+            for module in top_modules[:TOP_MODULES_IN_REPORT]
+        ],
+    }
+
+
+def target_budget_ms(target: ImportTarget, env: Mapping[str, str]) -> float | None:
+    raw_value = env.get(target.budget_env)
+    if raw_value is None or not raw_value.strip():
+        return target.default_budget_ms
+    return float(raw_value)
+
+
+def run_import_benchmark(
+    env: Mapping[str, str] | None = None,
+    targets: tuple[ImportTarget, ...] = IMPORT_TARGETS,
+) -> list[dict[str, Any]]:
+    source_env = env if env is not None else os.environ
+    runs_per_target = int(
+        source_env.get(IMPORT_BENCHMARK_RUNS_ENV, DEFAULT_IMPORT_BENCHMARK_RUNS)
+    )
+    startup_modules = measure_startup_modules()
+    summaries = []
+    for target in targets:
+        runs = [
+            measure_import_time(target, startup_modules=startup_modules)
+            for _ in range(max(runs_per_target, 1))
+        ]
+        summaries.append(
+            summarize_target(target, runs, target_budget_ms(target, source_env))
+        )
+    return summaries
+
+
+def write_import_time_report(path: Path, summaries: list[dict[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "python": sys.version.split()[0],
+        "targets": summaries,
+    }
+    path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+
+def import_benchmark_failures(summaries: list[dict[str, Any]]) -> list[str]:
+    failures = []
+    for summary in summaries:
+        if summary["over_budget"]:
+            failures.append(
+                f"{summary['target']}: median {summary['median_ms']} ms exceeds "
+                f"budget {summary['budget_ms']} ms"
+            )
+        if summary["forbidden_loaded"]:
+            failures.append(
+                f"{summary['target']}: imports {', '.join(summary['forbidden_loaded'])}"
+            )
+    return failures
+
+
+def main() -> int:
+    output_path = Path(
+        os.getenv(IMPORT_BENCHMARK_OUTPUT_ENV, DEFAULT_IMPORT_BENCHMARK_OUTPUT)
+    )
+    summaries = run_import_benchmark()
+    write_import_time_report(output_path, summaries)
+    for summary in summaries:
+        print(
+            f"{summary['target']}: import {summary['module']} "
+            f"median={summary['median_ms']} ms modules={summary['module_count']}"
+        )
+    print(f"Wrote import time report to {output_path}")
+
+    failures = import_benchmark_failures(summaries)
+    for failure in failures:
+        print(f"Import time regression: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
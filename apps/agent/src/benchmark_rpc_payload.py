@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import timeit
+from typing import Any
+
+from agent_web_search import (
+    MAX_STATUS_RPC_PAYLOAD_BYTES,
+    _encode_status_messages,
+    _payload_bytes,
+)
+
+# Microbenchmark for encoding tool status payloads under the LiveKit RPC limit.
+# The cases are worst cases for the chunk encoder: far more sources than fit in
+# one message, and multibyte or escaped text that makes character counts differ
+# from bytes.
+
+MULTIBYTE_TEXT = "検索結果の要約 — résumé 🔎 \"quoted\"\n"
+
+
+def _source(index: int, text: str) -> dict[str, object]:
+    return {
+        "description": text * 8,
+        "provider": "parallel",
+        "published_at": "2026-01-01",
+        "title": f"{index}: {text}",
+        "url": f"https://example.com/{index}",
+    }
+
+
+def benchmark_payloads() -> dict[str, dict[str, Any]]:
+    return {
+        "fits": {
+            "state": "completed",
+            "provider": "parallel",
+            "summary": "Latest release notes",
+            "sources": [_source(index, "Release notes. ") for index in range(5)],
+        },
+        "many_ascii_sources": {
+            "state": "completed",
+            "provider": "parallel",
+            "summary": "Latest release notes",
+            "sources": [_source(index, "Release notes. ") for index in range(500)],
+        },
+        "many_multibyte_sources": {
+            "state": "completed",
+            "provider": "parallel",
+            "summary": MULTIBYTE_TEXT * 4,
+            "sources": [_source(index, MULTIBYTE_TEXT) for index in range(500)],
+        },
+        "multibyte_summary_and_error": {
+            "state": "failed",
+            "provider": "parallel",
+            "summary": MULTIBYTE_TEXT * 600,
+            "error": MULTIBYTE_TEXT * 600,
+            "sources": [_source(index, MULTIBYTE_TEXT) for index in range(50)],
+        },
+    }
+
+
+def run_rpc_payload_benchmark(number: int = 50) -> list[dict[str, Any]]:
+    summaries = []
+    for name, payload in benchmark_payloads().items():
+        seconds = min(
+            timeit.repeat(
+                lambda: _encode_status_messages(payload), number=number, repeat=5
+            )
+        )
+        messages = _encode_status_messages(payload)
+        summaries.append(
+            {
+                "case": name,
+                "us_per_call": round(seconds / number * 1_000_000, 1),
+                "messages": len(messages),
+                "max_message_bytes": max(map(_payload_bytes, messages)),
+            }
+        )
+    return summaries
+
+
+def main() -> int:
+    print(f"budget={MAX_STATUS_RPC_PAYLOAD_BYTES} B")
+    for summary in run_rpc_payload_benchmark():
+        print(
+            f"{summary['case']}: {summary['us_per_call']} us/call "
+            f"messages={summary['messages']} "
+            f"max_message={summary['max_message_bytes']} B"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tracemalloc
+from dataclasses import fields
+from pathlib import Path
+from typing import Any, Callable
+
+from agent_web_search import _format_results, _status_sources
+from web_search import SearchProviderConfig
+from web_search_providers import (
+    ExaSearchProvider,
+    ParallelSearchProvider,
+    PerplexitySearchProvider,
+)
+
+# Offline memory benchmark for search result handling. Synthetic provider
+# payloads are built before tracing starts, standing in for the decoded HTTP
+# response, so the numbers cover normalization plus the tool and status
+# formatting that run on every search.
+
+MEMORY_BENCHMARK_OUTPUT_ENV = "WEB_SEARCH_MEMORY_BENCHMARK_OUTPUT"
+MEMORY_BENCHMARK_RESULTS_ENV = "WEB_SEARCH_MEMORY_BENCHMARK_RESULTS"
+DEFAULT_MEMORY_BENCHMARK_OUTPUT = "search-memory-benchmark.json"
+DEFAULT_MEMORY_BENCHMARK_RESULTS = 10
+MEMORY_BENCHMARK_SEARCHES = 20
+
+PROVIDER_CLASSES = {
+    "parallel": ParallelSearchProvider,
+    "exa": ExaSearchProvider,
+    "perplexity": PerplexitySearchProvider,
+}
+
+
+def _text(seed: int, chars: int) -> str:
+    words = f"result {seed} covers current pricing, release notes and latency "
+    return (words * (chars // len(words) + 1))[:chars]
+
+
+def synthetic_items(provider: str, max_results: int) -> list[dict[str, Any]]:
+    items = []
+    for index in range(max_results):
+        item: dict[str, Any] = {
+            "title": f"Search result {index} - provider documentation",
+            "url": f"https://example.com/{provider}/{index}",
+        }
+        if provider == "parallel":
+            item["excerpts"] = [_text(index + part, 1_200) for part in range(6)]
+            item["publish_date"] = "2026-01-01"
+        elif provider == "exa":
+            item["highlights"] = [_text(index + part, 800) for part in range(4)]
+            item["text"] = _text(index, 20_000)
+            item["publishedDate"] = "2026-01-01"
+        else:
+            item["snippet"] = _text(index, 4_000)
+            item["date"] = "2026-01-01"
+        items.append(item)
+    return items
+
+
+def result_bytes(results: list[Any]) -> int:
+    """Bytes kept alive by a result list, including the field values.
+
+    Strings taken straight from the provider payload count too: a cached
+    result keeps them alive after the response itself is released.
+    """
+    total = sys.getsizeof(results)
+    for result in results:
+        total += sys.getsizeof(result)
+        instance_dict = getattr(result, "__dict__", None)
+        if instance_dict is not None:
+            total += sys.getsizeof(instance_dict)
+        for field in fields(result):
+            value = getattr(result, field.name)
+            if value is not None:
+                total += sys.getsizeof(value)
+    return total
+
+
+def measure_search_memory(
+    normalize: Callable[[dict[str, Any]], Any],
+    items: list[dict[str, Any]],
+    searches: int = MEMORY_BENCHMARK_SEARCHES,
+) -> dict[str, int]:
+    """Return bytes held per search and the traced allocation peak of a search."""
+    results = [normalize(item) for item in items]
+    held_bytes = result_bytes(results)
+    tracemalloc.start()
+    try:
+        for _ in range(searches):
+            results = [normalize(item) for item in items]
+            _format_results(results)
+            _status_sources(results)
+            del results
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"bytes_per_search": held_bytes, "peak_bytes": peak}
+
+
+def run_memory_benchmark(max_results: int) -> list[dict[str, Any]]:
+    summaries = []
+    for provider, provider_class in PROVIDER_CLASSES.items():
+        search_provider = provider_class(
+            SearchProviderConfig(api_key="benchmark"), http_client=None
+        )
+        items = synthetic_items(provider, max_results)
+        results = [search_provider._normalize_result(item) for item in items]
+        summaries.append(
+            {
+                "provider": provider,
+                "max_results": max_results,
+                "snippet_chars": sum(len(result.snippet) for result in results),
+                **measure_search_memory(search_provider._normalize_result, items),
+            }
+        )
+    return summaries
+
+
+def main() -> int:
+    output_path = Path(
+        os.getenv(MEMORY_BENCHMARK_OUTPUT_ENV, DEFAULT_MEMORY_BENCHMARK_OUTPUT)
+    )
+    max_results = int(
+        os.getenv(MEMORY_BENCHMARK_RESULTS_ENV) or DEFAULT_MEMORY_BENCHMARK_RESULTS
+    )
+    summaries = run_memory_benchmark(max_results)
+    output_path.write_text(json.dumps({"providers": summaries}, indent=2) + "\n")
+    for summary in summaries:
+        print(
+            f"{summary['provider']}: held={summary['bytes_per_search']} B/search "
+            f"peak={summary['peak_bytes']} B snippet_chars={summary['snippet_chars']}"
+        )
+    print(f"Wrote search memory report to {output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
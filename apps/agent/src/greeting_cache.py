@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Mapping
+
+from livekit import rtc
+
+logger = logging.getLogger(__name__)
+
+GREETING_CACHE_DIR_ENV = "LIVEKIT_AGENT_GREETING_CACHE_DIR"
+GREETING_CACHE_TTL_SECONDS_ENV = "LIVEKIT_AGENT_GREETING_CACHE_TTL_SECONDS"
+DEFAULT_GREETING_CACHE_TTL_SECONDS = 86_400
+GREETING_FRAME_MS = 20
+GREETING_CACHE_VERSION = 2
+BYTES_PER_SAMPLE = 2
+
+
+@dataclass(frozen=True)
+class CachedGreeting:
+    text: str
+    sample_rate: int
+    num_channels: int
+    pcm: bytes
+
+    @property
+    def duration_seconds(self) -> float:
+        samples = len(self.pcm) // (BYTES_PER_SAMPLE * self.num_channels)
+        return samples / self.sample_rate
+
+    async def frames(self) -> AsyncIterator[rtc.AudioFrame]:
+        samples_per_frame = self.sample_rate * GREETING_FRAME_MS // 1000
+        frame_bytes = samples_per_frame * self.num_channels * BYTES_PER_SAMPLE
+        for offset in range(0, len(self.pcm), frame_bytes):
+            chunk = self.pcm[offset : offset + frame_bytes]
+            yield rtc.AudioFrame(
+                data=chunk,
+                sample_rate=self.sample_rate,
+                num_channels=self.num_channels,
+                samples_per_channel=len(chunk) // (self.num_channels * BYTES_PER_SAMPLE),
+            )
+
+
+def greeting_cache_key(*parts: Any) -> str:
+    payload = json.dumps(
+        [GREETING_CACHE_VERSION, *parts],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class GreetingAudioCache:
+    """Rendered greeting text and PCM audio stored on local disk.
+
+    Each entry is a JSON metadata file plus a raw 16-bit PCM file, written
+    atomically so concurrent jobs never read a partial greeting. Entries older
+    than `ttl_seconds` are treated as a miss and rendered again.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        ttl_seconds: float = DEFAULT_GREETING_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def load(self, key: str) -> CachedGreeting | None:
+        try:
+            metadata = json.loads(self._metadata_path(key).read_text("utf-8"))
+            pcm = self._audio_path(key).read_bytes()
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(metadata, dict) or not pcm:
+            return None
+        try:
+            if self.clock() - float(metadata["created_at"]) >= self.ttl_seconds:
+                return None
+            return CachedGreeting(
+                text=str(metadata["text"]),
+                sample_rate=int(metadata["sample_rate"]),
+                num_channels=int(metadata["num_channels"]),
+                pcm=pcm,
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def store(self, key: str, greeting: CachedGreeting) -> None:
+        # Audio first, so a metadata file always points at complete audio.
+        self._write_atomic(self._audio_path(key), greeting.pcm)
+        self._write_atomic(
+            self._metadata_path(key),
+            json.dumps(
+                {
+                    "text": greeting.text,
+                    "sample_rate": greeting.sample_rate,
+                    "num_channels": greeting.num_channels,
+                    "created_at": self.clock(),
+                }
+            ).encode("utf-8"),
+        )
+
+    def _metadata_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _audio_path(self, key: str) -> Path:
+        return self.directory / f"{key}.pcm"
+
+    def _write_atomic(self, path: Path, data: bytes) -> None:
+        fd, temp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+            os.replace(temp_name, path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+
+
+class GreetingRecorder:
+    """Collects the audio frames of a greeting while it is being spoken.
+
+    The frames are tapped from the live TTS output, so caching a greeting
+    does not pay for a second synthesis.
+    """
+
+    def __init__(self) -> None:
+        self.sample_rate = 0
+        self.num_channels = 0
+        self._pcm = bytearray()
+        self._mismatched = False
+
+    def add(self, frame: rtc.AudioFrame) -> None:
+        if not self._pcm:
+            self.sample_rate = frame.sample_rate
+            self.num_channels = frame.num_channels
+        elif (frame.sample_rate, frame.num_channels) != (
+            self.sample_rate,
+            self.num_channels,
+        ):
+            self._mismatched = True
+        self._pcm.extend(bytes(frame.data))
+
+    def greeting(self, text: str) -> CachedGreeting | None:
+        if self._mismatched or not self._pcm or not self.sample_rate:
+            return None
+        return CachedGreeting(
+            text=text,
+            sample_rate=self.sample_rate,
+            num_channels=self.num_channels,
+            pcm=bytes(self._pcm),
+        )
+
+
+def create_greeting_cache(env: Mapping[str, str | None]) -> GreetingAudioCache | None:
+    directory = (env.get(GREETING_CACHE_DIR_ENV) or "").strip()
+    if not directory:
+        return None
+    ttl_seconds = float(
+        env.get(GREETING_CACHE_TTL_SECONDS_ENV) or DEFAULT_GREETING_CACHE_TTL_SECONDS
+    )
+    try:
+        return GreetingAudioCache(Path(directory).expanduser(), ttl_seconds)
+    except OSError as error:
+        logger.warning("Greeting audio cache disabled: %s", error)
+        return None
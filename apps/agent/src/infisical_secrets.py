@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Mapping, MutableMapping
+
+from dotenv import dotenv_values
+
+# Secret loading for the agent preflight. Like agent_config, this module only
+# imports the stdlib and dotenv; `cryptography` is imported lazily and only
+# when the encrypted cache is enabled.
+
+SECRETS_FILE_ENV = "LIVEKIT_AGENT_SECRETS_FILE"
+SECRETS_CACHE_KEY_ENV = "LIVEKIT_AGENT_SECRETS_CACHE_KEY"
+SECRETS_CACHE_DIR_ENV = "LIVEKIT_AGENT_SECRETS_CACHE_DIR"
+SECRETS_CACHE_TTL_SECONDS_ENV = "LIVEKIT_AGENT_SECRETS_CACHE_TTL_SECONDS"
+DEFAULT_SECRETS_CACHE_DIR = "~/.cache/starter-agent/secrets"
+DEFAULT_SECRETS_CACHE_TTL_SECONDS = 900
+INFISICAL_EXPORT_TIMEOUT_SECONDS = 30
+
+SECRETS_SOURCE_FILE = "file"
+SECRETS_SOURCE_CACHE = "cache"
+SECRETS_SOURCE_INFISICAL = "infisical"
+
+CommandRunner = Callable[..., subprocess.CompletedProcess[str]]
+
+
+class SecretLoadError(RuntimeError):
+    pass
+
+
+def parse_infisical_export(output: str) -> dict[str, str]:
+    """Parse `infisical export --format=json` output into a name/value map."""
+    try:
+        payload = json.loads(output)
+    except json.JSONDecodeError as error:
+        raise SecretLoadError(
+            f"infisical export returned invalid JSON: {error}"
+        ) from error
+
+    if isinstance(payload, dict):
+        return {str(key): str(value) for key, value in payload.items()}
+    if not isinstance(payload, list):
+        raise SecretLoadError("infisical export returned an unexpected payload")
+
+    secrets: dict[str, str] = {}
+    for item in payload:
+        if not isinstance(item, dict) or not isinstance(item.get("key"), str):
+            continue
+        value = item.get("value")
+        secrets[item["key"]] = "" if value is None else str(value)
+    return secrets
+
+
+def export_infisical_secrets(
+    infisical_env: str,
+    project_id: str | None,
+    infisical: str | None = None,
+    runner: CommandRunner = subprocess.run,
+) -> dict[str, str]:
+    infisical = infisical or shutil.which("infisical")
+    if not infisical:
+        raise SecretLoadError("could not find the `infisical` CLI")
+
+    command = [infisical, "export", "--env", infisical_env, "--format", "json"]
+    if project_id:
+        command.extend(["--projectId", project_id])
+    try:
+        completed = runner(
+            command,
+            capture_output=True,
+            text=True,
+            timeout=INFISICAL_EXPORT_TIMEOUT_SECONDS,
+            check=False,
+        )
+    except (OSError, subprocess.TimeoutExpired) as error:
+        raise SecretLoadError(f"infisical export failed: {error}") from error
+
+    if completed.returncode != 0:
+        detail = (completed.stderr or "").strip().splitlines()
+        raise SecretLoadError(
+            f"infisical export exited with {completed.returncode}"
+            + (f": {detail[-1]}" if detail else "")
+        )
+    return parse_infisical_export(completed.stdout)
+
+
+def read_secrets_file(path: Path) -> dict[str, str]:
+    if not path.is_file():
+        raise SecretLoadError(f"secrets file {path} does not exist")
+    return {
+        key: value
+        for key, value in dotenv_values(path).items()
+        if value is not None
+    }
+
+
+class EncryptedSecretsCache:
+    """Fernet-encrypted secrets on local disk, one file per project and env.
+
+    Entries older than `ttl_seconds` are rejected by the Fernet timestamp
+    check, and unreadable or tampered files are treated as a cache miss.
+    """
+
+    def __init__(self, directory: Path, fernet: Any, ttl_seconds: int) -> None:
+        self.directory = directory
+        self.fernet = fernet
+        self.ttl_seconds = ttl_seconds
+
+    def path(self, project_id: str | None, infisical_env: str) -> Path:
+        digest = hashlib.sha256(
+            f"{project_id or ''}\0{infisical_env}".encode("utf-8")
+        ).hexdigest()
+        return self.directory / f"{digest[:32]}.secrets"
+
+    def load(self, project_id: str | None, infisical_env: str) -> dict[str, str] | None:
+        try:
+            token = self.path(project_id, infisical_env).read_bytes()
+            payload = json.loads(self.fernet.decrypt(token, ttl=self.ttl_seconds))
+        except Exception:
+            return None
+        if not isinstance(payload, dict):
+            return None
+        return {str(key): str(value) for key, value in payload.items()}
+
+    def store(
+        self,
+        project_id: str | None,
+        infisical_env: str,
+        secrets: dict[str, str],
+    ) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True, mode=0o700)
+        token = self.fernet.encrypt(json.dumps(secrets).encode("utf-8"))
+        fd, temp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            os.fchmod(fd, 0o600)
+            with os.fdopen(fd, "wb") as file:
+                file.write(token)
+            os.replace(temp_name, self.path(project_id, infisical_env))
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+
+
+def create_secrets_cache(
+    env: Mapping[str, str],
+) -> EncryptedSecretsCache | None:
+    key = (env.get(SECRETS_CACHE_KEY_ENV) or "").strip()
+    if not key:
+        return None
+
+    try:
+        from cryptography.fernet import Fernet
+    except ImportError as error:
+        raise SecretLoadError(
+            f"{SECRETS_CACHE_KEY_ENV} is set but the `cryptography` package is "
+            "not installed"
+        ) from error
+    try:
+        fernet = Fernet(key.encode("utf-8"))
+    except ValueError as error:
+        raise SecretLoadError(
+            f"{SECRETS_CACHE_KEY_ENV} is not a Fernet key: {error}"
+        ) from error
+
+    directory = env.get(SECRETS_CACHE_DIR_ENV) or DEFAULT_SECRETS_CACHE_DIR
+    ttl_seconds = int(
+        env.get(SECRETS_CACHE_TTL_SECONDS_ENV) or DEFAULT_SECRETS_CACHE_TTL_SECONDS
+    )
+    return EncryptedSecretsCache(Path(directory).expanduser(), fernet, ttl_seconds)
+
+
+def load_secrets(
+    env: Mapping[str, str],
+    infisical_env: str,
+    project_id: str | None,
+    export: Callable[[str, str | None], dict[str, str]] = export_infisical_secrets,
+) -> tuple[dict[str, str], str]:
+    """Load secrets from the stand-in file, the encrypted cache or Infisical.
+
+    Returns the secrets and the name of the source they came from.
+    """
+    secrets_file = (env.get(SECRETS_FILE_ENV) or "").strip()
+    if secrets_file:
+        return read_secrets_file(Path(secrets_file).expanduser()), SECRETS_SOURCE_FILE
+
+    cache = create_secrets_cache(env)
+    if cache is not None:
+        cached = cache.load(project_id, infisical_env)
+        if cached is not None:
+            return cached, SECRETS_SOURCE_CACHE
+
+    secrets = export(infisical_env, project_id)
+    if cache is not None:
+        try:
+            cache.store(project_id, infisical_env, secrets)
+        except OSError:
+            # A read-only cache directory only costs the next start a fetch.
+            pass
+    return secrets, SECRETS_SOURCE_INFISICAL
+
+
+def inject_secrets(secrets: dict[str, str], env: MutableMapping[str, str]) -> list[str]:
+    """Add secrets to `env` without overriding values already set."""
+    injected = []
+    for key, value in secrets.items():
+        if env.get(key):
+            continue
+        env[key] = value
+        injected.append(key)
+    return injected
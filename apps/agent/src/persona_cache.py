@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+PERSONA_CACHE_HIT = "hit"
+PERSONA_CACHE_STALE = "stale"
+PERSONA_CACHE_MISS = "miss"
+
+PersonaCacheKey = tuple[str, str]
+
+
+@dataclass(frozen=True)
+class PersonaFetchResult:
+    """Result of one persona request.
+
+    `persona` is None when the server answered 304 Not Modified for the
+    ETag we sent. Fallback personas used after a failed request are not
+    cacheable, so the next lookup retries the server.
+    """
+
+    persona: Any
+    etag: str | None = None
+    cacheable: bool = True
+
+
+PersonaLoader = Callable[[str, str | None, str | None], Awaitable[PersonaFetchResult]]
+
+
+@dataclass(frozen=True)
+class PersonaCacheLookup:
+    persona: Any
+    status: str
+
+
+@dataclass
+class PersonaCacheStats:
+    requests: int = 0
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    not_modified: int = 0
+    refresh_failures: int = 0
+    coalesced: int = 0
+    last_refresh_ms: float | None = None
+
+    @property
+    def hit_ratio(self) -> float:
+        if self.requests == 0:
+            return 0.0
+        return (self.hits + self.stale_hits) / self.requests
+
+
+@dataclass
+class _PersonaEntry:
+    persona: Any
+    etag: str | None
+    fetched_at: float
+
+
+class PersonaConfigCache:
+    """Per-process persona cache with ETag revalidation.
+
+    Fresh entries are served directly. Entries past `ttl_seconds` but within
+    `stale_seconds` are served immediately while one background request
+    revalidates them with If-None-Match, unless `serve_stale` rejects the
+    cached persona. Older, rejected, or missing entries are fetched before
+    returning, and concurrent lookups for the same key share one request.
+    """
+
+    def __init__(
+        self,
+        loader: PersonaLoader,
+        ttl_seconds: float,
+        stale_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+        serve_stale: Callable[[Any], bool] | None = None,
+    ) -> None:
+        self.loader = loader
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.clock = clock
+        self.serve_stale = serve_stale
+        self.stats = PersonaCacheStats()
+        self._entries: dict[PersonaCacheKey, _PersonaEntry] = {}
+        self._refreshing: dict[PersonaCacheKey, asyncio.Task[Any]] = {}
+
+    async def get(self, persona_id: str, user_id: str | None) -> PersonaCacheLookup:
+        key = (persona_id, user_id or "")
+        self.stats.requests += 1
+        entry = self._entries.get(key)
+        age = self.clock() - entry.fetched_at if entry is not None else None
+
+        if entry is not None and age is not None and age < self.ttl_seconds:
+            self.stats.hits += 1
+            return PersonaCacheLookup(entry.persona, PERSONA_CACHE_HIT)
+
+        if (
+            entry is not None
+            and age is not None
+            and age < self.ttl_seconds + self.stale_seconds
+            and (self.serve_stale is None or self.serve_stale(entry.persona))
+        ):
+            self.stats.stale_hits += 1
+            self._start_background_refresh(key)
+            return PersonaCacheLookup(entry.persona, PERSONA_CACHE_STALE)
+
+        self.stats.misses += 1
+        task = self._refreshing.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = self._start_refresh(key)
+        else:
+            self.stats.coalesced += 1
+        persona = await asyncio.shield(task)
+        return PersonaCacheLookup(persona, PERSONA_CACHE_MISS)
+
+    def clear(self) -> None:
+        for task in self._refreshing.values():
+            task.cancel()
+        self._refreshing.clear()
+        self._entries.clear()
+
+    def _start_background_refresh(self, key: PersonaCacheKey) -> None:
+        task = self._refreshing.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            return
+
+        task = self._start_refresh(key)
+        task.add_done_callback(lambda done: self._report_background_failure(key, done))
+
+    def _start_refresh(self, key: PersonaCacheKey) -> asyncio.Task[Any]:
+        task = asyncio.create_task(self._refresh(key))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda done: self._forget(key, done))
+        return task
+
+    def _report_background_failure(
+        self,
+        key: PersonaCacheKey,
+        task: asyncio.Task[Any],
+    ) -> None:
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is None:
+            return
+        self.stats.refresh_failures += 1
+        logger.warning(
+            "persona_cache_refresh_failed persona_id=%s error=%s",
+            key[0],
+            error,
+        )
+
+    async def _refresh(self, key: PersonaCacheKey) -> Any:
+        persona_id, user_id = key
+        entry = self._entries.get(key)
+        started = time.perf_counter()
+        result = await self.loader(
+            persona_id,
+            user_id or None,
+            entry.etag if entry is not None else None,
+        )
+        self.stats.last_refresh_ms = (time.perf_counter() - started) * 1000
+
+        if result.persona is None and entry is not None:
+            self.stats.not_modified += 1
+            entry.fetched_at = self.clock()
+            return entry.persona
+
+        if result.cacheable:
+            self._entries[key] = _PersonaEntry(
+                persona=result.persona,
+                etag=result.etag,
+                fetched_at=self.clock(),
+            )
+        return result.persona
+
+    def _forget(self, key: PersonaCacheKey, task: asyncio.Task[Any]) -> None:
+        if self._refreshing.get(key) is task:
+            del self._refreshing[key]
@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Callable, Mapping
+
+logger = logging.getLogger(__name__)
+
+METRICS_DIR_ENV = "LIVEKIT_AGENT_METRICS_DIR"
+METRICS_DUMP_SECONDS_ENV = "LIVEKIT_AGENT_METRICS_DUMP_SECONDS"
+LOG_SAMPLE_RATE_ENV = "LIVEKIT_AGENT_LOG_SAMPLE_RATE"
+DEFAULT_METRICS_DUMP_SECONDS = 30.0
+DEFAULT_LOG_SAMPLE_RATE = 0.1
+DEFAULT_METRICS_WINDOW = 512
+
+# Per-turn stages, in pipeline order: end of user speech -> end-of-utterance
+# decision / final transcript -> LLM first token -> tool call -> TTS first
+# audio, plus the end-to-end time from end of speech to agent speech.
+STAGE_EOU_DELAY = "eou_delay"
+STAGE_TRANSCRIPTION_DELAY = "transcription_delay"
+STAGE_LLM_TTFT = "llm_ttft"
+STAGE_TOOL = "tool"
+STAGE_TTS_TTFB = "tts_ttfb"
+STAGE_RESPONSE = "response"
+TURN_STAGES = (
+    STAGE_EOU_DELAY,
+    STAGE_TRANSCRIPTION_DELAY,
+    STAGE_LLM_TTFT,
+    STAGE_TOOL,
+    STAGE_TTS_TTFB,
+    STAGE_RESPONSE,
+)
+
+LATENCY_BUCKETS_SECONDS = (
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    0.75,
+    1.0,
+    1.5,
+    2.0,
+    3.0,
+    5.0,
+    10.0,
+)
+PROMETHEUS_METRIC = "portfolio_agent_turn_stage_seconds"
+
+
+class RingBuffer:
+    """Fixed-capacity float buffer that keeps the most recent samples."""
+
+    __slots__ = ("_values", "_next", "_count")
+
+    def __init__(self, capacity: int) -> None:
+        self._values = array("d", bytes(8 * max(capacity, 1)))
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, value: float) -> None:
+        self._values[self._next] = value
+        self._next = (self._next + 1) % len(self._values)
+        if self._count < len(self._values):
+            self._count += 1
+
+    def values(self) -> list[float]:
+        if self._count < len(self._values):
+            return self._values[: self._count].tolist()
+        return (self._values[self._next :] + self._values[: self._next]).tolist()
+
+
+class LatencyHistogram:
+    """Cumulative bucket counts plus a ring buffer of recent samples.
+
+    Bucket counts and sums never reset, matching Prometheus histogram
+    semantics; percentiles are computed from the recent window only.
+    """
+
+    __slots__ = ("buckets", "counts", "count", "sum", "recent")
+
+    def __init__(
+        self,
+        buckets: tuple[float, ...] = LATENCY_BUCKETS_SECONDS,
+        window: int = DEFAULT_METRICS_WINDOW,
+    ) -> None:
+        self.buckets = buckets
+        self.counts = array("Q", bytes(8 * (len(buckets) + 1)))
+        self.count = 0
+        self.sum = 0.0
+        self.recent = RingBuffer(window)
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.recent.append(seconds)
+
+    def percentile(self, fraction: float) -> float | None:
+        values = sorted(self.recent.values())
+        if not values:
+            return None
+        index = min(int(fraction * len(values)), len(values) - 1)
+        return values[index]
+
+
+class TurnMetrics:
+    """Process-wide latency histograms for each stage of a conversation turn."""
+
+    def __init__(self, window: int = DEFAULT_METRICS_WINDOW) -> None:
+        self.histograms = {stage: LatencyHistogram(window=window) for stage in TURN_STAGES}
+
+    def observe(self, stage: str, seconds: float | None) -> None:
+        if seconds is None or seconds < 0:
+            return
+        self.histograms[stage].observe(seconds)
+
+    def observe_livekit_metrics(self, metrics: Any) -> None:
+        """Record the turn stages carried by a LiveKit `metrics_collected` event."""
+        metrics_type = getattr(metrics, "type", None)
+        if metrics_type == "eou_metrics":
+            self.observe(STAGE_EOU_DELAY, metrics.end_of_utterance_delay)
+            self.observe(STAGE_TRANSCRIPTION_DELAY, metrics.transcription_delay)
+        elif metrics_type == "llm_metrics" and not metrics.cancelled:
+            self.observe(STAGE_LLM_TTFT, metrics.ttft)
+        elif metrics_type == "tts_metrics" and not metrics.cancelled:
+            self.observe(STAGE_TTS_TTFB, metrics.ttfb)
+
+    def as_dict(self) -> dict[str, Any]:
+        stages = {}
+        for stage, histogram in self.histograms.items():
+            p50 = histogram.percentile(0.5)
+            p95 = histogram.percentile(0.95)
+            stages[stage] = {
+                "count": histogram.count,
+                "mean_ms": (
+                    round(histogram.sum / histogram.count * 1000, 1)
+                    if histogram.count
+                    else None
+                ),
+                "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            }
+        return {"pid": os.getpid(), "stages": stages}
+
+    def render_prometheus(self) -> str:
+        # Every job process writes its own file, so the pid label keeps their
+        # series apart when a textfile collector merges them.
+        pid = os.getpid()
+        lines = [
+            f"# HELP {PROMETHEUS_METRIC} Latency of each conversation turn stage.",
+            f"# TYPE {PROMETHEUS_METRIC} histogram",
+        ]
+        for stage, histogram in self.histograms.items():
+            labels = f'pid="{pid}",stage="{stage}"'
+            cumulative = 0
+            # The last count is the overflow bucket, rendered as +Inf below.
+            for bound, count in zip(
+                histogram.buckets, histogram.counts[:-1], strict=True
+            ):
+                cumulative += count
+                lines.append(
+                    f'{PROMETHEUS_METRIC}_bucket{{{labels},le="{bound:g}"}} '
+                    f"{cumulative}"
+                )
+            lines.append(
+                f'{PROMETHEUS_METRIC}_bucket{{{labels},le="+Inf"}} {histogram.count}'
+            )
+            lines.append(f"{PROMETHEUS_METRIC}_sum{{{labels}}} {histogram.sum:.6f}")
+            lines.append(f"{PROMETHEUS_METRIC}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+class LogSampler:
+    """Decide whether a high-volume event should be formatted and logged."""
+
+    def __init__(
+        self,
+        rate: float,
+        random_fn: Callable[[], float] = random.random,
+    ) -> None:
+        self.rate = min(max(rate, 0.0), 1.0)
+        self.random_fn = random_fn
+
+    def sample(self) -> bool:
+        if self.rate >= 1.0:
+            return True
+        if self.rate <= 0.0:
+            return False
+        return self.random_fn() < self.rate
+
+
+def load_log_sample_rate(env: Mapping[str, str | None]) -> float:
+    raw_value = (env.get(LOG_SAMPLE_RATE_ENV) or "").strip()
+    if not raw_value:
+        return DEFAULT_LOG_SAMPLE_RATE
+    try:
+        return float(raw_value)
+    except ValueError:
+        logger.warning("Ignoring invalid %s=%r", LOG_SAMPLE_RATE_ENV, raw_value)
+        return DEFAULT_LOG_SAMPLE_RATE
+
+
+class MetricsDumper:
+    """Write the turn metrics as JSON and Prometheus textfile snapshots.
+
+    Each job process writes its own `turn-metrics-<pid>.{json,prom}` pair, so
+    a node exporter textfile collector or a log shipper can pick them up
+    without the job processes sharing a port. The pair is deleted when the
+    process closes the dumper, and `start` also deletes pairs left behind by
+    processes that are no longer running.
+    """
+
+    def __init__(
+        self,
+        metrics: TurnMetrics,
+        directory: Path,
+        interval_seconds: float = DEFAULT_METRICS_DUMP_SECONDS,
+    ) -> None:
+        self.metrics = metrics
+        self.directory = directory
+        self.interval_seconds = interval_seconds
+        self._task: asyncio.Task[None] | None = None
+
+    def dump(self) -> None:
+        json_path, prom_path = self._paths(os.getpid())
+        self._write_atomic(
+            json_path,
+            json.dumps(
+                {"written_at": time.time(), **self.metrics.as_dict()},
+                separators=(",", ":"),
+            ),
+        )
+        self._write_atomic(prom_path, self.metrics.render_prometheus())
+
+    def start(self) -> None:
+        self._remove_dead_process_files()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="turn_metrics_dump")
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._remove_files(os.getpid())
+
+    def _paths(self, pid: int) -> tuple[Path, Path]:
+        return (
+            self.directory / f"turn-metrics-{pid}.json",
+            self.directory / f"turn-metrics-{pid}.prom",
+        )
+
+    def _remove_files(self, pid: int) -> None:
+        for path in self._paths(pid):
+            try:
+                path.unlink(missing_ok=True)
+            except OSError as error:
+                logger.warning(
+                    "turn_metrics_remove_failed path=%s error=%s", path, error
+                )
+
+    def _remove_dead_process_files(self) -> None:
+        try:
+            paths = list(self.directory.glob("turn-metrics-*.prom"))
+        except OSError:
+            return
+        for path in paths:
+            pid = path.stem.removeprefix("turn-metrics-")
+            if pid.isdigit() and not _process_is_running(int(pid)):
+                self._remove_files(int(pid))
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            self._dump_quietly()
+
+    def _dump_quietly(self) -> None:
+        try:
+            self.dump()
+        except OSError as error:
+            logger.warning("turn_metrics_dump_failed error=%s", error)
+
+    def _write_atomic(self, path: Path, text: str) -> None:
+        fd, temp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                file.write(text)
+            os.replace(temp_name, path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+
+
+def _process_is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def create_metrics_dumper(
+    metrics: TurnMetrics,
+    env: Mapping[str, str | None],
+) -> MetricsDumper | None:
+    directory = (env.get(METRICS_DIR_ENV) or "").strip()
+    if not directory:
+        return None
+    try:
+        interval_seconds = float(
+            env.get(METRICS_DUMP_SECONDS_ENV) or DEFAULT_METRICS_DUMP_SECONDS
+        )
+        path = Path(directory).expanduser()
+        path.mkdir(parents=True, exist_ok=True)
+    except (OSError, ValueError) as error:
+        logger.warning("Turn metrics dump disabled: %s", error)
+        return None
+    return MetricsDumper(metrics, path, interval_seconds)
+
+
+_shared_turn_metrics: TurnMetrics | None = None
+
+
+def get_shared_turn_metrics() -> TurnMetrics:
+    global _shared_turn_metrics
+    if _shared_turn_metrics is None:
+        _shared_turn_metrics = TurnMetrics()
+    return _shared_turn_metrics
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterator, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class StartupStage:
+    name: str
+    start_ms: float
+    duration_ms: float | None = None
+    ok: bool = True
+
+
+class StartupTrace:
+    """Per-job timings for the startup pipeline, relative to job start.
+
+    Stages may overlap; each records when it started and how long it ran, so
+    the logged trace shows which stage is on the critical path to the first
+    greeting.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.job_id = job_id
+        self.clock = clock
+        self.started_at = clock()
+        self.stages: list[StartupStage] = []
+        self.attributes: dict[str, Any] = {}
+
+    async def run(self, name: str, awaitable: Awaitable[T]) -> T:
+        stage = self._begin(name)
+        try:
+            return await awaitable
+        except BaseException:
+            stage.ok = False
+            raise
+        finally:
+            self._end(stage)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        stage = self._begin(name)
+        try:
+            yield
+        except BaseException:
+            stage.ok = False
+            raise
+        finally:
+            self._end(stage)
+
+    def track(self, name: str, task: asyncio.Task[Any] | None) -> None:
+        """Record a background task that may still be running at log time."""
+        if task is None:
+            return
+
+        stage = self._begin(name)
+
+        def _on_done(done: asyncio.Task[Any]) -> None:
+            stage.ok = not done.cancelled() and done.exception() is None
+            self._end(stage)
+
+        task.add_done_callback(_on_done)
+
+    def mark(self, name: str) -> None:
+        stage = self._begin(name)
+        stage.duration_ms = 0.0
+
+    def elapsed_ms(self) -> float:
+        return (self.clock() - self.started_at) * 1000
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            **self.attributes,
+            "total_ms": round(self.elapsed_ms(), 1),
+            "stages": [
+                {
+                    "name": stage.name,
+                    "start_ms": round(stage.start_ms, 1),
+                    "duration_ms": (
+                        round(stage.duration_ms, 1)
+                        if stage.duration_ms is not None
+                        else None
+                    ),
+                    "ok": stage.ok,
+                }
+                for stage in self.stages
+            ],
+        }
+
+    def log(self) -> None:
+        logger.info(
+            "portfolio_agent_startup_trace %s",
+            json.dumps(self.as_dict(), separators=(",", ":")),
+        )
+
+    def _begin(self, name: str) -> StartupStage:
+        stage = StartupStage(name=name, start_ms=self.elapsed_ms())
+        self.stages.append(stage)
+        return stage
+
+    def _end(self, stage: StartupStage) -> None:
+        stage.duration_ms = self.elapsed_ms() - stage.start_ms
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+TtsPoolKey = tuple[Hashable, ...]
+
+
+@dataclass
+class TtsPoolStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    idle_closed: int = 0
+
+
+@dataclass
+class _PooledEngine:
+    engine: Any
+    last_used: float
+    active: int = 0
+
+
+def tts_pool_key(persona: Any) -> TtsPoolKey:
+    return (
+        persona.tts_model,
+        persona.tts_voice_id,
+        persona.tts_language,
+        tuple(sorted(persona.tts_options.items())),
+        persona.requires_cartesia_plugin,
+    )
+
+
+class TtsEnginePool:
+    """Bounded LRU pool of TTS engines keyed by persona voice settings.
+
+    New engines are prewarmed when created so the first utterance after a
+    persona switch does not pay for connection setup. Engines in use by a
+    session are never evicted; released engines are closed once they have
+    been idle for `idle_seconds` or fall out of the LRU.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[Any], Any],
+        max_size: int,
+        idle_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.factory = factory
+        self.max_size = max_size
+        self.idle_seconds = idle_seconds
+        self.clock = clock
+        self.stats = TtsPoolStats()
+        self._engines: OrderedDict[TtsPoolKey, _PooledEngine] = OrderedDict()
+        self._closing: set[asyncio.Task[None]] = set()
+
+    def __len__(self) -> int:
+        return len(self._engines)
+
+    def acquire(self, persona: Any) -> tuple[Any, bool]:
+        """Return a warm engine for the persona and whether it was pooled."""
+        self.close_idle()
+        key = tts_pool_key(persona)
+        entry = self._engines.get(key)
+        if entry is not None:
+            self.stats.hits += 1
+            self._engines.move_to_end(key)
+            entry.active += 1
+            entry.last_used = self.clock()
+            return entry.engine, True
+
+        self.stats.misses += 1
+        entry = _PooledEngine(self._create(persona), last_used=self.clock(), active=1)
+        self._engines[key] = entry
+        self._evict()
+        return entry.engine, False
+
+    def release(self, engine: Any) -> None:
+        for entry in self._engines.values():
+            if entry.engine is engine:
+                entry.active = max(entry.active - 1, 0)
+                entry.last_used = self.clock()
+                return
+
+    def close_idle(self) -> None:
+        oldest = self.clock() - self.idle_seconds
+        for key, entry in list(self._engines.items()):
+            if entry.active == 0 and entry.last_used < oldest:
+                del self._engines[key]
+                self.stats.idle_closed += 1
+                self._close(entry.engine)
+
+    async def aclose(self) -> None:
+        engines = [entry.engine for entry in self._engines.values()]
+        self._engines.clear()
+        for engine in engines:
+            self._close(engine)
+        if self._closing:
+            await asyncio.gather(*self._closing, return_exceptions=True)
+
+    def _create(self, persona: Any) -> Any:
+        engine = self.factory(persona)
+        prewarm = getattr(engine, "prewarm", None)
+        if callable(prewarm):
+            try:
+                prewarm()
+            except Exception:
+                logger.debug("TTS prewarm failed", exc_info=True)
+        return engine
+
+    def _evict(self) -> None:
+        for key, entry in list(self._engines.items()):
+            if len(self._engines) <= self.max_size:
+                return
+            if entry.active == 0:
+                del self._engines[key]
+                self.stats.evictions += 1
+                self._close(entry.engine)
+
+    def _close(self, engine: Any) -> None:
+        aclose = getattr(engine, "aclose", None)
+        if not callable(aclose):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(aclose())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+
+class TtsSwitchLatency:
+    """Time from a persona TTS switch to the agent's next speech."""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self.clock = clock
+        self._switched_at: float | None = None
+        self._pool_hit = False
+
+    def switched(self, pool_hit: bool) -> None:
+        self._switched_at = self.clock()
+        self._pool_hit = pool_hit
+
+    def speech_started(self) -> tuple[float, bool] | None:
+        if self._switched_at is None:
+            return None
+        latency_ms = (self.clock() - self._switched_at) * 1000
+        self._switched_at = None
+        return latency_ms, self._pool_hit
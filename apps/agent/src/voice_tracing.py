@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from typing import Any, Mapping, Sequence
+
+from opentelemetry import trace
+from opentelemetry.trace import Span, Tracer
+
+# Only the OpenTelemetry API is imported here; the SDK and exporters are
+# imported when tracing is configured, so web search modules can create
+# spans without pulling in the exporter stack.
+
+logger = logging.getLogger(__name__)
+
+TRACE_EXPORTER_ENV = "LIVEKIT_AGENT_TRACE_EXPORTER"
+TRACE_FILE_ENV = "LIVEKIT_AGENT_TRACE_FILE"
+DEFAULT_TRACE_FILE = "voice-traces.jsonl"
+TRACE_EXPORTER_OTLP = "otlp"
+TRACE_EXPORTER_FILE = "file"
+TRACER_NAME = "portfolio_agent"
+
+VOICE_TURN_SPAN = "voice_turn"
+
+_tracer: Tracer = trace.NoOpTracer()
+_tracer_provider: Any | None = None
+
+
+def tracer() -> Tracer:
+    """Tracer for agent spans; a no-op until `configure_tracing` succeeds."""
+    return _tracer
+
+
+def set_voice_tracer_provider(provider: Any | None) -> None:
+    global _tracer, _tracer_provider
+    _tracer_provider = provider
+    _tracer = provider.get_tracer(TRACER_NAME) if provider is not None else trace.NoOpTracer()
+
+
+def configure_tracing(env: Mapping[str, str | None]) -> Any | None:
+    """Create the process tracer provider from env, once per process."""
+    if _tracer_provider is not None:
+        return _tracer_provider
+
+    exporters = {
+        name.strip().lower()
+        for name in (env.get(TRACE_EXPORTER_ENV) or "").split(",")
+        if name.strip()
+    }
+    if not exporters:
+        return None
+
+    from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    provider = TracerProvider(resource=Resource.create({SERVICE_NAME: TRACER_NAME}))
+    if TRACE_EXPORTER_OTLP in exporters:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+
+        # Endpoint and headers come from the standard OTEL_EXPORTER_OTLP_* env.
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    if TRACE_EXPORTER_FILE in exporters:
+        path = env.get(TRACE_FILE_ENV) or DEFAULT_TRACE_FILE
+        provider.add_span_processor(BatchSpanProcessor(JsonLinesSpanExporter(path)))
+
+    unknown = exporters - {TRACE_EXPORTER_OTLP, TRACE_EXPORTER_FILE}
+    if unknown:
+        logger.warning(
+            "Ignoring unknown %s values: %s",
+            TRACE_EXPORTER_ENV,
+            ", ".join(sorted(unknown)),
+        )
+
+    set_voice_tracer_provider(provider)
+    return provider
+
+
+def flush_tracing(timeout_millis: int = 5_000) -> None:
+    provider = _tracer_provider
+    force_flush = getattr(provider, "force_flush", None)
+    if callable(force_flush):
+        force_flush(timeout_millis)
+
+
+def span_to_dict(span: Any) -> dict[str, Any]:
+    context = span.get_span_context()
+    parent = span.parent
+    return {
+        "name": span.name,
+        "trace_id": format(context.trace_id, "032x"),
+        "span_id": format(context.span_id, "016x"),
+        "parent_span_id": format(parent.span_id, "016x") if parent else None,
+        "start_time_unix_nano": span.start_time,
+        "end_time_unix_nano": span.end_time,
+        "attributes": dict(span.attributes or {}),
+    }
+
+
+class JsonLinesSpanExporter:
+    """Append finished spans to a JSON Lines file, one span per line.
+
+    Job processes append to the same file; each span is written with a
+    single `write` call on a file opened in append mode.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[Any]) -> Any:
+        from opentelemetry.sdk.trace.export import SpanExportResult
+
+        lines = [
+            json.dumps(span_to_dict(span), separators=(",", ":"), default=str) + "\n"
+            for span in spans
+        ]
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as file:
+                for line in lines:
+                    file.write(line)
+        except OSError as error:
+            logger.warning("trace_file_export_failed path=%s error=%s", self.path, error)
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        return None
+
+    def force_flush(self, timeout_millis: int = 30_000) -> bool:
+        return True
+
+
+def _ns(seconds: float) -> int:
+    return int(seconds * 1_000_000_000)
+
+
+class TurnSpanRecorder:
+    """Build one `voice_turn` span per user turn with stage child spans.
+
+    The turn span starts when the user stops speaking and ends when the agent
+    starts speaking. Stage timings arrive from LiveKit metrics, sometimes
+    after the agent has started speaking, so they are added as children of
+    the most recent turn with their own start and end times.
+    """
+
+    def __init__(self) -> None:
+        self._turn: Span | None = None
+        self._turn_started_at: float | None = None
+        self._turn_open = False
+
+    def speech_ended(self, at: float) -> None:
+        self._end_open_turn(at)
+        self._turn = tracer().start_span(VOICE_TURN_SPAN, start_time=_ns(at))
+        self._turn_started_at = at
+        self._turn_open = True
+
+    def agent_speaking(self, at: float) -> None:
+        if self._turn is None or not self._turn_open:
+            return
+        if self._turn_started_at is not None:
+            self._turn.set_attribute(
+                "voice_turn.response_ms", round((at - self._turn_started_at) * 1000, 1)
+            )
+        self._turn.end(end_time=_ns(at))
+        self._turn_open = False
+
+    def add_stage(
+        self,
+        name: str,
+        start: float | None,
+        duration: float | None,
+        attributes: Mapping[str, Any] | None = None,
+    ) -> None:
+        if self._turn is None or duration is None or duration < 0:
+            return
+        start = self._turn_started_at if start is None else start
+        if start is None:
+            return
+        span = tracer().start_span(
+            f"{VOICE_TURN_SPAN}.{name}",
+            context=trace.set_span_in_context(self._turn),
+            start_time=_ns(start),
+            attributes=dict(attributes or {}),
+        )
+        span.end(end_time=_ns(start + duration))
+
+    def add_livekit_metrics(self, metrics: Any) -> None:
+        metrics_type = getattr(metrics, "type", None)
+        if metrics_type == "eou_metrics":
+            self.add_stage("eou_delay", None, metrics.end_of_utterance_delay)
+            self.add_stage("transcription_delay", None, metrics.transcription_delay)
+        elif metrics_type == "llm_metrics" and not metrics.cancelled:
+            self.add_stage(
+                "llm_ttft",
+                metrics.timestamp - metrics.duration,
+                metrics.ttft,
+                {"llm.total_tokens": metrics.total_tokens},
+            )
+        elif metrics_type == "tts_metrics" and not metrics.cancelled:
+            self.add_stage(
+                "tts_ttfb",
+                metrics.timestamp - metrics.duration,
+                metrics.ttfb,
+                {"tts.characters": metrics.characters_count},
+            )
+
+    def close(self, at: float) -> None:
+        self._end_open_turn(at)
+
+    def _end_open_turn(self, at: float) -> None:
+        if self._turn is not None and self._turn_open:
+            self._turn.set_attribute("voice_turn.completed", False)
+            self._turn.end(end_time=_ns(at))
+        self._turn_open = False
+
@@ -1,22 +1,44 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Mapping
+import asyncio
+import contextlib
+from dataclasses import dataclass, field
+from typing import Any, Callable, Mapping
 
 import httpx
 
 from web_search_constants import (
+    ADAPTIVE_PROVIDER,
+    DEFAULT_WEB_SEARCH_COST_WEIGHT_MS_PER_CENT,
+    DEFAULT_WEB_SEARCH_EXPLORATION_RATE,
+    DEFAULT_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    DEFAULT_HTTP_MAX_CONNECTIONS,
+    DEFAULT_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    DEFAULT_WEB_SEARCH_HEDGE_DELAY_SECONDS,
     DEFAULT_WEB_SEARCH_MAX_RESULTS,
     DEFAULT_WEB_SEARCH_PROVIDER,
+    DEFAULT_WEB_SEARCH_SESSION_BUDGET_USD,
     DEFAULT_WEB_SEARCH_TIMEOUT_SECONDS,
+    ESTIMATED_PROVIDER_COSTS,
     EXA_PROVIDER,
+    FAILOVER_PROVIDER,
     PARALLEL_PROVIDER,
     PERPLEXITY_PROVIDER,
     PROVIDER_SECRET_NAMES,
+    RACE_PROVIDER,
+    SUPPORTED_WEB_SEARCH_PROVIDERS,
+    WEB_SEARCH_ADAPTIVE_PROVIDERS_ENV,
+    WEB_SEARCH_COST_WEIGHT_MS_PER_CENT_ENV,
+    WEB_SEARCH_EXPLORATION_RATE_ENV,
+    WEB_SEARCH_FAILOVER_PROVIDERS_ENV,
+    WEB_SEARCH_HEDGE_DELAY_SECONDS_ENV,
     WEB_SEARCH_MAX_RESULTS_ENV,
     WEB_SEARCH_PROVIDER_ENV,
+    WEB_SEARCH_RACE_PROVIDERS_ENV,
+    WEB_SEARCH_SESSION_BUDGET_USD_ENV,
     WEB_SEARCH_TIMEOUT_SECONDS_ENV,
 )
+from web_search_health import ProviderHealthRegistry, load_circuit_breaker_settings
 
 
 @dataclass(frozen=True)
@@ -24,7 +46,7 @@ class SearchProviderConfig:
     api_key: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SearchResult:
     title: str
     url: str
@@ -39,19 +61,53 @@ class WebSearchSettings:
     api_key: str
     max_results: int
     timeout_seconds: float
+    # Ordered provider chain and keys for multi-provider modes such as `race`.
+    provider_api_keys: Mapping[str, str] = field(default_factory=dict)
+    hedge_delay_seconds: float = DEFAULT_WEB_SEARCH_HEDGE_DELAY_SECONDS
+    session_budget_usd: float = DEFAULT_WEB_SEARCH_SESSION_BUDGET_USD
+    exploration_rate: float = DEFAULT_WEB_SEARCH_EXPLORATION_RATE
+    cost_weight_ms_per_cent: float = DEFAULT_WEB_SEARCH_COST_WEIGHT_MS_PER_CENT
+
+
+class SearchCostBudget:
+    """Estimated provider spend for one agent session."""
+
+    def __init__(self, limit_usd: float) -> None:
+        self.limit_usd = limit_usd
+        self.spent_usd = 0.0
+
+    def can_afford(self, provider: str) -> bool:
+        return self.spent_usd + ESTIMATED_PROVIDER_COSTS.get(provider, 0) <= (
+            self.limit_usd
+        )
+
+    def charge(self, provider: str) -> None:
+        self.spent_usd += ESTIMATED_PROVIDER_COSTS.get(provider, 0)
+
+
+MULTI_PROVIDER_CHAIN_ENVS = {
+    RACE_PROVIDER: WEB_SEARCH_RACE_PROVIDERS_ENV,
+    FAILOVER_PROVIDER: WEB_SEARCH_FAILOVER_PROVIDERS_ENV,
+    ADAPTIVE_PROVIDER: WEB_SEARCH_ADAPTIVE_PROVIDERS_ENV,
+}
 
 
 def load_web_search_settings(env: Mapping[str, str | None]) -> WebSearchSettings:
     provider = (
         env.get(WEB_SEARCH_PROVIDER_ENV) or DEFAULT_WEB_SEARCH_PROVIDER
     ).strip().lower()
-    secret_name = PROVIDER_SECRET_NAMES.get(provider)
-    if not secret_name:
-        raise ValueError(f"Unsupported web search provider: {provider}")
+    if provider in MULTI_PROVIDER_CHAIN_ENVS:
+        provider_api_keys = _load_provider_chain_keys(env, provider)
+        api_key = next(iter(provider_api_keys.values()))
+    else:
+        secret_name = PROVIDER_SECRET_NAMES.get(provider)
+        if not secret_name:
+            raise ValueError(f"Unsupported web search provider: {provider}")
 
-    api_key = env.get(secret_name) or ""
-    if not api_key:
-        raise ValueError(f"{secret_name} is missing")
+        api_key = env.get(secret_name) or ""
+        if not api_key:
+            raise ValueError(f"{secret_name} is missing")
+        provider_api_keys = {provider: api_key}
 
     return WebSearchSettings(
         provider=provider,
@@ -63,26 +119,224 @@ def load_web_search_settings(env: Mapping[str, str | None]) -> WebSearchSettings
             env.get(WEB_SEARCH_TIMEOUT_SECONDS_ENV)
             or DEFAULT_WEB_SEARCH_TIMEOUT_SECONDS
         ),
+        provider_api_keys=provider_api_keys,
+        hedge_delay_seconds=float(
+            env.get(WEB_SEARCH_HEDGE_DELAY_SECONDS_ENV)
+            or DEFAULT_WEB_SEARCH_HEDGE_DELAY_SECONDS
+        ),
+        session_budget_usd=float(
+            env.get(WEB_SEARCH_SESSION_BUDGET_USD_ENV)
+            or DEFAULT_WEB_SEARCH_SESSION_BUDGET_USD
+        ),
+        exploration_rate=float(
+            env.get(WEB_SEARCH_EXPLORATION_RATE_ENV)
+            or DEFAULT_WEB_SEARCH_EXPLORATION_RATE
+        ),
+        cost_weight_ms_per_cent=float(
+            env.get(WEB_SEARCH_COST_WEIGHT_MS_PER_CENT_ENV)
+            or DEFAULT_WEB_SEARCH_COST_WEIGHT_MS_PER_CENT
+        ),
     )
 
 
-def create_search_provider(settings: WebSearchSettings, http_client: Any) -> Any:
+def _load_provider_chain_keys(
+    env: Mapping[str, str | None],
+    mode: str,
+) -> dict[str, str]:
+    configured = env.get(MULTI_PROVIDER_CHAIN_ENVS[mode])
+    providers = (
+        [name.strip().lower() for name in configured.split(",") if name.strip()]
+        if configured
+        else list(SUPPORTED_WEB_SEARCH_PROVIDERS)
+    )
+    provider_api_keys: dict[str, str] = {}
+    for name in providers:
+        secret_name = PROVIDER_SECRET_NAMES.get(name)
+        if not secret_name:
+            raise ValueError(f"Unsupported web search provider: {name}")
+        api_key = env.get(secret_name) or ""
+        if api_key:
+            provider_api_keys[name] = api_key
+
+    if not provider_api_keys:
+        raise ValueError(
+            "No web search provider API keys are set for "
+            f"{WEB_SEARCH_PROVIDER_ENV}={mode}"
+        )
+    return provider_api_keys
+
+
+def create_search_provider(
+    settings: WebSearchSettings,
+    http_client: Any,
+    budget: SearchCostBudget | None = None,
+    health: ProviderHealthRegistry | None = None,
+) -> Any:
+    """Build the provider for `settings`.
+
+    `http_client` is either one client shared by every provider or a
+    `SharedHttpClientPool`, which gives each upstream provider its own pool,
+    including the members of `race`, `failover` and `adaptive` chains.
+    """
+    from web_search_providers import (  # noqa: PLC0415
+        AdaptiveSearchProvider,
+        CircuitBreakerSearchProvider,
+        FailoverSearchProvider,
+        HedgedSearchProvider,
+    )
+
+    if settings.provider in MULTI_PROVIDER_CHAIN_ENVS:
+        health = health or ProviderHealthRegistry(
+            load_circuit_breaker_settings({})
+        )
+        providers = [
+            CircuitBreakerSearchProvider(
+                _create_single_provider(
+                    name, api_key, _provider_http_client(http_client, name)
+                ),
+                health.get(name),
+            )
+            for name, api_key in settings.provider_api_keys.items()
+        ]
+        if settings.provider == FAILOVER_PROVIDER:
+            return FailoverSearchProvider(providers)
+        if settings.provider == ADAPTIVE_PROVIDER:
+            return AdaptiveSearchProvider(
+                providers,
+                exploration_rate=settings.exploration_rate,
+                cost_weight_ms_per_cent=settings.cost_weight_ms_per_cent,
+            )
+        return HedgedSearchProvider(
+            providers,
+            hedge_delay_seconds=settings.hedge_delay_seconds,
+            budget=budget or SearchCostBudget(settings.session_budget_usd),
+        )
+
+    provider = _create_single_provider(
+        settings.provider,
+        settings.api_key,
+        _provider_http_client(http_client, settings.provider),
+    )
+    if health is not None:
+        return CircuitBreakerSearchProvider(provider, health.get(provider.name))
+    return provider
+
+
+def _provider_http_client(http_client: Any, provider: str) -> Any:
+    if isinstance(http_client, SharedHttpClientPool):
+        return http_client.client(provider)
+    return http_client
+
+
+def _create_single_provider(provider: str, api_key: str, http_client: Any) -> Any:
     from web_search_providers import (  # noqa: PLC0415
         ExaSearchProvider,
         ParallelSearchProvider,
         PerplexitySearchProvider,
     )
 
-    config = SearchProviderConfig(api_key=settings.api_key)
-    if settings.provider == PARALLEL_PROVIDER:
+    config = SearchProviderConfig(api_key=api_key)
+    if provider == PARALLEL_PROVIDER:
         return ParallelSearchProvider(config, http_client=http_client)
-    if settings.provider == EXA_PROVIDER:
+    if provider == EXA_PROVIDER:
         return ExaSearchProvider(config, http_client=http_client)
-    if settings.provider == PERPLEXITY_PROVIDER:
+    if provider == PERPLEXITY_PROVIDER:
         return PerplexitySearchProvider(config, http_client=http_client)
 
-    raise ValueError(f"Unsupported web search provider: {settings.provider}")
+    raise ValueError(f"Unsupported web search provider: {provider}")
+
+
+def create_default_http_client(
+    event_hooks: Mapping[str, list[Callable[..., Any]]] | None = None,
+) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=DEFAULT_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=DEFAULT_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=DEFAULT_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        event_hooks=dict(event_hooks or {}),
+    )
+
+
+@dataclass
+class HttpClientPoolStats:
+    clients_created: int = 0
+    client_hits: int = 0
+    requests: int = 0
+    new_connections: int = 0
+
+    @property
+    def reused_connections(self) -> int:
+        return max(self.requests - self.new_connections, 0)
+
+
+class SharedHttpClientPool:
+    """Process-wide HTTP clients, one connection pool per upstream service.
+
+    Clients are bound to the event loop that created them, so a new loop gets
+    fresh clients instead of reusing connections owned by a closed loop. The
+    old clients are closed in the background so their sockets are released.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[..., Any] = create_default_http_client,
+    ) -> None:
+        self.client_factory = client_factory
+        self.stats = HttpClientPoolStats()
+        self._clients: dict[str, Any] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._closing: set[asyncio.Task[None]] = set()
+
+    def client(self, provider: str) -> Any:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            for stale_client in self._clients.values():
+                task = loop.create_task(_close_stale_client(stale_client))
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+            self._clients = {}
+            self._loop = loop
+
+        client = self._clients.get(provider)
+        if client is not None and not getattr(client, "is_closed", False):
+            self.stats.client_hits += 1
+            return client
+
+        client = self.client_factory(event_hooks={"request": [self._on_request]})
+        self._clients[provider] = client
+        self.stats.clients_created += 1
+        return client
+
+    async def aclose(self) -> None:
+        clients = list(self._clients.values())
+        self._clients = {}
+        for client in clients:
+            await client.aclose()
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        self.stats.requests += 1
+        request.extensions["trace"] = self._on_trace
+
+    async def _on_trace(self, event_name: str, info: dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.started":
+            self.stats.new_connections += 1
+
+
+async def _close_stale_client(client: Any) -> None:
+    # The previous loop is usually closed by now. aclose still closes the
+    # sockets first and then fails when it touches that loop.
+    with contextlib.suppress(RuntimeError):
+        await client.aclose()
+
+
+_shared_http_client_pool: SharedHttpClientPool | None = None
 
 
-def create_default_http_client() -> httpx.AsyncClient:
-    return httpx.AsyncClient()
+def get_shared_http_client_pool() -> SharedHttpClientPool:
+    global _shared_http_client_pool
+    if _shared_http_client_pool is None:
+        _shared_http_client_pool = SharedHttpClientPool()
+    return _shared_http_client_pool
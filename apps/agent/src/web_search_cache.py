@@ -0,0 +1,473 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Mapping
+
+from web_search import SearchResult
+from web_search_constants import (
+    DEFAULT_WEB_SEARCH_CACHE_COMPACTION_INTERVAL_SECONDS,
+    DEFAULT_WEB_SEARCH_CACHE_LIVE_TTL_SECONDS,
+    DEFAULT_WEB_SEARCH_CACHE_MAX_BYTES,
+    DEFAULT_WEB_SEARCH_CACHE_MAX_ENTRIES,
+    DEFAULT_WEB_SEARCH_CACHE_REFERENCE_TTL_SECONDS,
+    DEFAULT_WEB_SEARCH_CACHE_TTL_SECONDS,
+    WEB_SEARCH_CACHE_COMPACTION_INTERVAL_SECONDS_ENV,
+    WEB_SEARCH_CACHE_DB_FILENAME,
+    WEB_SEARCH_CACHE_DIR_ENV,
+    WEB_SEARCH_CACHE_ENABLED_ENV,
+    WEB_SEARCH_CACHE_LIVE_TTL_SECONDS_ENV,
+    WEB_SEARCH_CACHE_MAX_BYTES_ENV,
+    WEB_SEARCH_CACHE_MAX_ENTRIES_ENV,
+    WEB_SEARCH_CACHE_REFERENCE_TTL_SECONDS_ENV,
+    WEB_SEARCH_CACHE_TTL_SECONDS_ENV,
+    WEB_SEARCH_LIVE_KEYWORDS,
+    WEB_SEARCH_REFERENCE_KEYWORDS,
+)
+
+logger = logging.getLogger(__name__)
+
+SEARCH_RESULT_OVERHEAD_BYTES = 64
+
+CacheKey = tuple[str, str, int]
+
+
+@dataclass(frozen=True)
+class SearchCacheSettings:
+    enabled: bool
+    max_entries: int
+    max_bytes: int
+    ttl_seconds: float
+    live_ttl_seconds: float
+    reference_ttl_seconds: float
+    directory: str | None = None
+    compaction_interval_seconds: float = (
+        DEFAULT_WEB_SEARCH_CACHE_COMPACTION_INTERVAL_SECONDS
+    )
+
+
+@dataclass
+class SearchCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    disk_hits: int = 0
+
+
+@dataclass(frozen=True)
+class _CacheEntry:
+    results: tuple[SearchResult, ...]
+    expires_at: float
+    size_bytes: int
+
+
+def load_search_cache_settings(env: Mapping[str, str | None]) -> SearchCacheSettings:
+    enabled = (env.get(WEB_SEARCH_CACHE_ENABLED_ENV) or "true").strip().lower()
+    return SearchCacheSettings(
+        enabled=enabled not in {"0", "false", "no", "off"},
+        max_entries=int(
+            env.get(WEB_SEARCH_CACHE_MAX_ENTRIES_ENV)
+            or DEFAULT_WEB_SEARCH_CACHE_MAX_ENTRIES
+        ),
+        max_bytes=int(
+            env.get(WEB_SEARCH_CACHE_MAX_BYTES_ENV) or DEFAULT_WEB_SEARCH_CACHE_MAX_BYTES
+        ),
+        ttl_seconds=float(
+            env.get(WEB_SEARCH_CACHE_TTL_SECONDS_ENV)
+            or DEFAULT_WEB_SEARCH_CACHE_TTL_SECONDS
+        ),
+        live_ttl_seconds=float(
+            env.get(WEB_SEARCH_CACHE_LIVE_TTL_SECONDS_ENV)
+            or DEFAULT_WEB_SEARCH_CACHE_LIVE_TTL_SECONDS
+        ),
+        reference_ttl_seconds=float(
+            env.get(WEB_SEARCH_CACHE_REFERENCE_TTL_SECONDS_ENV)
+            or DEFAULT_WEB_SEARCH_CACHE_REFERENCE_TTL_SECONDS
+        ),
+        directory=(env.get(WEB_SEARCH_CACHE_DIR_ENV) or "").strip() or None,
+        compaction_interval_seconds=float(
+            env.get(WEB_SEARCH_CACHE_COMPACTION_INTERVAL_SECONDS_ENV)
+            or DEFAULT_WEB_SEARCH_CACHE_COMPACTION_INTERVAL_SECONDS
+        ),
+    )
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split()).strip(" ?!.")
+
+
+def search_cache_key(provider: str, query: str, max_results: int) -> CacheKey:
+    return (provider, normalize_query(query), max_results)
+
+
+def _query_words(query: str) -> set[str]:
+    return set(re.findall(r"[a-z0-9.]+", query.lower()))
+
+
+class SearchResultCache:
+    """In-memory TTL cache of provider results with LRU eviction.
+
+    Entries are bounded both by count and by an estimate of their text size.
+    When a disk store is attached, memory misses fall through to it and new
+    entries are written to both, so other worker processes can reuse them.
+    Disk reads run in a worker thread and disk writes are queued, so a locked
+    database never stalls the event loop.
+    """
+
+    def __init__(
+        self,
+        settings: SearchCacheSettings,
+        clock: Callable[[], float] = time.monotonic,
+        disk: SqliteSearchResultStore | None = None,
+    ) -> None:
+        self.settings = settings
+        self.clock = clock
+        self.disk = disk
+        self.stats = SearchCacheStats()
+        self.size_bytes = 0
+        self._entries: OrderedDict[CacheKey, _CacheEntry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ttl_for(self, query: str) -> float:
+        words = _query_words(query)
+        if words.intersection(WEB_SEARCH_LIVE_KEYWORDS):
+            return self.settings.live_ttl_seconds
+        if words.intersection(WEB_SEARCH_REFERENCE_KEYWORDS):
+            return self.settings.reference_ttl_seconds
+        return self.settings.ttl_seconds
+
+    async def get(
+        self,
+        provider: str,
+        query: str,
+        max_results: int,
+    ) -> list[SearchResult] | None:
+        key = search_cache_key(provider, query, max_results)
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= self.clock():
+            self._remove(key)
+            self.stats.expirations += 1
+            entry = None
+
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return list(entry.results)
+
+        if self.disk is not None:
+            stored = await asyncio.to_thread(self.disk.get, key)
+            if stored is not None:
+                results, ttl_seconds = stored
+                self._store(key, results, ttl_seconds)
+                self.stats.hits += 1
+                self.stats.disk_hits += 1
+                return results
+
+        self.stats.misses += 1
+        return None
+
+    def put(
+        self,
+        provider: str,
+        query: str,
+        max_results: int,
+        results: list[SearchResult],
+    ) -> None:
+        ttl_seconds = self.ttl_for(query)
+        if ttl_seconds <= 0:
+            return
+
+        key = search_cache_key(provider, query, max_results)
+        self._store(key, results, ttl_seconds)
+        if self.disk is not None:
+            self.disk.put(key, results, ttl_seconds)
+
+    def _store(
+        self,
+        key: CacheKey,
+        results: list[SearchResult],
+        ttl_seconds: float,
+    ) -> None:
+        size_bytes = sum(_estimate_result_bytes(result) for result in results)
+        if size_bytes > self.settings.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = _CacheEntry(
+            results=tuple(results),
+            expires_at=self.clock() + ttl_seconds,
+            size_bytes=size_bytes,
+        )
+        self.size_bytes += size_bytes
+
+        while (
+            len(self._entries) > self.settings.max_entries
+            or self.size_bytes > self.settings.max_bytes
+        ):
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size_bytes = 0
+
+    def _remove(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key)
+        self.size_bytes -= entry.size_bytes
+
+    def close(self) -> None:
+        """Write out queued disk results and close the disk store."""
+        disk, self.disk = self.disk, None
+        if disk is not None:
+            disk.close()
+
+
+def _estimate_result_bytes(result: SearchResult) -> int:
+    return SEARCH_RESULT_OVERHEAD_BYTES + sum(
+        len(value.encode("utf-8"))
+        for value in (
+            result.title,
+            result.url,
+            result.snippet,
+            result.published_at or "",
+            result.provider,
+        )
+    )
+
+
+class SqliteSearchResultStore:
+    """Search results shared between worker processes through SQLite.
+
+    WAL mode lets concurrent job processes read while one writes. Expiry is
+    stored as wall-clock time because monotonic clocks differ per process.
+    Writes are queued to a writer thread with its own connection, so `put`
+    never waits on the database lock. Lookups run in worker threads on a
+    separate reader connection, one at a time. Storage errors are logged and
+    treated as cache misses. `close` writes out queued results, so it must run
+    before the process exits.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path
+        self.clock = clock
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = self._connect()
+        self._read_lock = threading.Lock()
+        self._compaction_stop: threading.Event | None = None
+        self._writes: queue.Queue[tuple[CacheKey, str, float] | None] = queue.Queue()
+        self._writer: threading.Thread | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.path,
+            timeout=1.0,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS search_results (
+                provider TEXT NOT NULL,
+                query TEXT NOT NULL,
+                max_results INTEGER NOT NULL,
+                results TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (provider, query, max_results)
+            )
+            """
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS search_results_expires_at "
+            "ON search_results (expires_at)"
+        )
+        return connection
+
+    def get(self, key: CacheKey) -> tuple[list[SearchResult], float] | None:
+        try:
+            with self._read_lock:
+                row = self._connection.execute(
+                    "SELECT results, expires_at FROM search_results "
+                    "WHERE provider = ? AND query = ? AND max_results = ? "
+                    "AND expires_at > ?",
+                    (*key, self.clock()),
+                ).fetchone()
+        except sqlite3.Error:
+            logger.warning("Failed to read web search disk cache", exc_info=True)
+            return None
+
+        if row is None:
+            return None
+
+        try:
+            results = [SearchResult(**item) for item in json.loads(row[0])]
+        except (TypeError, ValueError):
+            return None
+        return results, row[1] - self.clock()
+
+    def put(
+        self,
+        key: CacheKey,
+        results: list[SearchResult],
+        ttl_seconds: float,
+    ) -> None:
+        payload = json.dumps(
+            [asdict(result) for result in results],
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        self._writes.put((key, payload, self.clock() + ttl_seconds))
+        if self._writer is None:
+            self._writer = threading.Thread(
+                target=self._write_queued,
+                name="web-search-cache-writer",
+                daemon=True,
+            )
+            self._writer.start()
+
+    def flush(self) -> None:
+        """Block until every queued write has been attempted."""
+        self._writes.join()
+
+    def _write_queued(self) -> None:
+        connection: sqlite3.Connection | None = None
+        try:
+            while True:
+                item = self._writes.get()
+                try:
+                    if item is None:
+                        return
+                    key, payload, expires_at = item
+                    if connection is None:
+                        connection = self._connect()
+                    connection.execute(
+                        "INSERT OR REPLACE INTO search_results "
+                        "(provider, query, max_results, results, expires_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (*key, payload, expires_at),
+                    )
+                except sqlite3.Error:
+                    logger.warning("Failed to write web search disk cache", exc_info=True)
+                finally:
+                    self._writes.task_done()
+        finally:
+            if connection is not None:
+                connection.close()
+
+    def compact(self, connection: sqlite3.Connection | None = None) -> int:
+        if connection is None:
+            with self._read_lock:
+                return self.compact(self._connection)
+        try:
+            cursor = connection.execute(
+                "DELETE FROM search_results WHERE expires_at <= ?",
+                (self.clock(),),
+            )
+        except sqlite3.Error:
+            logger.warning("Failed to compact web search disk cache", exc_info=True)
+            return 0
+        return cursor.rowcount
+
+    def start_compaction(self, interval_seconds: float) -> None:
+        if self._compaction_stop is not None or interval_seconds <= 0:
+            return
+
+        stop = threading.Event()
+        self._compaction_stop = stop
+
+        def run() -> None:
+            try:
+                connection = self._connect()
+            except sqlite3.Error:
+                if not stop.is_set():
+                    logger.warning(
+                        "Failed to open web search disk cache for compaction",
+                        exc_info=True,
+                    )
+                return
+            try:
+                while not stop.wait(interval_seconds):
+                    removed = self.compact(connection)
+                    if removed:
+                        logger.debug("web_search_disk_cache_compacted removed=%s", removed)
+            finally:
+                connection.close()
+
+        threading.Thread(
+            target=run,
+            name="web-search-cache-compaction",
+            daemon=True,
+        ).start()
+
+    def close(self) -> None:
+        if self._compaction_stop is not None:
+            self._compaction_stop.set()
+            self._compaction_stop = None
+        if self._writer is not None:
+            self._writes.put(None)
+            self._writer.join(timeout=1.0)
+            self._writer = None
+        with self._read_lock:
+            self._connection.close()
+
+
+def create_search_cache(
+    env: Mapping[str, str | None],
+) -> SearchResultCache | None:
+    settings = load_search_cache_settings(env)
+    if not settings.enabled or settings.max_entries <= 0:
+        return None
+
+    disk = None
+    if settings.directory:
+        try:
+            disk = SqliteSearchResultStore(
+                Path(settings.directory) / WEB_SEARCH_CACHE_DB_FILENAME
+            )
+        except (OSError, sqlite3.Error):
+            logger.warning(
+                "Web search disk cache unavailable; using memory only",
+                exc_info=True,
+            )
+        else:
+            disk.start_compaction(settings.compaction_interval_seconds)
+    return SearchResultCache(settings, disk=disk)
+
+
+_shared_search_cache: SearchResultCache | None = None
+_shared_search_cache_loaded = False
+
+
+def get_shared_search_cache(
+    env: Mapping[str, str | None],
+) -> SearchResultCache | None:
+    global _shared_search_cache, _shared_search_cache_loaded
+    if not _shared_search_cache_loaded:
+        _shared_search_cache = create_search_cache(env)
+        _shared_search_cache_loaded = True
+    return _shared_search_cache
+
+
+def close_shared_search_cache() -> None:
+    if _shared_search_cache is not None:
+        _shared_search_cache.close()
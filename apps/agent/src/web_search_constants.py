@@ -4,15 +4,102 @@ DEFAULT_WEB_SEARCH_PROVIDER = "parallel"
 DEFAULT_WEB_SEARCH_MAX_RESULTS = 5
 DEFAULT_WEB_SEARCH_TIMEOUT_SECONDS = 8.0
 DEFAULT_WEB_SEARCH_BENCHMARK_OUTPUT = "search-benchmark.json"
+DEFAULT_WEB_SEARCH_CACHE_MAX_ENTRIES = 256
+DEFAULT_WEB_SEARCH_CACHE_MAX_BYTES = 4 * 1024 * 1024
+DEFAULT_WEB_SEARCH_CACHE_TTL_SECONDS = 300.0
+DEFAULT_WEB_SEARCH_CACHE_LIVE_TTL_SECONDS = 60.0
+DEFAULT_WEB_SEARCH_CACHE_REFERENCE_TTL_SECONDS = 1_800.0
+DEFAULT_WEB_SEARCH_CACHE_COMPACTION_INTERVAL_SECONDS = 300.0
+WEB_SEARCH_CACHE_DB_FILENAME = "web-search-cache.sqlite3"
+DEFAULT_WEB_SEARCH_WARM_UP_TIMEOUT_SECONDS = 3.0
+DEFAULT_WEB_SEARCH_HEDGE_DELAY_SECONDS = 1.0
+DEFAULT_WEB_SEARCH_SESSION_BUDGET_USD = 0.25
+DEFAULT_WEB_SEARCH_CIRCUIT_FAILURE_THRESHOLD = 3
+DEFAULT_WEB_SEARCH_CIRCUIT_RESET_SECONDS = 30.0
+DEFAULT_WEB_SEARCH_HEALTH_EWMA_ALPHA = 0.2
+DEFAULT_WEB_SEARCH_EXPLORATION_RATE = 0.05
+DEFAULT_WEB_SEARCH_COST_WEIGHT_MS_PER_CENT = 200.0
+DEFAULT_WEB_SEARCH_PREFETCH_MAX_PER_SESSION = 3
+DEFAULT_WEB_SEARCH_PREFETCH_BUDGET_USD = 0.02
+DEFAULT_WEB_SEARCH_PREFETCH_MIN_WORDS = 3
+DEFAULT_HTTP_MAX_CONNECTIONS = 20
+DEFAULT_HTTP_MAX_KEEPALIVE_CONNECTIONS = 10
+DEFAULT_HTTP_KEEPALIVE_EXPIRY_SECONDS = 90.0
 
 WEB_SEARCH_PROVIDER_ENV = "WEB_SEARCH_PROVIDER"
 WEB_SEARCH_MAX_RESULTS_ENV = "WEB_SEARCH_MAX_RESULTS"
 WEB_SEARCH_TIMEOUT_SECONDS_ENV = "WEB_SEARCH_TIMEOUT_SECONDS"
 WEB_SEARCH_BENCHMARK_OUTPUT_ENV = "WEB_SEARCH_BENCHMARK_OUTPUT"
+WEB_SEARCH_RACE_PROVIDERS_ENV = "WEB_SEARCH_RACE_PROVIDERS"
+WEB_SEARCH_HEDGE_DELAY_SECONDS_ENV = "WEB_SEARCH_HEDGE_DELAY_SECONDS"
+WEB_SEARCH_SESSION_BUDGET_USD_ENV = "WEB_SEARCH_SESSION_BUDGET_USD"
+WEB_SEARCH_FAILOVER_PROVIDERS_ENV = "WEB_SEARCH_FAILOVER_PROVIDERS"
+WEB_SEARCH_ADAPTIVE_PROVIDERS_ENV = "WEB_SEARCH_ADAPTIVE_PROVIDERS"
+WEB_SEARCH_EXPLORATION_RATE_ENV = "WEB_SEARCH_EXPLORATION_RATE"
+WEB_SEARCH_COST_WEIGHT_MS_PER_CENT_ENV = "WEB_SEARCH_COST_WEIGHT_MS_PER_CENT"
+WEB_SEARCH_CIRCUIT_FAILURE_THRESHOLD_ENV = "WEB_SEARCH_CIRCUIT_FAILURE_THRESHOLD"
+WEB_SEARCH_CIRCUIT_RESET_SECONDS_ENV = "WEB_SEARCH_CIRCUIT_RESET_SECONDS"
+WEB_SEARCH_PREFETCH_ENABLED_ENV = "WEB_SEARCH_PREFETCH_ENABLED"
+WEB_SEARCH_PREFETCH_MAX_PER_SESSION_ENV = "WEB_SEARCH_PREFETCH_MAX_PER_SESSION"
+WEB_SEARCH_PREFETCH_BUDGET_USD_ENV = "WEB_SEARCH_PREFETCH_BUDGET_USD"
+WEB_SEARCH_STATUS_BROADCAST_ENV = "WEB_SEARCH_STATUS_BROADCAST"
+WEB_SEARCH_CACHE_ENABLED_ENV = "WEB_SEARCH_CACHE_ENABLED"
+WEB_SEARCH_CACHE_MAX_ENTRIES_ENV = "WEB_SEARCH_CACHE_MAX_ENTRIES"
+WEB_SEARCH_CACHE_MAX_BYTES_ENV = "WEB_SEARCH_CACHE_MAX_BYTES"
+WEB_SEARCH_CACHE_TTL_SECONDS_ENV = "WEB_SEARCH_CACHE_TTL_SECONDS"
+WEB_SEARCH_CACHE_LIVE_TTL_SECONDS_ENV = "WEB_SEARCH_CACHE_LIVE_TTL_SECONDS"
+WEB_SEARCH_CACHE_REFERENCE_TTL_SECONDS_ENV = "WEB_SEARCH_CACHE_REFERENCE_TTL_SECONDS"
+WEB_SEARCH_CACHE_DIR_ENV = "WEB_SEARCH_CACHE_DIR"
+WEB_SEARCH_CACHE_COMPACTION_INTERVAL_SECONDS_ENV = (
+    "WEB_SEARCH_CACHE_COMPACTION_INTERVAL_SECONDS"
+)
+
+# Freshness classes used to pick a cache TTL for a query. Live facts change
+# minute to minute; reference material such as docs and versions changes
+# rarely.
+WEB_SEARCH_LIVE_KEYWORDS = (
+    "weather",
+    "forecast",
+    "score",
+    "scores",
+    "match",
+    "game",
+    "news",
+    "price",
+    "prices",
+    "stock",
+    "live",
+    "today",
+    "now",
+)
+WEB_SEARCH_REFERENCE_KEYWORDS = (
+    "docs",
+    "documentation",
+    "version",
+    "versions",
+    "release",
+    "releases",
+    "changelog",
+    "api",
+)
+# Intent words from the agent instructions that make an utterance worth
+# prefetching before the model decides to call search_web.
+WEB_SEARCH_PREFETCH_KEYWORDS = (
+    *WEB_SEARCH_LIVE_KEYWORDS,
+    *WEB_SEARCH_REFERENCE_KEYWORDS,
+    "latest",
+    "current",
+    "schedule",
+    "schedules",
+    "pricing",
+)
 
 PARALLEL_PROVIDER = "parallel"
 EXA_PROVIDER = "exa"
 PERPLEXITY_PROVIDER = "perplexity"
+RACE_PROVIDER = "race"
+FAILOVER_PROVIDER = "failover"
+ADAPTIVE_PROVIDER = "adaptive"
 SUPPORTED_WEB_SEARCH_PROVIDERS = (
     PARALLEL_PROVIDER,
     EXA_PROVIDER,
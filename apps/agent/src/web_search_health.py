@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Mapping
+
+from web_search_constants import (
+    DEFAULT_WEB_SEARCH_CIRCUIT_FAILURE_THRESHOLD,
+    DEFAULT_WEB_SEARCH_CIRCUIT_RESET_SECONDS,
+    DEFAULT_WEB_SEARCH_HEALTH_EWMA_ALPHA,
+    WEB_SEARCH_CIRCUIT_FAILURE_THRESHOLD_ENV,
+    WEB_SEARCH_CIRCUIT_RESET_SECONDS_ENV,
+)
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+UNHEALTHY_ERROR_RATE = 0.5
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class CircuitBreakerSettings:
+    failure_threshold: int
+    reset_seconds: float
+    ewma_alpha: float = DEFAULT_WEB_SEARCH_HEALTH_EWMA_ALPHA
+
+
+def load_circuit_breaker_settings(
+    env: Mapping[str, str | None],
+) -> CircuitBreakerSettings:
+    return CircuitBreakerSettings(
+        failure_threshold=int(
+            env.get(WEB_SEARCH_CIRCUIT_FAILURE_THRESHOLD_ENV)
+            or DEFAULT_WEB_SEARCH_CIRCUIT_FAILURE_THRESHOLD
+        ),
+        reset_seconds=float(
+            env.get(WEB_SEARCH_CIRCUIT_RESET_SECONDS_ENV)
+            or DEFAULT_WEB_SEARCH_CIRCUIT_RESET_SECONDS
+        ),
+    )
+
+
+class ProviderHealth:
+    """Circuit breaker plus rolling latency and error rate for one provider.
+
+    The circuit opens after `failure_threshold` consecutive failures. After
+    `reset_seconds` a single probe request is let through (half-open); its
+    outcome closes the circuit again or restarts the wait.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        settings: CircuitBreakerSettings,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.provider = provider
+        self.settings = settings
+        self.clock = clock
+        self.state = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+        self.successes = 0
+        self.failures = 0
+        self.latency_ewma_ms: float | None = None
+        self.error_rate_ewma = 0.0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def healthy(self) -> bool:
+        return self.error_rate_ewma < UNHEALTHY_ERROR_RATE
+
+    def is_open(self) -> bool:
+        if self.state == CIRCUIT_OPEN:
+            return self.clock() - self._opened_at < self.settings.reset_seconds
+        if self.state == CIRCUIT_HALF_OPEN:
+            return self._probe_in_flight
+        return False
+
+    def acquire(self) -> None:
+        if self.is_open():
+            raise CircuitOpenError(f"{self.provider} circuit is open")
+        if self.state != CIRCUIT_CLOSED:
+            self.state = CIRCUIT_HALF_OPEN
+            self._probe_in_flight = True
+
+    def release(self) -> None:
+        self._probe_in_flight = False
+
+    def record_success(self, latency_ms: float) -> None:
+        self.successes += 1
+        self.consecutive_failures = 0
+        self.state = CIRCUIT_CLOSED
+        self._probe_in_flight = False
+        self.latency_ewma_ms = self._ewma(self.latency_ewma_ms, latency_ms)
+        self.error_rate_ewma = self._ewma(self.error_rate_ewma, 0.0)
+
+    def record_failure(self, latency_ms: float) -> None:
+        self.failures += 1
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        self.latency_ewma_ms = self._ewma(self.latency_ewma_ms, latency_ms)
+        self.error_rate_ewma = self._ewma(self.error_rate_ewma, 1.0)
+        if (
+            self.state == CIRCUIT_HALF_OPEN
+            or self.consecutive_failures >= self.settings.failure_threshold
+        ):
+            self.state = CIRCUIT_OPEN
+            self._opened_at = self.clock()
+
+    def _ewma(self, current: float | None, sample: float) -> float:
+        if current is None:
+            return sample
+        alpha = self.settings.ewma_alpha
+        return alpha * sample + (1 - alpha) * current
+
+
+class ProviderHealthRegistry:
+    def __init__(
+        self,
+        settings: CircuitBreakerSettings,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.settings = settings
+        self.clock = clock
+        self._providers: dict[str, ProviderHealth] = {}
+
+    def get(self, provider: str) -> ProviderHealth:
+        health = self._providers.get(provider)
+        if health is None:
+            health = ProviderHealth(provider, self.settings, clock=self.clock)
+            self._providers[provider] = health
+        return health
+
+    def snapshot(self) -> list[ProviderHealth]:
+        return list(self._providers.values())
+
+
+_shared_provider_health: ProviderHealthRegistry | None = None
+
+
+def get_shared_provider_health(
+    env: Mapping[str, str | None],
+) -> ProviderHealthRegistry:
+    global _shared_provider_health
+    if _shared_provider_health is None:
+        _shared_provider_health = ProviderHealthRegistry(
+            load_circuit_breaker_settings(env)
+        )
+    return _shared_provider_health
@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Mapping
+
+from web_search import SearchCostBudget, SearchResult
+from web_search_cache import SearchResultCache, normalize_query
+from web_search_constants import (
+    DEFAULT_WEB_SEARCH_CACHE_LIVE_TTL_SECONDS,
+    DEFAULT_WEB_SEARCH_PREFETCH_BUDGET_USD,
+    DEFAULT_WEB_SEARCH_PREFETCH_MAX_PER_SESSION,
+    DEFAULT_WEB_SEARCH_PREFETCH_MIN_WORDS,
+    WEB_SEARCH_PREFETCH_BUDGET_USD_ENV,
+    WEB_SEARCH_PREFETCH_ENABLED_ENV,
+    WEB_SEARCH_PREFETCH_KEYWORDS,
+    WEB_SEARCH_PREFETCH_MAX_PER_SESSION_ENV,
+)
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_STOP_WORDS = frozenset(
+    {
+        "a",
+        "about",
+        "an",
+        "and",
+        "are",
+        "at",
+        "can",
+        "do",
+        "does",
+        "for",
+        "hey",
+        "how",
+        "i",
+        "in",
+        "is",
+        "like",
+        "me",
+        "of",
+        "on",
+        "please",
+        "tell",
+        "the",
+        "to",
+        "what",
+        "whats",
+        "what's",
+        "you",
+    }
+)
+
+
+@dataclass(frozen=True)
+class SearchPrefetchSettings:
+    enabled: bool
+    max_per_session: int
+    budget_usd: float
+    min_words: int = DEFAULT_WEB_SEARCH_PREFETCH_MIN_WORDS
+    max_age_seconds: float = DEFAULT_WEB_SEARCH_CACHE_LIVE_TTL_SECONDS
+
+
+@dataclass
+class SearchPrefetchStats:
+    prefetches: int = 0
+    hits: int = 0
+    misses: int = 0
+    skipped: int = 0
+    failures: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        if self.prefetches == 0:
+            return 0.0
+        return self.hits / self.prefetches
+
+
+@dataclass
+class _Prefetch:
+    provider: str
+    query: str
+    max_results: int
+    started_at: float
+    task: asyncio.Task[list[SearchResult]]
+
+
+def load_search_prefetch_settings(
+    env: Mapping[str, str | None],
+) -> SearchPrefetchSettings:
+    enabled = (env.get(WEB_SEARCH_PREFETCH_ENABLED_ENV) or "false").strip().lower()
+    return SearchPrefetchSettings(
+        enabled=enabled in {"1", "true", "yes", "on"},
+        max_per_session=int(
+            env.get(WEB_SEARCH_PREFETCH_MAX_PER_SESSION_ENV)
+            or DEFAULT_WEB_SEARCH_PREFETCH_MAX_PER_SESSION
+        ),
+        budget_usd=float(
+            env.get(WEB_SEARCH_PREFETCH_BUDGET_USD_ENV)
+            or DEFAULT_WEB_SEARCH_PREFETCH_BUDGET_USD
+        ),
+    )
+
+
+def prefetch_words(text: str) -> frozenset[str]:
+    return frozenset(
+        word
+        for word in re.findall(r"[a-z0-9.']+", normalize_query(text))
+        if word not in PREFETCH_STOP_WORDS
+    )
+
+
+def is_freshness_sensitive(text: str) -> bool:
+    return not prefetch_words(text).isdisjoint(WEB_SEARCH_PREFETCH_KEYWORDS)
+
+
+class SearchPrefetcher:
+    """Speculative searches started from interim speech transcripts.
+
+    When the user is still speaking and the transcript already looks like a
+    freshness-sensitive question, the search starts early. A later search_web
+    call claims the prefetch only if its normalized query is the transcript,
+    so the tool never answers with results for a different query. Spend is
+    capped per session by count and by the prefetcher's own estimated-cost
+    budget, which `provider_factory` receives so multi-provider searches
+    charge it instead of the session's search budget.
+    """
+
+    def __init__(
+        self,
+        settings: SearchPrefetchSettings,
+        provider_factory: Callable[[SearchCostBudget], Any],
+        max_results: int,
+        timeout_seconds: float,
+        cache: SearchResultCache | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.settings = settings
+        self.provider_factory = provider_factory
+        self.max_results = max_results
+        self.timeout_seconds = timeout_seconds
+        self.cache = cache
+        self.clock = clock
+        self.budget = SearchCostBudget(settings.budget_usd)
+        self.stats = SearchPrefetchStats()
+        self._prefetches: list[_Prefetch] = []
+        self._turn_words: frozenset[str] | None = None
+
+    def on_transcript(self, transcript: str, is_final: bool) -> asyncio.Task | None:
+        words = prefetch_words(transcript)
+        task = None
+        if (
+            self._should_prefetch(words, is_final)
+            and is_freshness_sensitive(transcript)
+            and len(words) >= self.settings.min_words
+        ):
+            task = self._start(transcript, words)
+
+        if is_final:
+            self._turn_words = None
+        return task
+
+    async def claim(
+        self,
+        provider: str,
+        query: str,
+        max_results: int,
+    ) -> list[SearchResult] | None:
+        match = self._match(provider, query, max_results)
+        if match is None:
+            self.stats.misses += 1
+            return None
+
+        self._prefetches.remove(match)
+        try:
+            results = await asyncio.shield(match.task)
+        except Exception:
+            self.stats.misses += 1
+            return None
+
+        self.stats.hits += 1
+        return list(results)
+
+    def close(self) -> None:
+        for prefetch in self._prefetches:
+            prefetch.task.cancel()
+        self._prefetches.clear()
+
+    def _should_prefetch(self, words: frozenset[str], is_final: bool) -> bool:
+        # One speculative search per utterance, plus one more on the final
+        # transcript when it added words the interim prefetch did not have.
+        if self._turn_words is None:
+            return True
+        return is_final and not words <= self._turn_words
+
+    def _start(self, transcript: str, words: frozenset[str]) -> asyncio.Task | None:
+        self._turn_words = words
+        if self.stats.prefetches >= self.settings.max_per_session:
+            self.stats.skipped += 1
+            return None
+
+        provider = self.provider_factory(self.budget)
+        if not self.budget.can_afford(provider.name):
+            self.stats.skipped += 1
+            return None
+
+        self.budget.charge(provider.name)
+        self.stats.prefetches += 1
+        task = asyncio.create_task(self._search(provider, transcript))
+        task.add_done_callback(_retrieve_exception)
+        self._prefetches.append(
+            _Prefetch(
+                provider=provider.name,
+                query=normalize_query(transcript),
+                max_results=self.max_results,
+                started_at=self.clock(),
+                task=task,
+            )
+        )
+        logger.debug(
+            "web_search_prefetch_started provider=%s words=%s",
+            provider.name,
+            len(words),
+        )
+        return task
+
+    async def _search(self, provider: Any, transcript: str) -> list[SearchResult]:
+        try:
+            results = await provider.search(
+                query=transcript,
+                max_results=self.max_results,
+                timeout_seconds=self.timeout_seconds,
+            )
+        except Exception:
+            self.stats.failures += 1
+            raise
+
+        if self.cache is not None and results:
+            self.cache.put(provider.name, transcript, self.max_results, results)
+        return results
+
+    def _match(
+        self,
+        provider: str,
+        query: str,
+        max_results: int,
+    ) -> _Prefetch | None:
+        oldest = self.clock() - self.settings.max_age_seconds
+        self._prefetches = [
+            prefetch for prefetch in self._prefetches if prefetch.started_at >= oldest
+        ]
+
+        query = normalize_query(query)
+        for prefetch in self._prefetches:
+            if (
+                prefetch.provider != provider
+                or prefetch.query != query
+                or prefetch.max_results != max_results
+            ):
+                continue
+            if prefetch.task.done() and (
+                prefetch.task.cancelled() or prefetch.task.exception() is not None
+            ):
+                continue
+            return prefetch
+        return None
+
+
+def _retrieve_exception(task: asyncio.Task[list[SearchResult]]) -> None:
+    if not task.cancelled():
+        task.exception()
+
+
+def create_search_prefetcher(
+    env: Mapping[str, str | None],
+    provider_factory: Callable[[SearchCostBudget], Any],
+    max_results: int,
+    timeout_seconds: float,
+    cache: SearchResultCache | None = None,
+) -> SearchPrefetcher | None:
+    settings = load_search_prefetch_settings(env)
+    if not settings.enabled or settings.max_per_session <= 0:
+        return None
+    return SearchPrefetcher(
+        settings,
+        provider_factory,
+        max_results=max_results,
+        timeout_seconds=timeout_seconds,
+        cache=cache,
+    )
@@ -1,8 +1,28 @@
 from __future__ import annotations
 
-from typing import Any
+import asyncio
+import codecs
+import json
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable
 
-from web_search import SearchProviderConfig, SearchResult
+from voice_tracing import tracer
+from web_search import SearchCostBudget, SearchProviderConfig, SearchResult
+from web_search_constants import (
+    ADAPTIVE_PROVIDER,
+    ESTIMATED_PROVIDER_COSTS,
+    FAILOVER_PROVIDER,
+    RACE_PROVIDER,
+)
+from web_search_health import ProviderHealth
+
+logger = logging.getLogger(__name__)
+
+SearchProgressCallback = Callable[[list[SearchResult]], Awaitable[None]]
+
+PROVIDER_REQUEST_SPAN = "web_search.provider_request"
 
 
 def _first_text(value: Any) -> str:
@@ -13,9 +33,128 @@ def _first_text(value: Any) -> str:
     return ""
 
 
+async def search_with_progress(
+    provider: Any,
+    query: str,
+    max_results: int,
+    timeout_seconds: float,
+    on_progress: SearchProgressCallback | None = None,
+) -> list[SearchResult]:
+    if on_progress is not None and getattr(provider, "supports_progress", False):
+        return await provider.search(
+            query=query,
+            max_results=max_results,
+            timeout_seconds=timeout_seconds,
+            on_progress=on_progress,
+        )
+    return await provider.search(
+        query=query,
+        max_results=max_results,
+        timeout_seconds=timeout_seconds,
+    )
+
+
+class _ResultsArrayParser:
+    """Incrementally extracts the items of a top-level `results` JSON array.
+
+    Text is fed chunk by chunk; every complete object in the array is returned
+    as soon as its closing brace arrives, without waiting for the whole body.
+    """
+
+    def __init__(self) -> None:
+        self.buffer = ""
+        self.found_results = False
+        self.finished_results = False
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._position = 0
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._last_key: str | None = None
+        self._item_start = -1
+
+    def feed(self, chunk: bytes) -> list[Any]:
+        self.buffer += self._decoder.decode(chunk)
+        items: list[Any] = []
+        buffer = self.buffer
+        index = self._position
+        results_depth = 2
+
+        while index < len(buffer):
+            char = buffer[index]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._string_start >= 0:
+                        self._last_key = json.loads(
+                            buffer[self._string_start : index + 1]
+                        )
+                        self._string_start = -1
+            elif char == '"':
+                self._in_string = True
+                if len(self._stack) == 1:
+                    self._string_start = index
+            elif char in "{[":
+                if (
+                    char == "["
+                    and self._stack == ["{"]
+                    and self._last_key == "results"
+                    and not self.finished_results
+                ):
+                    self.found_results = True
+                elif (
+                    self.found_results
+                    and not self.finished_results
+                    and len(self._stack) == results_depth
+                ):
+                    self._item_start = index
+                self._stack.append(char)
+            elif char in "}]":
+                if not self._stack:
+                    raise ValueError("unbalanced JSON")
+                self._stack.pop()
+                if self._item_start >= 0 and len(self._stack) == results_depth:
+                    items.append(json.loads(buffer[self._item_start : index + 1]))
+                    self._item_start = -1
+                elif (
+                    self.found_results
+                    and char == "]"
+                    and len(self._stack) == results_depth - 1
+                ):
+                    self.finished_results = True
+            elif char == "," and len(self._stack) == 1:
+                self._last_key = None
+            index += 1
+
+        # Keep only the unfinished item (or nothing) so the buffer stays small.
+        keep_from = self._item_start if self._item_start >= 0 else index
+        if self._string_start >= 0:
+            keep_from = min(keep_from, self._string_start)
+        self.buffer = buffer[keep_from:]
+        self._position = index - keep_from
+        if self._item_start >= 0:
+            self._item_start -= keep_from
+        if self._string_start >= 0:
+            self._string_start -= keep_from
+        return items
+
+
+def _record_response(span: Any, response: Any) -> None:
+    span.set_attribute("http.response.status_code", response.status_code)
+    bytes_received = getattr(response, "num_bytes_downloaded", None)
+    if isinstance(bytes_received, int):
+        span.set_attribute("web_search.bytes_received", bytes_received)
+
+
 class _BaseSearchProvider:
     name: str
     missing_key_name: str
+    supports_progress = True
 
     def __init__(self, config: SearchProviderConfig, http_client: Any) -> None:
         self.config = config
@@ -26,27 +165,86 @@ class _BaseSearchProvider:
         query: str,
         max_results: int,
         timeout_seconds: float,
+        on_progress: SearchProgressCallback | None = None,
     ) -> list[SearchResult]:
         if not self.config.api_key:
             raise ValueError(f"{self.missing_key_name} is missing")
 
-        response = await self.http_client.post(
-            self.endpoint,
-            json=self._request_body(query=query, max_results=max_results),
-            headers=self._headers(),
-            timeout=timeout_seconds,
-        )
+        with tracer().start_as_current_span(
+            PROVIDER_REQUEST_SPAN,
+            attributes={"web_search.provider": self.name},
+        ) as span:
+            results = await self._request(
+                span, query, max_results, timeout_seconds, on_progress
+            )
+            span.set_attribute("web_search.result_count", len(results))
+            return results
+
+    async def _request(
+        self,
+        span: Any,
+        query: str,
+        max_results: int,
+        timeout_seconds: float,
+        on_progress: SearchProgressCallback | None,
+    ) -> list[SearchResult]:
+        request = {
+            "json": self._request_body(query=query, max_results=max_results),
+            "headers": self._headers(),
+            "timeout": timeout_seconds,
+        }
+        if on_progress is None or not hasattr(self.http_client, "stream"):
+            response = await self.http_client.post(self.endpoint, **request)
+            _record_response(span, response)
+            self._raise_for_status(response)
+            payload = response.json()
+            results = payload.get("results")
+            if not isinstance(results, list):
+                raise ValueError(f"{self.name} returned malformed data")
+            return [self._normalize_result(item) for item in results]
+
+        async with self.http_client.stream("POST", self.endpoint, **request) as response:
+            try:
+                self._raise_for_status(response)
+                return await self._read_streamed_results(response, on_progress)
+            finally:
+                _record_response(span, response)
+
+    async def _read_streamed_results(
+        self,
+        response: Any,
+        on_progress: SearchProgressCallback,
+    ) -> list[SearchResult]:
+        parser = _ResultsArrayParser()
+        results: list[SearchResult] = []
+        async for chunk in response.aiter_bytes():
+            items = parser.feed(chunk)
+            if not items:
+                continue
+            results.extend(
+                self._normalize_result(item) for item in items if isinstance(item, dict)
+            )
+            await on_progress(list(results))
+
+        if not parser.finished_results:
+            raise ValueError(f"{self.name} returned malformed data")
+        return results
+
+    def _raise_for_status(self, response: Any) -> None:
         if response.status_code >= 400:
             raise ValueError(
                 f"{self.name} search failed with HTTP {response.status_code}"
             )
 
-        payload = response.json()
-        results = payload.get("results")
-        if not isinstance(results, list):
-            raise ValueError(f"{self.name} returned malformed data")
-
-        return [self._normalize_result(item) for item in results]
+    async def warm_up(self, timeout_seconds: float) -> bool:
+        # A HEAD request resolves DNS and completes the TLS handshake so the
+        # first real search reuses a pooled connection. The status is ignored.
+        try:
+            await self.http_client.head(self.endpoint, timeout=timeout_seconds)
+        except Exception:
+            logger.debug("%s search warm-up failed", self.name, exc_info=True)
+            return False
+        return True
 
     def _request_body(self, query: str, max_results: int) -> dict[str, Any]:
         return {"query": query, "max_results": max_results}
@@ -141,3 +339,249 @@ class PerplexitySearchProvider(_BaseSearchProvider):
             published_at=item.get("date"),
             provider=self.name,
         )
+
+
+class HedgedSearchProvider:
+    """Races providers in order, hedging when the current one is slow.
+
+    Providers with an open circuit are skipped. The first provider starts
+    immediately. Each further provider starts when every running request has
+    failed, or when none has answered within `hedge_delay_seconds`. A provider
+    is only started while the session budget can pay for it; once it cannot,
+    the search fails with the last provider error. The first successful result
+    list wins and the remaining requests are cancelled.
+    """
+
+    name = RACE_PROVIDER
+
+    def __init__(
+        self,
+        providers: list[Any],
+        hedge_delay_seconds: float,
+        budget: SearchCostBudget,
+    ) -> None:
+        if not providers:
+            raise ValueError("Hedged search needs at least one provider")
+        self.providers = providers
+        self.hedge_delay_seconds = hedge_delay_seconds
+        self.budget = budget
+
+    async def search(
+        self,
+        query: str,
+        max_results: int,
+        timeout_seconds: float,
+    ) -> list[SearchResult]:
+        waiting = [
+            provider for provider in self.providers if not _circuit_is_open(provider)
+        ]
+        if not waiting:
+            raise ValueError("every web search provider circuit is open")
+        running: set[asyncio.Task[list[SearchResult]]] = set()
+        last_error: Exception | None = None
+
+        def launch(provider: Any) -> None:
+            self.budget.charge(provider.name)
+            running.add(
+                asyncio.create_task(
+                    provider.search(
+                        query=query,
+                        max_results=max_results,
+                        timeout_seconds=timeout_seconds,
+                    ),
+                    name=f"web_search_{provider.name}",
+                )
+            )
+
+        if not self.budget.can_afford(waiting[0].name):
+            raise ValueError("web search session budget is exhausted")
+        launch(waiting.pop(0))
+        try:
+            while running:
+                can_hedge = bool(waiting) and self.budget.can_afford(waiting[0].name)
+                done, running = await asyncio.wait(
+                    running,
+                    timeout=self.hedge_delay_seconds if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        return task.result()
+                    if not isinstance(error, Exception):
+                        raise error
+                    last_error = error
+                    logger.debug("Hedged %s search failed: %s", task.get_name(), error)
+
+                if waiting and self.budget.can_afford(waiting[0].name):
+                    launch(waiting.pop(0))
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        assert last_error is not None
+        raise last_error
+
+    async def warm_up(self, timeout_seconds: float) -> bool:
+        warmed = await asyncio.gather(
+            *(
+                provider.warm_up(timeout_seconds=timeout_seconds)
+                for provider in self.providers
+            )
+        )
+        return any(warmed)
+
+
+class CircuitBreakerSearchProvider:
+    """Records provider health and fails fast while its circuit is open."""
+
+    def __init__(self, provider: Any, health: ProviderHealth) -> None:
+        self.provider = provider
+        self.health = health
+        self.name = provider.name
+        self.supports_progress = getattr(provider, "supports_progress", False)
+
+    async def search(
+        self,
+        query: str,
+        max_results: int,
+        timeout_seconds: float,
+        on_progress: SearchProgressCallback | None = None,
+    ) -> list[SearchResult]:
+        self.health.acquire()
+        started = time.perf_counter()
+        try:
+            results = await search_with_progress(
+                self.provider,
+                query=query,
+                max_results=max_results,
+                timeout_seconds=timeout_seconds,
+                on_progress=on_progress,
+            )
+        except Exception:
+            self.health.record_failure(_elapsed_ms(started))
+            raise
+        except BaseException:
+            self.health.release()
+            raise
+
+        self.health.record_success(_elapsed_ms(started))
+        return results
+
+    async def warm_up(self, timeout_seconds: float) -> bool:
+        return await self.provider.warm_up(timeout_seconds=timeout_seconds)
+
+
+class FailoverSearchProvider:
+    """Tries providers one at a time, healthiest first.
+
+    Providers whose circuit is open are skipped without waiting. Providers with
+    a high rolling error rate move behind healthy ones; otherwise the
+    configured order is kept.
+    """
+
+    name = FAILOVER_PROVIDER
+
+    def __init__(self, providers: list[CircuitBreakerSearchProvider]) -> None:
+        if not providers:
+            raise ValueError("Failover search needs at least one provider")
+        self.providers = providers
+        self.supports_progress = any(
+            provider.supports_progress for provider in providers
+        )
+
+    def ordered_providers(self) -> list[CircuitBreakerSearchProvider]:
+        ranked = sorted(
+            enumerate(self.providers),
+            key=lambda item: (not item[1].health.healthy, item[0]),
+        )
+        return [provider for _, provider in ranked if not provider.health.is_open()]
+
+    async def search(
+        self,
+        query: str,
+        max_results: int,
+        timeout_seconds: float,
+        on_progress: SearchProgressCallback | None = None,
+    ) -> list[SearchResult]:
+        last_error: Exception | None = None
+        for provider in self.ordered_providers():
+            try:
+                return await search_with_progress(
+                    provider,
+                    query=query,
+                    max_results=max_results,
+                    timeout_seconds=timeout_seconds,
+                    on_progress=on_progress,
+                )
+            except Exception as error:
+                logger.warning("%s search failed; failing over: %s", provider.name, error)
+                last_error = error
+
+        if last_error is None:
+            raise ValueError("every web search provider circuit is open")
+        raise last_error
+
+    async def warm_up(self, timeout_seconds: float) -> bool:
+        providers = self.ordered_providers()
+        if not providers:
+            return False
+        return await providers[0].warm_up(timeout_seconds=timeout_seconds)
+
+
+class AdaptiveSearchProvider(FailoverSearchProvider):
+    """Routes each search to the provider with the best live latency/cost.
+
+    Scores come from the rolling stats recorded by real searches: expected
+    latency (EWMA latency divided by the EWMA success rate) plus the estimated
+    request cost weighted by `cost_weight_ms_per_cent`. Providers without
+    samples are tried first, and `exploration_rate` of searches go to a random
+    provider so stale stats keep getting refreshed. The remaining providers
+    act as a failover chain in score order.
+    """
+
+    name = ADAPTIVE_PROVIDER
+
+    def __init__(
+        self,
+        providers: list[CircuitBreakerSearchProvider],
+        exploration_rate: float,
+        cost_weight_ms_per_cent: float,
+        rng: random.Random | None = None,
+    ) -> None:
+        super().__init__(providers)
+        self.exploration_rate = exploration_rate
+        self.cost_weight_ms_per_cent = cost_weight_ms_per_cent
+        self.rng = rng or random.Random()
+
+    def score(self, provider: CircuitBreakerSearchProvider) -> float:
+        health = provider.health
+        if health.latency_ewma_ms is None:
+            return 0.0
+        success_rate = max(1 - health.error_rate_ewma, 0.05)
+        cost_cents = ESTIMATED_PROVIDER_COSTS.get(provider.name, 0) * 100
+        return (
+            health.latency_ewma_ms / success_rate
+            + cost_cents * self.cost_weight_ms_per_cent
+        )
+
+    def ordered_providers(self) -> list[CircuitBreakerSearchProvider]:
+        available = [
+            provider for provider in self.providers if not provider.health.is_open()
+        ]
+        ranked = sorted(available, key=self.score)
+        if len(ranked) > 1 and self.rng.random() < self.exploration_rate:
+            explored = ranked.pop(self.rng.randrange(1, len(ranked)))
+            ranked.insert(0, explored)
+        return ranked
+
+
+def _circuit_is_open(provider: Any) -> bool:
+    health = getattr(provider, "health", None)
+    return health is not None and health.is_open()
+
+
+def _elapsed_ms(started: float) -> float:
+    return (time.perf_counter() - started) * 1000
@@ -1,7 +1,9 @@
 import asyncio
 import json
 import sys
+import threading
 import unittest
+from dataclasses import replace
 from pathlib import Path
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, Mock, patch
@@ -9,6 +11,29 @@ from unittest.mock import AsyncMock, Mock, patch
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
 import agent
+import httpx
+from greeting_cache import CachedGreeting
+from livekit import rtc
+from session_metrics import STAGE_LLM_TTFT, STAGE_RESPONSE, LogSampler, TurnMetrics
+
+
+def run_with_persona_client(handler, fetch):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await fetch(client)
+
+    return asyncio.run(run())
+
+
+def fetch_persona_config(persona_id, user_id, handler):
+    return run_with_persona_client(
+        handler,
+        lambda client: agent.fetch_persona_config(
+            persona_id,
+            user_id,
+            http_client=client,
+        ),
+    )
 
 
 class PersonaAgentTests(unittest.TestCase):
@@ -34,6 +59,26 @@ class PersonaAgentTests(unittest.TestCase):
             },
         )
 
+    def test_tool_status_destinations_skip_non_rpc_participants(self):
+        def participant(kind):
+            return SimpleNamespace(kind=kind)
+
+        self.assertTrue(
+            agent.is_tool_status_destination(
+                participant(rtc.ParticipantKind.PARTICIPANT_KIND_STANDARD)
+            )
+        )
+        self.assertTrue(
+            agent.is_tool_status_destination(
+                participant(rtc.ParticipantKind.PARTICIPANT_KIND_AGENT)
+            )
+        )
+        self.assertFalse(
+            agent.is_tool_status_destination(
+                participant(rtc.ParticipantKind.PARTICIPANT_KIND_EGRESS)
+            )
+        )
+
     def test_get_job_metadata_falls_back_to_empty_object(self):
         ctx = SimpleNamespace(job=SimpleNamespace(metadata="{not-json"))
 
@@ -54,24 +99,24 @@ class PersonaAgentTests(unittest.TestCase):
                 "source_rights_status": "authorized",
             },
         }
-        response = Mock()
-        response.__enter__ = Mock(return_value=response)
-        response.__exit__ = Mock(return_value=None)
-        response.read.return_value = json.dumps(payload).encode("utf-8")
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json=payload)
 
         with (
             patch.object(agent, "PERSONA_BASE_URL", "http://localhost:3000"),
             patch.object(agent, "PERSONA_READ_SECRET", "read-secret"),
-            patch("agent.urllib.request.urlopen", return_value=response) as urlopen,
         ):
-            persona = agent.fetch_persona_config("wife-e2e", "user-123")
+            persona = fetch_persona_config("wife-e2e", "user-123", handler)
 
-        request = urlopen.call_args.args[0]
+        request = requests[0]
         self.assertEqual(
-            request.full_url,
+            str(request.url),
             "http://localhost:3000/api/personas/wife-e2e/agent?user_id=user-123",
         )
-        self.assertEqual(request.get_header("Authorization"), "Bearer read-secret")
+        self.assertEqual(request.headers["Authorization"], "Bearer read-secret")
         self.assertEqual(persona.id, "wife-e2e")
         self.assertEqual(persona.instructions, "Persona prompt with memory.")
         self.assertEqual(persona.greeting, "Say hello as this persona.")
@@ -80,31 +125,95 @@ class PersonaAgentTests(unittest.TestCase):
         self.assertTrue(persona.requires_cartesia_plugin)
 
     def test_fetch_persona_config_falls_back_on_fetch_failure(self):
-        with (
-            patch.object(agent, "PERSONA_BASE_URL", "http://localhost:3000"),
-            patch("agent.urllib.request.urlopen", side_effect=OSError("offline")),
-        ):
-            persona = agent.fetch_persona_config(agent.DEFAULT_PERSONA_ID, "user-123")
+        def handler(request):
+            raise httpx.ConnectError("offline", request=request)
+
+        with patch.object(agent, "PERSONA_BASE_URL", "http://localhost:3000"):
+            persona = fetch_persona_config(agent.DEFAULT_PERSONA_ID, "user-123", handler)
 
         self.assertEqual(persona.id, agent.DEFAULT_PERSONA_ID)
         self.assertEqual(persona.instructions, agent.DEFAULT_INSTRUCTIONS)
 
+    def test_fetch_persona_config_raises_for_switched_persona_http_error(self):
+        with patch.object(agent, "PERSONA_BASE_URL", "http://localhost:3000"):
+            with self.assertRaisesRegex(RuntimeError, "Could not load persona `wife-e2e`"):
+                fetch_persona_config(
+                    "wife-e2e",
+                    "user-123",
+                    lambda request: httpx.Response(503),
+                )
+
+    def test_fetch_persona_sends_etag_and_handles_not_modified(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(304)
+
+        with patch.object(agent, "PERSONA_BASE_URL", "http://localhost:3000"):
+            result = run_with_persona_client(
+                handler,
+                lambda client: agent.fetch_persona(
+                    "wife-e2e",
+                    "user-123",
+                    '"v1"',
+                    http_client=client,
+                ),
+            )
+
+        self.assertEqual(requests[0].headers["If-None-Match"], '"v1"')
+        self.assertIsNone(result.persona)
+        self.assertEqual(result.etag, '"v1"')
+
+    def test_fetch_persona_returns_response_etag(self):
+        payload = {"persona": {"id": "wife-e2e"}}
+
+        with patch.object(agent, "PERSONA_BASE_URL", "http://localhost:3000"):
+            result = run_with_persona_client(
+                lambda request: httpx.Response(
+                    200,
+                    json=payload,
+                    headers={"ETag": '"v2"'},
+                ),
+                lambda client: agent.fetch_persona(
+                    "wife-e2e",
+                    "user-123",
+                    http_client=client,
+                ),
+            )
+
+        self.assertEqual(result.persona.id, "wife-e2e")
+        self.assertEqual(result.etag, '"v2"')
+        self.assertTrue(result.cacheable)
+
+    def test_fetch_persona_does_not_cache_default_fallback(self):
+        def handler(request):
+            raise httpx.ConnectError("offline", request=request)
+
+        with patch.object(agent, "PERSONA_BASE_URL", "http://localhost:3000"):
+            result = run_with_persona_client(
+                handler,
+                lambda client: agent.fetch_persona(
+                    agent.DEFAULT_PERSONA_ID,
+                    "user-123",
+                    http_client=client,
+                ),
+            )
+
+        self.assertFalse(result.cacheable)
+
     def test_fetch_persona_config_rejects_missing_base_url_for_switched_persona(self):
         with patch.object(agent, "PERSONA_BASE_URL", None):
             with self.assertRaises(RuntimeError):
-                agent.fetch_persona_config("wife-e2e", "user-123")
+                asyncio.run(agent.fetch_persona_config("wife-e2e", "user-123"))
 
     def test_fetch_persona_config_falls_back_on_non_object_payload(self):
-        response = Mock()
-        response.__enter__ = Mock(return_value=response)
-        response.__exit__ = Mock(return_value=None)
-        response.read.return_value = json.dumps([]).encode("utf-8")
-
-        with (
-            patch.object(agent, "PERSONA_BASE_URL", "http://localhost:3000"),
-            patch("agent.urllib.request.urlopen", return_value=response),
-        ):
-            persona = agent.fetch_persona_config("wife-e2e", "user-123")
+        with patch.object(agent, "PERSONA_BASE_URL", "http://localhost:3000"):
+            persona = fetch_persona_config(
+                "wife-e2e",
+                "user-123",
+                lambda request: httpx.Response(200, json=[]),
+            )
 
         self.assertEqual(persona.id, agent.DEFAULT_PERSONA_ID)
 
@@ -121,16 +230,13 @@ class PersonaAgentTests(unittest.TestCase):
                 "source_rights_status": "unknown",
             },
         }
-        response = Mock()
-        response.__enter__ = Mock(return_value=response)
-        response.__exit__ = Mock(return_value=None)
-        response.read.return_value = json.dumps(payload).encode("utf-8")
 
-        with (
-            patch.object(agent, "PERSONA_BASE_URL", "http://localhost:3000"),
-            patch("agent.urllib.request.urlopen", return_value=response),
-        ):
-            persona = agent.fetch_persona_config("wife-e2e", "user-123")
+        with patch.object(agent, "PERSONA_BASE_URL", "http://localhost:3000"):
+            persona = fetch_persona_config(
+                "wife-e2e",
+                "user-123",
+                lambda request: httpx.Response(200, json=payload),
+            )
 
         self.assertFalse(persona.requires_cartesia_plugin)
         self.assertEqual(persona.tts_voice_id, agent.TTS_VOICE_ID)
@@ -148,20 +254,26 @@ class PersonaAgentTests(unittest.TestCase):
                 "source_rights_status": "owned",
             },
         }
-        response = Mock()
-        response.__enter__ = Mock(return_value=response)
-        response.__exit__ = Mock(return_value=None)
-        response.read.return_value = json.dumps(payload).encode("utf-8")
 
-        with (
-            patch.object(agent, "PERSONA_BASE_URL", "http://localhost:3000"),
-            patch("agent.urllib.request.urlopen", return_value=response),
-        ):
-            persona = agent.fetch_persona_config("public-voice", "user-123")
+        with patch.object(agent, "PERSONA_BASE_URL", "http://localhost:3000"):
+            persona = fetch_persona_config(
+                "public-voice",
+                "user-123",
+                lambda request: httpx.Response(200, json=payload),
+            )
 
         self.assertTrue(persona.requires_cartesia_plugin)
         self.assertEqual(persona.tts_voice_id, "public-voice-123")
 
+    def test_cloned_voice_personas_are_not_served_stale(self):
+        self.assertTrue(agent.persona_may_be_served_stale(agent.default_persona()))
+        cloned = replace(agent.default_persona(), requires_cartesia_plugin=True)
+        self.assertFalse(agent.persona_may_be_served_stale(cloned))
+        self.assertIs(
+            agent.get_shared_persona_cache().serve_stale,
+            agent.persona_may_be_served_stale,
+        )
+
     def test_create_tts_uses_cartesia_plugin_for_custom_voice(self):
         persona = agent.PersonaConfig(
             id="wife-e2e",
@@ -307,6 +419,63 @@ class PersonaAgentTests(unittest.TestCase):
         self.assertEqual(session._tts, "new-tts")
         self.assertEqual(session._tts_error_counts, 0)
 
+    def test_update_session_tts_reuses_pooled_engine(self):
+        persona = agent.default_persona()
+        session = SimpleNamespace(_tts="initial-tts", _tts_error_counts=2)
+        pool = agent.TtsEnginePool(
+            lambda _persona: object(),
+            max_size=2,
+            idle_seconds=300,
+        )
+
+        first_hit = agent.update_session_tts(session, persona, pool)
+        pooled_tts = session._tts
+        session._tts = "other-tts"
+        pool.release(pooled_tts)
+        second_hit = agent.update_session_tts(session, persona, pool)
+
+        self.assertFalse(first_hit)
+        self.assertTrue(second_hit)
+        self.assertIs(session._tts, pooled_tts)
+        self.assertEqual(session._tts_error_counts, 0)
+
+    def test_initial_session_tts_comes_from_the_pool(self):
+        original = agent.default_persona()
+        other = agent.PersonaConfig(
+            id="wife-e2e",
+            agent_id="agent",
+            instructions="Prompt",
+            greeting="Hello",
+            tts_model="cartesia/sonic-3.5",
+            tts_voice_id="voice-123",
+            tts_language="en",
+            tts_options={},
+            requires_cartesia_plugin=False,
+        )
+        pool = agent.TtsEnginePool(
+            lambda _persona: object(),
+            max_size=2,
+            idle_seconds=300,
+        )
+        models = agent.SessionModels(stt="stt", llm="llm", tts=None)
+
+        with patch.object(
+            agent,
+            "AgentSession",
+            side_effect=lambda **kwargs: SimpleNamespace(
+                _tts=kwargs["tts"], _tts_error_counts=0
+            ),
+        ):
+            session = agent.create_agent_session(original, models, pool)
+        initial_tts = session._tts
+
+        agent.update_session_tts(session, other, pool)
+        switched_back_hit = agent.update_session_tts(session, original, pool)
+
+        self.assertTrue(switched_back_hit)
+        self.assertIs(session._tts, initial_tts)
+        self.assertEqual(pool.stats.misses, 2)
+
     def test_interrupt_active_speech_forces_current_output_to_stop(self):
         session = SimpleNamespace(interrupt=AsyncMock())
 
@@ -344,18 +513,361 @@ class PersonaAgentTests(unittest.TestCase):
         )
 
         with (
-            patch.object(agent, "fetch_persona_config", return_value=persona) as fetch,
+            patch.object(
+                agent,
+                "get_persona_config",
+                AsyncMock(return_value=agent.PersonaCacheLookup(persona, "hit")),
+            ) as fetch,
             patch.object(agent, "create_tts", return_value="new-tts"),
         ):
             response = asyncio.run(
                 agent.create_persona_tts_switch_rpc_handler(session)(data)
             )
 
-        fetch.assert_called_once_with("wife-e2e", "testing-user")
+        fetch.assert_awaited_once_with("wife-e2e", "testing-user")
         self.assertEqual(session._tts, "new-tts")
         session.interrupt.assert_awaited_once_with(force=True)
         self.assertEqual(json.loads(response)["tts_voice_id"], "voice-123")
 
+    def test_search_provider_warm_up_runs_in_background_and_cancels_on_shutdown(self):
+        provider = SimpleNamespace(name="parallel", warm_up=AsyncMock(return_value=True))
+        shutdown_callbacks = []
+        ctx = SimpleNamespace(add_shutdown_callback=shutdown_callbacks.append)
+
+        with patch.dict(agent.os.environ, {"PARALLEL_API_KEY": "parallel-key"}, clear=True):
+            settings = agent.load_web_search_settings(agent.os.environ)
+
+        async def run():
+            task = agent.start_search_provider_warm_up(ctx, settings)
+            await task
+            await shutdown_callbacks[0]()
+            return task
+
+        with (
+            patch.object(agent, "load_web_search_settings") as load_settings,
+            patch.object(
+                agent, "create_search_provider", return_value=provider
+            ) as create_provider,
+        ):
+            task = asyncio.run(run())
+
+        self.assertTrue(task.done())
+        load_settings.assert_not_called()
+        self.assertIs(create_provider.call_args.args[0], settings)
+        self.assertIs(
+            create_provider.call_args.args[1], agent.get_shared_http_client_pool()
+        )
+        self.assertIs(
+            create_provider.call_args.kwargs["health"],
+            agent.get_shared_provider_health(agent.os.environ),
+        )
+        provider.warm_up.assert_awaited_once_with(
+            timeout_seconds=agent.DEFAULT_WEB_SEARCH_WARM_UP_TIMEOUT_SECONDS
+        )
+
+    def test_close_process_resources_closes_the_http_pool_and_search_cache(self):
+        pool = SimpleNamespace(aclose=AsyncMock())
+
+        with (
+            patch.object(agent, "get_shared_http_client_pool", return_value=pool),
+            patch.object(agent, "close_shared_search_cache") as close_cache,
+        ):
+            asyncio.run(agent.close_process_resources())
+
+        pool.aclose.assert_awaited_once_with()
+        close_cache.assert_called_once_with()
+
+    def test_search_provider_warm_up_is_skipped_without_search_settings(self):
+        ctx = SimpleNamespace(add_shutdown_callback=Mock())
+
+        with self.assertLogs("portfolio_agent", level="WARNING"):
+            self.assertIsNone(agent.start_search_provider_warm_up(ctx, None))
+
+        ctx.add_shutdown_callback.assert_not_called()
+
+    def test_entrypoint_fetches_persona_while_room_connects(self):
+        events = []
+        connect_release = asyncio.Event()
+        persona = agent.default_persona()
+
+        async def connect():
+            events.append("connect_started")
+            await connect_release.wait()
+            events.append("connect_finished")
+
+        async def get_persona_config(persona_id, user_id):
+            events.append(("persona", persona_id, user_id))
+            connect_release.set()
+            return agent.PersonaCacheLookup(persona, "miss")
+
+        session = Mock()
+        session.start = AsyncMock()
+        session.generate_reply = AsyncMock()
+        ctx = SimpleNamespace(
+            job=SimpleNamespace(
+                id="job-123",
+                metadata=json.dumps({"persona_id": "wife-e2e", "user_id": "user-123"}),
+            ),
+            room=SimpleNamespace(
+                name="room-123",
+                local_participant=SimpleNamespace(register_rpc_method=Mock()),
+            ),
+            connect=connect,
+            add_shutdown_callback=Mock(),
+        )
+        portfolio_agent = SimpleNamespace(search_prefetcher=None)
+
+        with (
+            patch.object(agent, "start_search_provider_warm_up", return_value=None),
+            patch.object(agent, "get_persona_config", get_persona_config),
+            patch.object(agent, "create_session_models", return_value="models"),
+            patch.object(agent, "create_agent_session", return_value=session) as create,
+            patch.object(agent, "PortfolioAgent", return_value=portfolio_agent),
+        ):
+            asyncio.run(agent.entrypoint(ctx))
+
+        self.assertEqual(
+            events,
+            [
+                "connect_started",
+                ("persona", "wife-e2e", "user-123"),
+                "connect_finished",
+            ],
+        )
+        create.assert_called_once_with(persona, "models", agent.get_shared_tts_pool())
+        session.start.assert_awaited_once()
+        session.generate_reply.assert_awaited_once_with(instructions=persona.greeting)
+
+    def test_prewarm_stores_worker_state_for_jobs(self):
+        proc = SimpleNamespace(userdata={})
+        env = {"WEB_SEARCH_PROVIDER": "parallel", "PARALLEL_API_KEY": "parallel-key"}
+
+        with (
+            patch.dict("os.environ", env, clear=True),
+            patch.object(agent, "create_session_models", return_value="models"),
+        ):
+            agent.prewarm(proc)
+
+        state = proc.userdata[agent.WORKER_STATE_KEY]
+        self.assertTrue(state.prewarmed)
+        self.assertEqual(state.session_models, "models")
+        self.assertEqual(state.search_settings.api_key, "parallel-key")
+        self.assertEqual(state.default_persona.id, agent.DEFAULT_PERSONA_ID)
+        self.assertIs(
+            agent.get_worker_state(SimpleNamespace(proc=proc)),
+            state,
+        )
+
+    def test_get_worker_state_builds_state_without_prewarm(self):
+        with (
+            patch.dict("os.environ", {}, clear=True),
+            patch.object(agent, "create_session_models", return_value="models"),
+        ):
+            state = agent.get_worker_state(SimpleNamespace(proc=None))
+
+        self.assertFalse(state.prewarmed)
+        self.assertIsNone(state.search_settings)
+
+    def test_prewarm_survives_session_model_errors(self):
+        proc = SimpleNamespace(userdata={})
+
+        with (
+            patch.dict("os.environ", {}, clear=True),
+            patch.object(
+                agent,
+                "create_session_models",
+                side_effect=ValueError("OPENAI_API_KEY is missing"),
+            ),
+            self.assertLogs("portfolio_agent", level="WARNING") as logs,
+        ):
+            agent.prewarm(proc)
+
+        state = proc.userdata[agent.WORKER_STATE_KEY]
+        self.assertTrue(state.prewarmed)
+        self.assertIsNone(state.session_models)
+        self.assertIn("OPENAI_API_KEY is missing", "\n".join(logs.output))
+
+    def test_play_greeting_uses_cached_audio_when_available(self):
+        persona = agent.default_persona()
+        session = SimpleNamespace(
+            tts=SimpleNamespace(provider="openai", model="tts-1"),
+            say=AsyncMock(),
+            generate_reply=AsyncMock(),
+        )
+        cached = CachedGreeting(
+            text="Hi, ready for a quick voice test.",
+            sample_rate=24_000,
+            num_channels=1,
+            pcm=b"\x00\x00" * 480,
+        )
+        load_threads = []
+
+        def load(key):
+            load_threads.append(threading.get_ident())
+            return cached
+
+        greeting_cache = Mock()
+        greeting_cache.load.side_effect = load
+
+        asyncio.run(
+            agent.play_greeting(
+                session, SimpleNamespace(greeting_recorder=None), persona, greeting_cache
+            )
+        )
+
+        greeting_cache.load.assert_called_once_with(
+            agent.persona_greeting_cache_key(persona, session.tts)
+        )
+        # The .pcm read must not block the event loop thread.
+        self.assertNotEqual(load_threads, [threading.get_ident()])
+        session.say.assert_awaited_once()
+        self.assertEqual(session.say.call_args.args, (cached.text,))
+        self.assertTrue(session.say.call_args.kwargs["add_to_chat_ctx"])
+        session.generate_reply.assert_not_called()
+
+    def test_play_greeting_caches_rendered_greeting_on_miss(self):
+        persona = agent.default_persona()
+
+        class FakeHandle:
+            interrupted = False
+            chat_items = [
+                SimpleNamespace(role="assistant", text_content="Hi, ready to test."),
+            ]
+
+            def __await__(self):
+                yield from asyncio.sleep(0).__await__()
+                return self
+
+        portfolio_agent = SimpleNamespace(greeting_recorder=None)
+        frame = rtc.AudioFrame(
+            data=b"\x01\x00" * 480,
+            sample_rate=24_000,
+            num_channels=1,
+            samples_per_channel=480,
+        )
+
+        def generate_reply(**kwargs):
+            # Stands in for the live tts_node output of the first playback.
+            portfolio_agent.greeting_recorder.add(frame)
+            return FakeHandle()
+
+        session = SimpleNamespace(
+            tts=SimpleNamespace(provider="openai", model="tts-1"),
+            generate_reply=Mock(side_effect=generate_reply),
+        )
+        greeting_cache = Mock()
+        greeting_cache.load.return_value = None
+
+        asyncio.run(
+            agent.play_greeting(session, portfolio_agent, persona, greeting_cache)
+        )
+
+        session.generate_reply.assert_called_once_with(instructions=persona.greeting)
+        self.assertIsNone(portfolio_agent.greeting_recorder)
+        greeting_cache.store.assert_called_once_with(
+            agent.persona_greeting_cache_key(persona, session.tts),
+            CachedGreeting(
+                text="Hi, ready to test.",
+                sample_rate=24_000,
+                num_channels=1,
+                pcm=b"\x01\x00" * 480,
+            ),
+        )
+
+    def test_greeting_cache_key_depends_on_compiled_prompt(self):
+        persona = agent.default_persona()
+        tts = SimpleNamespace(provider="openai", model="tts-1")
+        other_user = replace(persona, instructions="Prompt compiled for Sam.")
+
+        self.assertNotEqual(
+            agent.persona_greeting_cache_key(persona, tts),
+            agent.persona_greeting_cache_key(other_user, tts),
+        )
+
+    def test_tts_node_records_frames_for_active_greeting(self):
+        frames = [
+            rtc.AudioFrame(
+                data=b"\x01\x00" * 240,
+                sample_rate=24_000,
+                num_channels=1,
+                samples_per_channel=240,
+            )
+            for _ in range(2)
+        ]
+
+        async def default_tts_node(agent_, text, model_settings):
+            for frame in frames:
+                yield frame
+
+        async def collect(portfolio_agent):
+            return [frame async for frame in portfolio_agent.tts_node(None, None)]
+
+        portfolio_agent = agent.PortfolioAgent(
+            agent_id="agent",
+            instructions="Be brief.",
+            search_settings=agent.load_web_search_settings(
+                {"WEB_SEARCH_PROVIDER": "parallel", "PARALLEL_API_KEY": "key"}
+            ),
+        )
+        recorder = agent.GreetingRecorder()
+        with patch.object(agent.Agent.default, "tts_node", default_tts_node):
+            self.assertEqual(asyncio.run(collect(portfolio_agent)), frames)
+            portfolio_agent.greeting_recorder = recorder
+            self.assertEqual(asyncio.run(collect(portfolio_agent)), frames)
+
+        self.assertEqual(len(recorder.greeting("Hello.").pcm), 480 * 2)
+
+    def test_session_observability_records_turn_latency_and_samples_logs(self):
+        session = rtc.EventEmitter()
+        turn_metrics = TurnMetrics()
+        agent.register_session_observability(
+            session,
+            turn_metrics,
+            LogSampler(0.0),
+        )
+
+        with patch.object(agent, "_truncate_for_log") as truncate:
+            session.emit(
+                "user_state_changed",
+                SimpleNamespace(old_state="speaking", new_state="listening", created_at=10.0),
+            )
+            session.emit(
+                "user_input_transcribed",
+                SimpleNamespace(transcript="what is the weather", is_final=True),
+            )
+            session.emit(
+                "metrics_collected",
+                SimpleNamespace(
+                    metrics=SimpleNamespace(
+                        type="llm_metrics",
+                        timestamp=11.0,
+                        duration=0.6,
+                        ttft=0.25,
+                        total_tokens=30,
+                        cancelled=False,
+                    )
+                ),
+            )
+            session.emit(
+                "agent_state_changed",
+                SimpleNamespace(old_state="thinking", new_state="speaking", created_at=10.8),
+            )
+            session.emit(
+                "agent_state_changed",
+                SimpleNamespace(old_state="listening", new_state="speaking", created_at=12.0),
+            )
+
+        truncate.assert_not_called()
+        stages = turn_metrics.as_dict()["stages"]
+        self.assertEqual(stages[STAGE_LLM_TTFT]["p50_ms"], 250.0)
+        self.assertEqual(stages[STAGE_RESPONSE]["count"], 1)
+        self.assertEqual(stages[STAGE_RESPONSE]["p50_ms"], 800.0)
+
+    def test_truncate_for_log_collapses_whitespace_in_prefix(self):
+        self.assertEqual(agent._truncate_for_log("  a \n b  "), "a b")
+        truncated = agent._truncate_for_log("word " * 1000, max_chars=20)
+        self.assertEqual(truncated, "word word word wo...")
+
     def test_session_recording_options_defaults_to_full_livekit_insights(self):
         with patch.dict(agent.os.environ, {}, clear=True):
             self.assertEqual(
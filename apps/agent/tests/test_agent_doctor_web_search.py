@@ -30,12 +30,12 @@ class AgentDoctorWebSearchTests(unittest.TestCase):
         }
 
         with patch.dict(os.environ, env, clear=True):
-            import agent
+            import agent_config
 
-            agent = importlib.reload(agent)
+            agent_config = importlib.reload(agent_config)
             output = io.StringIO()
             with contextlib.redirect_stdout(output):
-                exit_code = agent.print_env_doctor()
+                exit_code = agent_config.print_env_doctor()
 
         text = output.getvalue()
 
@@ -61,12 +61,12 @@ class AgentDoctorWebSearchTests(unittest.TestCase):
         }
 
         with patch.dict(os.environ, env, clear=True):
-            import agent
+            import agent_config
 
-            agent = importlib.reload(agent)
+            agent_config = importlib.reload(agent_config)
             output = io.StringIO()
             with contextlib.redirect_stdout(output):
-                exit_code = agent.print_env_doctor()
+                exit_code = agent_config.print_env_doctor()
 
         text = output.getvalue()
 
@@ -88,12 +88,12 @@ class AgentDoctorWebSearchTests(unittest.TestCase):
         }
 
         with patch.dict(os.environ, env, clear=True):
-            import agent
+            import agent_config
 
-            agent = importlib.reload(agent)
+            agent_config = importlib.reload(agent_config)
             output = io.StringIO()
             with contextlib.redirect_stdout(output):
-                exit_code = agent.print_env_doctor()
+                exit_code = agent_config.print_env_doctor()
 
         text = output.getvalue()
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import sys
 import unittest
 from pathlib import Path
@@ -7,8 +8,17 @@ from json import JSONDecodeError
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
-from agent_web_search import SearchToolStatusNotifier, run_web_search_tool  # noqa: E402
+from agent_web_search import (  # noqa: E402
+    SearchCoalescer,
+    SearchToolStatusNotifier,
+    run_web_search_tool,
+)
 from web_search import SearchResult  # noqa: E402
+from web_search_cache import SearchCacheSettings, SearchResultCache  # noqa: E402
+from web_search_prefetch import (  # noqa: E402
+    SearchPrefetcher,
+    SearchPrefetchSettings,
+)
 
 
 class FakeProvider:
@@ -31,6 +41,51 @@ class FakeProvider:
         ]
 
 
+class CountingProvider(FakeProvider):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def search(
+        self,
+        query: str,
+        max_results: int,
+        timeout_seconds: float,
+    ) -> list[SearchResult]:
+        self.calls += 1
+        return await super().search(query, max_results, timeout_seconds)
+
+
+class SlowProvider(CountingProvider):
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = asyncio.Event()
+
+    async def search(
+        self,
+        query: str,
+        max_results: int,
+        timeout_seconds: float,
+    ) -> list[SearchResult]:
+        await self.release.wait()
+        return await super().search(query, max_results, timeout_seconds)
+
+
+class StreamingProvider(FakeProvider):
+    supports_progress = True
+
+    async def search(
+        self,
+        query: str,
+        max_results: int,
+        timeout_seconds: float,
+        on_progress=None,
+    ) -> list[SearchResult]:
+        results = await super().search(query, max_results, timeout_seconds)
+        if on_progress is not None:
+            await on_progress(results)
+        return results
+
+
 class FailingProvider:
     name = "parallel"
 
@@ -74,6 +129,9 @@ class RecordingNotifier(SearchToolStatusNotifier):
     async def started(self, summary: str, provider: str) -> None:
         self.events.append(("started", f"{provider}:{summary}"))
 
+    async def progress(self, results: list[SearchResult]) -> None:
+        self.events.append(("progress", results[0].url if results else ""))
+
     async def finished(self, results: list[SearchResult]) -> None:
         self.events.append(("finished", results[0].url if results else ""))
 
@@ -103,6 +161,23 @@ class AgentWebSearchToolTests(unittest.IsolatedAsyncioTestCase):
         )
         self.assertIn(("finished", "https://parallel.ai/pricing"), notifier.events)
 
+    async def test_tool_forwards_partial_results_to_notifier_progress(self) -> None:
+        notifier = RecordingNotifier()
+
+        await run_web_search_tool(
+            summary="Compare search provider pricing",
+            query="Parallel Search API pricing",
+            provider=StreamingProvider(),
+            notifier=notifier,
+            max_results=5,
+            timeout_seconds=8,
+        )
+
+        self.assertEqual(
+            [event for event, _ in notifier.events],
+            ["started", "progress", "finished"],
+        )
+
     async def test_tool_returns_safe_message_for_missing_provider_key(self) -> None:
         notifier = RecordingNotifier()
 
@@ -158,5 +233,171 @@ class AgentWebSearchToolTests(unittest.IsolatedAsyncioTestCase):
         self.assertIn(("failed", "provider returned malformed data"), notifier.events)
 
 
+    async def test_tool_serves_repeated_queries_from_cache(self) -> None:
+        notifier = RecordingNotifier()
+        provider = CountingProvider()
+        cache = SearchResultCache(
+            SearchCacheSettings(
+                enabled=True,
+                max_entries=10,
+                max_bytes=100_000,
+                ttl_seconds=300,
+                live_ttl_seconds=60,
+                reference_ttl_seconds=1_800,
+            )
+        )
+
+        for query in ("Parallel Search API pricing", "parallel search api pricing?"):
+            result = await run_web_search_tool(
+                summary="Compare search provider pricing",
+                query=query,
+                provider=provider,
+                notifier=notifier,
+                max_results=5,
+                timeout_seconds=8,
+                cache=cache,
+            )
+
+        self.assertEqual(provider.calls, 1)
+        self.assertIn("https://parallel.ai/pricing", result)
+        self.assertEqual(cache.stats.hits, 1)
+        self.assertEqual(
+            [event for event, _ in notifier.events],
+            ["started", "finished", "started", "finished"],
+        )
+
+
+    async def test_tool_answers_from_matching_prefetch(self) -> None:
+        notifier = RecordingNotifier()
+        provider = CountingProvider()
+        prefetcher = SearchPrefetcher(
+            SearchPrefetchSettings(enabled=True, max_per_session=3, budget_usd=0.02),
+            lambda _budget: provider,
+            max_results=5,
+            timeout_seconds=8,
+        )
+
+        prefetch = prefetcher.on_transcript(
+            "what's the latest parallel search api pricing",
+            is_final=False,
+        )
+        result = await run_web_search_tool(
+            summary="Compare search provider pricing",
+            query="What's the latest Parallel Search API pricing?",
+            provider=provider,
+            notifier=notifier,
+            max_results=5,
+            timeout_seconds=8,
+            prefetcher=prefetcher,
+        )
+
+        self.assertIsNotNone(prefetch)
+        self.assertEqual(provider.calls, 1)
+        self.assertIn("https://parallel.ai/pricing", result)
+        self.assertEqual(prefetcher.stats.hits, 1)
+        self.assertEqual(
+            [event for event, _ in notifier.events],
+            ["started", "finished"],
+        )
+
+    async def test_tool_coalesces_identical_concurrent_searches(self) -> None:
+        provider = SlowProvider()
+        coalescer = SearchCoalescer()
+        notifiers = [RecordingNotifier() for _ in range(3)]
+        searches = [
+            asyncio.create_task(
+                run_web_search_tool(
+                    summary="Compare search provider pricing",
+                    query="Parallel Search API pricing",
+                    provider=provider,
+                    notifier=notifier,
+                    max_results=5,
+                    timeout_seconds=8,
+                    coalescer=coalescer,
+                )
+            )
+            for notifier in notifiers
+        ]
+        await asyncio.sleep(0)
+        provider.release.set()
+
+        results = await asyncio.gather(*searches)
+
+        self.assertEqual(provider.calls, 1)
+        self.assertEqual(coalescer.stats.requests, 3)
+        self.assertEqual(coalescer.stats.coalesced, 2)
+        self.assertTrue(all("https://parallel.ai/pricing" in result for result in results))
+        for notifier in notifiers:
+            self.assertEqual(
+                [event for event, _ in notifier.events],
+                ["started", "finished"],
+            )
+
+    async def test_coalesced_search_survives_leader_cancellation(self) -> None:
+        provider = SlowProvider()
+        coalescer = SearchCoalescer()
+        leader = asyncio.create_task(
+            coalescer.search(provider, "same query", max_results=5, timeout_seconds=8)
+        )
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(
+            coalescer.search(provider, "same query", max_results=5, timeout_seconds=8)
+        )
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        provider.release.set()
+
+        self.assertEqual(len(await follower), 1)
+        self.assertEqual(provider.calls, 1)
+
+    async def test_coalesced_search_is_cancelled_when_every_caller_leaves(
+        self,
+    ) -> None:
+        provider = SlowProvider()
+        coalescer = SearchCoalescer()
+        callers = [
+            asyncio.create_task(
+                coalescer.search(
+                    provider, "same query", max_results=5, timeout_seconds=8
+                )
+            )
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        shared = next(iter(coalescer._in_flight.values()))
+
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.gather(shared, return_exceptions=True)
+
+        self.assertTrue(shared.cancelled())
+        self.assertEqual(coalescer._in_flight, {})
+        self.assertEqual(coalescer._waiters, {})
+
+        provider.release.set()
+        results = await coalescer.search(
+            provider, "same query", max_results=5, timeout_seconds=8
+        )
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(provider.calls, 1)
+        self.assertEqual(coalescer.stats.coalesced, 1)
+
+    async def test_coalescer_propagates_provider_errors_to_every_caller(self) -> None:
+        coalescer = SearchCoalescer()
+
+        with self.assertRaisesRegex(TimeoutError, "provider timed out"):
+            await coalescer.search(
+                TimeoutProvider(),
+                "same query",
+                max_results=5,
+                timeout_seconds=8,
+            )
+
+        self.assertEqual(coalescer._in_flight, {})
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from benchmark_import_time import (  # noqa: E402
+    IMPORT_TARGETS,
+    ImportTarget,
+    ImportTimeRun,
+    import_benchmark_failures,
+    measure_import_time,
+    measure_startup_modules,
+    parse_importtime,
+    summarize_target,
+    target_budget_ms,
+    total_import_ms,
+    without_startup_imports,
+    write_import_time_report,
+)
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        900 |     json.decoder
+import time:       500 |       1400 |   json
+import time:      2000 |       3400 | agent_config
+import time:       100 |        100 | site
+"""
+
+
+def run_with(total_ms: float, modules: str = IMPORTTIME_OUTPUT) -> ImportTimeRun:
+    return ImportTimeRun(
+        target="doctor",
+        total_ms=total_ms,
+        modules=parse_importtime(modules),
+    )
+
+
+class ImportTimeBenchmarkTests(unittest.TestCase):
+    def test_parses_importtime_depth_and_totals(self) -> None:
+        modules = parse_importtime(IMPORTTIME_OUTPUT)
+
+        self.assertEqual(
+            [(module.module, module.depth) for module in modules],
+            [
+                ("_io", 1),
+                ("json.decoder", 2),
+                ("json", 1),
+                ("agent_config", 0),
+                ("site", 0),
+            ],
+        )
+        self.assertEqual(total_import_ms(modules), 3.5)
+
+    def test_startup_imports_are_left_out_of_the_total(self) -> None:
+        modules = without_startup_imports(
+            parse_importtime(IMPORTTIME_OUTPUT), frozenset({"site"})
+        )
+
+        self.assertEqual(
+            [module.module for module in modules],
+            ["_io", "json.decoder", "json", "agent_config"],
+        )
+        self.assertEqual(total_import_ms(modules), 3.4)
+        self.assertEqual(
+            without_startup_imports(
+                parse_importtime(IMPORTTIME_OUTPUT), frozenset({"agent_config"})
+            )[-1].module,
+            "site",
+        )
+
+    def test_summary_flags_budget_and_forbidden_packages(self) -> None:
+        target = ImportTarget(
+            name="doctor",
+            module="agent_config",
+            budget_env="TEST_BUDGET_MS",
+            default_budget_ms=None,
+            forbidden_packages=("json", "livekit"),
+        )
+
+        summary = summarize_target(target, [run_with(4.0), run_with(6.0)], 4.5)
+
+        self.assertEqual(summary["median_ms"], 5.0)
+        self.assertEqual(summary["min_ms"], 4.0)
+        self.assertTrue(summary["over_budget"])
+        self.assertEqual(summary["forbidden_loaded"], ["json"])
+        self.assertEqual(summary["top_modules"][0]["module"], "agent_config")
+        self.assertEqual(len(import_benchmark_failures([summary])), 2)
+
+    def test_budget_env_overrides_default(self) -> None:
+        target = IMPORT_TARGETS[0]
+
+        self.assertEqual(target_budget_ms(target, {}), target.default_budget_ms)
+        self.assertEqual(target_budget_ms(target, {target.budget_env: "90"}), 90.0)
+
+    def test_doctor_target_does_not_import_worker_runtime(self) -> None:
+        target = IMPORT_TARGETS[0]
+
+        run = measure_import_time(target)
+
+        loaded = {module.module.split(".")[0] for module in run.modules}
+        self.assertIn("agent_config", loaded)
+        self.assertFalse(loaded & set(target.forbidden_packages))
+        roots = {module.module for module in run.modules if module.depth == 0}
+        self.assertFalse(roots & measure_startup_modules())
+
+    def test_writes_json_report(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = Path(temp_dir) / "reports" / "import-time.json"
+
+            write_import_time_report(output_path, [{"target": "doctor"}])
+
+            report = json.loads(output_path.read_text())
+
+        self.assertEqual(report["targets"], [{"target": "doctor"}])
+        self.assertIn("python", report)
+
+
+if __name__ == "__main__":
+    unittest.main()
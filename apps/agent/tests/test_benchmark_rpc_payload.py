@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from agent_web_search import MAX_STATUS_RPC_PAYLOAD_BYTES  # noqa: E402
+from benchmark_rpc_payload import (  # noqa: E402
+    benchmark_payloads,
+    run_rpc_payload_benchmark,
+)
+
+
+class BenchmarkRpcPayloadTests(unittest.TestCase):
+    def test_every_message_fits_the_status_rpc_budget(self) -> None:
+        summaries = run_rpc_payload_benchmark(number=1)
+
+        self.assertEqual(
+            [summary["case"] for summary in summaries], list(benchmark_payloads())
+        )
+        for summary in summaries:
+            self.assertLessEqual(
+                summary["max_message_bytes"], MAX_STATUS_RPC_PAYLOAD_BYTES
+            )
+            self.assertGreater(summary["us_per_call"], 0)
+        # Even the largest case is chunked rather than cut down.
+        self.assertGreater(summaries[-2]["messages"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
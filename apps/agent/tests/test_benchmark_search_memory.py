@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from benchmark_search_memory import run_memory_benchmark  # noqa: E402
+
+
+class BenchmarkSearchMemoryTests(unittest.TestCase):
+    def test_reports_bounded_bytes_per_search_for_each_provider(self) -> None:
+        summaries = run_memory_benchmark(max_results=3)
+
+        self.assertEqual(
+            [summary["provider"] for summary in summaries],
+            ["parallel", "exa", "perplexity"],
+        )
+        for summary in summaries:
+            self.assertGreater(summary["snippet_chars"], 0)
+            self.assertGreater(summary["bytes_per_search"], summary["snippet_chars"])
+            self.assertGreater(summary["peak_bytes"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from livekit import rtc  # noqa: E402
+
+from greeting_cache import (  # noqa: E402
+    GREETING_CACHE_DIR_ENV,
+    GREETING_CACHE_TTL_SECONDS_ENV,
+    CachedGreeting,
+    GreetingAudioCache,
+    GreetingRecorder,
+    create_greeting_cache,
+    greeting_cache_key,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def silent_frame(samples: int, sample_rate: int = 24_000) -> rtc.AudioFrame:
+    return rtc.AudioFrame(
+        data=b"\x01\x00" * samples,
+        sample_rate=sample_rate,
+        num_channels=1,
+        samples_per_channel=samples,
+    )
+
+
+class GreetingAudioCacheTests(unittest.IsolatedAsyncioTestCase):
+    def test_is_disabled_without_cache_directory(self) -> None:
+        self.assertIsNone(create_greeting_cache({}))
+
+    def test_key_changes_with_voice_settings(self) -> None:
+        self.assertEqual(
+            greeting_cache_key("wife-e2e", "voice-a", {"speed": 1.1}),
+            greeting_cache_key("wife-e2e", "voice-a", {"speed": 1.1}),
+        )
+        self.assertNotEqual(
+            greeting_cache_key("wife-e2e", "voice-a"),
+            greeting_cache_key("wife-e2e", "voice-b"),
+        )
+
+    def test_round_trips_greeting_text_and_audio(self) -> None:
+        greeting = CachedGreeting(
+            text="Hi, I'm ready for a quick voice test.",
+            sample_rate=24_000,
+            num_channels=1,
+            pcm=b"\x01\x00" * 480,
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = GreetingAudioCache(Path(directory))
+            self.assertIsNone(cache.load("missing"))
+            cache.store("greeting", greeting)
+            loaded = cache.load("greeting")
+
+        self.assertEqual(loaded, greeting)
+        self.assertAlmostEqual(loaded.duration_seconds, 0.02)
+
+    async def test_replays_audio_as_twenty_millisecond_frames(self) -> None:
+        greeting = CachedGreeting(
+            text="Hello.",
+            sample_rate=24_000,
+            num_channels=1,
+            pcm=b"\x01\x00" * 1_000,
+        )
+
+        frames = [frame async for frame in greeting.frames()]
+
+        self.assertEqual(
+            [frame.samples_per_channel for frame in frames],
+            [480, 480, 40],
+        )
+        self.assertEqual(frames[0].sample_rate, 24_000)
+
+    def test_expires_entries_after_ttl(self) -> None:
+        clock = FakeClock()
+        greeting = CachedGreeting(
+            text="Hello there.",
+            sample_rate=24_000,
+            num_channels=1,
+            pcm=b"\x00\x00" * 480,
+        )
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = GreetingAudioCache(Path(directory), ttl_seconds=60, clock=clock)
+            cache.store("greeting", greeting)
+            clock.now += 59
+            fresh = cache.load("greeting")
+            clock.now += 1
+            expired = cache.load("greeting")
+
+        self.assertEqual(fresh, greeting)
+        self.assertIsNone(expired)
+
+    def test_reads_ttl_from_env(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            cache = create_greeting_cache(
+                {
+                    GREETING_CACHE_DIR_ENV: directory,
+                    GREETING_CACHE_TTL_SECONDS_ENV: "120",
+                }
+            )
+
+        self.assertEqual(cache.ttl_seconds, 120)
+
+    def test_recorder_joins_spoken_frames_into_single_pcm_buffer(self) -> None:
+        recorder = GreetingRecorder()
+        recorder.add(silent_frame(480))
+        recorder.add(silent_frame(240))
+
+        greeting = recorder.greeting("Hello there.")
+
+        self.assertEqual(greeting.text, "Hello there.")
+        self.assertEqual(greeting.sample_rate, 24_000)
+        self.assertEqual(len(greeting.pcm), 720 * 2)
+
+    def test_recorder_skips_greetings_with_mixed_formats(self) -> None:
+        recorder = GreetingRecorder()
+        self.assertIsNone(recorder.greeting("Hello there."))
+
+        recorder.add(silent_frame(480))
+        recorder.add(silent_frame(480, sample_rate=16_000))
+
+        self.assertIsNone(recorder.greeting("Hello there."))
+
+
+if __name__ == "__main__":
+    unittest.main()
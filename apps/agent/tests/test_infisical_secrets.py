@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import contextlib
+import importlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from cryptography.fernet import Fernet  # noqa: E402
+
+from infisical_secrets import (  # noqa: E402
+    SECRETS_CACHE_DIR_ENV,
+    SECRETS_CACHE_KEY_ENV,
+    SECRETS_CACHE_TTL_SECONDS_ENV,
+    SECRETS_FILE_ENV,
+    SECRETS_SOURCE_CACHE,
+    SECRETS_SOURCE_FILE,
+    SECRETS_SOURCE_INFISICAL,
+    SecretLoadError,
+    create_secrets_cache,
+    export_infisical_secrets,
+    inject_secrets,
+    load_secrets,
+    parse_infisical_export,
+)
+
+REQUIRED_SECRETS = {
+    "LIVEKIT_URL": "wss://voice.example.livekit.cloud",
+    "LIVEKIT_API_KEY": "livekit-key",
+    "LIVEKIT_API_SECRET": "livekit-secret",
+    "OPENAI_API_KEY": "openai-secret",
+}
+
+
+def write_secrets_file(directory: str, secrets: dict[str, str]) -> Path:
+    path = Path(directory) / "secrets.env"
+    path.write_text("".join(f"{key}={value}\n" for key, value in secrets.items()))
+    return path
+
+
+class InfisicalSecretsTests(unittest.TestCase):
+    def test_parses_export_list_and_mapping(self) -> None:
+        self.assertEqual(
+            parse_infisical_export(
+                '[{"key": "A", "value": "1"}, {"key": "B", "value": null}, {}]'
+            ),
+            {"A": "1", "B": ""},
+        )
+        self.assertEqual(parse_infisical_export('{"A": "1"}'), {"A": "1"})
+
+        with self.assertRaises(SecretLoadError) as raised:
+            parse_infisical_export("A=1")
+        self.assertIsInstance(raised.exception.__cause__, json.JSONDecodeError)
+
+    def test_export_runs_cli_once_with_project_and_env(self) -> None:
+        calls = []
+
+        def runner(command, **kwargs):
+            calls.append(command)
+            return subprocess.CompletedProcess(
+                command, 0, stdout='[{"key": "A", "value": "1"}]', stderr=""
+            )
+
+        secrets = export_infisical_secrets(
+            "prod", "project-1", infisical="/bin/infisical", runner=runner
+        )
+
+        self.assertEqual(secrets, {"A": "1"})
+        self.assertEqual(
+            calls,
+            [
+                [
+                    "/bin/infisical",
+                    "export",
+                    "--env",
+                    "prod",
+                    "--format",
+                    "json",
+                    "--projectId",
+                    "project-1",
+                ]
+            ],
+        )
+
+    def test_export_failure_raises_secret_load_error(self) -> None:
+        def runner(command, **kwargs):
+            return subprocess.CompletedProcess(
+                command, 1, stdout="", stderr="error: not logged in\n"
+            )
+
+        with self.assertRaisesRegex(SecretLoadError, "not logged in"):
+            export_infisical_secrets("dev", None, infisical="infisical", runner=runner)
+
+    def test_stand_in_file_takes_precedence_over_infisical(self) -> None:
+        def export(infisical_env, project_id):
+            raise AssertionError("infisical should not be called")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = write_secrets_file(temp_dir, {"A": "from-file"})
+
+            secrets, source = load_secrets(
+                {SECRETS_FILE_ENV: str(path)}, "dev", None, export=export
+            )
+
+        self.assertEqual(secrets, {"A": "from-file"})
+        self.assertEqual(source, SECRETS_SOURCE_FILE)
+
+    def test_fetches_from_infisical_without_cache(self) -> None:
+        secrets, source = load_secrets(
+            {}, "dev", "project-1", export=lambda env, project: {"A": env}
+        )
+
+        self.assertEqual(secrets, {"A": "dev"})
+        self.assertEqual(source, SECRETS_SOURCE_INFISICAL)
+
+    def test_encrypted_cache_serves_second_load(self) -> None:
+        exports = []
+
+        def export(infisical_env, project_id):
+            exports.append((infisical_env, project_id))
+            return {"A": "secret-value"}
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            env = {
+                SECRETS_CACHE_KEY_ENV: Fernet.generate_key().decode(),
+                SECRETS_CACHE_DIR_ENV: temp_dir,
+            }
+            first = load_secrets(env, "dev", "project-1", export=export)
+            second = load_secrets(env, "dev", "project-1", export=export)
+            other_env = load_secrets(env, "prod", "project-1", export=export)
+            cached_bytes = b"".join(
+                path.read_bytes() for path in Path(temp_dir).iterdir()
+            )
+
+        self.assertEqual(first, ({"A": "secret-value"}, SECRETS_SOURCE_INFISICAL))
+        self.assertEqual(second, ({"A": "secret-value"}, SECRETS_SOURCE_CACHE))
+        self.assertEqual(other_env[1], SECRETS_SOURCE_INFISICAL)
+        self.assertEqual(exports, [("dev", "project-1"), ("prod", "project-1")])
+        self.assertNotIn(b"secret-value", cached_bytes)
+
+    def test_encrypted_cache_rejects_expired_and_tampered_entries(self) -> None:
+        key = Fernet.generate_key()
+        exports = []
+
+        def export(infisical_env, project_id):
+            exports.append(infisical_env)
+            return {"A": "fresh"}
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            env = {
+                SECRETS_CACHE_KEY_ENV: key.decode(),
+                SECRETS_CACHE_DIR_ENV: temp_dir,
+                SECRETS_CACHE_TTL_SECONDS_ENV: "60",
+            }
+            cache = create_secrets_cache(env)
+            path = cache.path("project-1", "dev")
+            path.write_bytes(
+                Fernet(key).encrypt_at_time(b'{"A": "old"}', int(time.time()) - 120)
+            )
+            expired = load_secrets(env, "dev", "project-1", export=export)
+            path.write_bytes(path.read_bytes()[:-4] + b"AAAA")
+            tampered = load_secrets(env, "dev", "project-1", export=export)
+
+        self.assertEqual(expired, ({"A": "fresh"}, SECRETS_SOURCE_INFISICAL))
+        self.assertEqual(tampered, ({"A": "fresh"}, SECRETS_SOURCE_INFISICAL))
+        self.assertEqual(exports, ["dev", "dev"])
+
+    def test_invalid_cache_key_is_a_load_error(self) -> None:
+        with self.assertRaisesRegex(SecretLoadError, "not a Fernet key") as raised:
+            load_secrets(
+                {SECRETS_CACHE_KEY_ENV: "key"}, "dev", None, export=lambda e, p: {}
+            )
+        self.assertIsInstance(raised.exception.__cause__, ValueError)
+
+    def test_cache_key_without_cryptography_is_a_load_error(self) -> None:
+        with (
+            patch.dict(sys.modules, {"cryptography.fernet": None}),
+            self.assertRaisesRegex(SecretLoadError, "cryptography") as raised,
+        ):
+            load_secrets(
+                {SECRETS_CACHE_KEY_ENV: "key"}, "dev", None, export=lambda e, p: {}
+            )
+        self.assertIsInstance(raised.exception.__cause__, ImportError)
+
+    def test_inject_keeps_existing_values(self) -> None:
+        env = {"A": "shell", "B": ""}
+
+        injected = inject_secrets({"A": "secret", "B": "secret", "C": "secret"}, env)
+
+        self.assertEqual(injected, ["B", "C"])
+        self.assertEqual(env, {"A": "shell", "B": "secret", "C": "secret"})
+
+
+class BootstrapInProcessTests(unittest.TestCase):
+    def tearDown(self) -> None:
+        import agent_config
+
+        importlib.reload(agent_config)
+
+    def test_bootstrap_loads_secrets_without_reexec(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = write_secrets_file(
+                temp_dir,
+                {**REQUIRED_SECRETS, "LIVEKIT_AGENT_TTS_VOICE_ID": "voice-from-file"},
+            )
+            with patch.dict(os.environ, {SECRETS_FILE_ENV: str(path)}, clear=True):
+                import agent_config
+
+                agent_config = importlib.reload(agent_config)
+                self.assertIsNone(agent_config.get_agent_settings().tts_voice_id)
+                with (
+                    patch("subprocess.run") as run,
+                    patch.object(agent_config, "load_dotenv") as load_dotenv,
+                    contextlib.redirect_stderr(io.StringIO()),
+                ):
+                    agent_config.bootstrap_from_infisical_if_needed()
+
+                self.assertEqual(os.environ["LIVEKIT_API_KEY"], "livekit-key")
+                self.assertEqual(agent_config.missing_required_env(), [])
+
+        run.assert_not_called()
+        # Settings are re-read from the environment, not by reloading the module.
+        load_dotenv.assert_not_called()
+        self.assertIs(sys.modules["agent_config"], agent_config)
+        self.assertEqual(agent_config.TTS_VOICE_ID, "voice-from-file")
+        from agent_config import TTS_VOICE_ID
+
+        self.assertEqual(TTS_VOICE_ID, "voice-from-file")
+
+    def test_bootstrap_falls_back_to_infisical_run(self) -> None:
+        with patch.dict(
+            os.environ, {"LIVEKIT_AGENT_INFISICAL_IN_PROCESS": "false"}, clear=True
+        ):
+            import agent_config
+
+            agent_config = importlib.reload(agent_config)
+            with (
+                patch("shutil.which", return_value="/bin/infisical"),
+                patch(
+                    "subprocess.run",
+                    return_value=subprocess.CompletedProcess([], 3),
+                ) as run,
+                self.assertRaises(SystemExit) as exit_context,
+            ):
+                agent_config.bootstrap_from_infisical_if_needed()
+
+        self.assertEqual(exit_context.exception.code, 3)
+        self.assertEqual(run.call_args.args[0][:2], ["/bin/infisical", "run"])
+
+
+if __name__ == "__main__":
+    unittest.main()
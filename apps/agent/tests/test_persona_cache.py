@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from persona_cache import (  # noqa: E402
+    PERSONA_CACHE_HIT,
+    PERSONA_CACHE_MISS,
+    PERSONA_CACHE_STALE,
+    PersonaConfigCache,
+    PersonaFetchResult,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ScriptedLoader:
+    def __init__(self, *results: PersonaFetchResult | Exception) -> None:
+        self.results = list(results)
+        self.calls: list[tuple[str, str | None, str | None]] = []
+
+    async def __call__(
+        self,
+        persona_id: str,
+        user_id: str | None,
+        etag: str | None,
+    ) -> PersonaFetchResult:
+        self.calls.append((persona_id, user_id, etag))
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def make_cache(loader: ScriptedLoader, clock: FakeClock) -> PersonaConfigCache:
+    return PersonaConfigCache(loader, ttl_seconds=60, stale_seconds=600, clock=clock)
+
+
+class PersonaConfigCacheTests(unittest.IsolatedAsyncioTestCase):
+    async def test_serves_fresh_entries_without_refetching(self) -> None:
+        loader = ScriptedLoader(PersonaFetchResult("persona-v1", '"v1"'))
+        cache = make_cache(loader, FakeClock())
+
+        first = await cache.get("wife-e2e", "user-123")
+        second = await cache.get("wife-e2e", "user-123")
+
+        self.assertEqual(first.status, PERSONA_CACHE_MISS)
+        self.assertEqual(second.status, PERSONA_CACHE_HIT)
+        self.assertEqual(second.persona, "persona-v1")
+        self.assertEqual(len(loader.calls), 1)
+        self.assertEqual(cache.stats.hit_ratio, 0.5)
+        self.assertIsNotNone(cache.stats.last_refresh_ms)
+
+    async def test_keys_entries_by_persona_and_user(self) -> None:
+        loader = ScriptedLoader(
+            PersonaFetchResult("persona-user-1"),
+            PersonaFetchResult("persona-user-2"),
+        )
+        cache = make_cache(loader, FakeClock())
+
+        await cache.get("wife-e2e", "user-1")
+        lookup = await cache.get("wife-e2e", "user-2")
+
+        self.assertEqual(lookup.persona, "persona-user-2")
+        self.assertEqual(len(loader.calls), 2)
+
+    async def test_serves_stale_entry_while_revalidating_with_etag(self) -> None:
+        clock = FakeClock()
+        loader = ScriptedLoader(
+            PersonaFetchResult("persona-v1", '"v1"'),
+            PersonaFetchResult(None, '"v1"'),
+        )
+        cache = make_cache(loader, clock)
+
+        await cache.get("wife-e2e", "user-123")
+        clock.now += 120
+        stale = await cache.get("wife-e2e", "user-123")
+        await asyncio.sleep(0)
+        fresh = await cache.get("wife-e2e", "user-123")
+
+        self.assertEqual(stale.status, PERSONA_CACHE_STALE)
+        self.assertEqual(stale.persona, "persona-v1")
+        self.assertEqual(loader.calls[1], ("wife-e2e", "user-123", '"v1"'))
+        self.assertEqual(cache.stats.not_modified, 1)
+        self.assertEqual(fresh.status, PERSONA_CACHE_HIT)
+
+    async def test_background_refresh_replaces_changed_persona(self) -> None:
+        clock = FakeClock()
+        loader = ScriptedLoader(
+            PersonaFetchResult("persona-v1", '"v1"'),
+            PersonaFetchResult("persona-v2", '"v2"'),
+        )
+        cache = make_cache(loader, clock)
+
+        await cache.get("wife-e2e", None)
+        clock.now += 120
+        await cache.get("wife-e2e", None)
+        await asyncio.sleep(0)
+
+        self.assertEqual((await cache.get("wife-e2e", None)).persona, "persona-v2")
+
+    async def test_failed_background_refresh_keeps_stale_entry(self) -> None:
+        clock = FakeClock()
+        loader = ScriptedLoader(
+            PersonaFetchResult("persona-v1", '"v1"'),
+            RuntimeError("offline"),
+        )
+        cache = make_cache(loader, clock)
+
+        await cache.get("wife-e2e", None)
+        clock.now += 120
+        with self.assertLogs("persona_cache", level="WARNING"):
+            await cache.get("wife-e2e", None)
+            for _ in range(2):
+                await asyncio.sleep(0)
+
+        self.assertEqual(cache.stats.refresh_failures, 1)
+        lookup = await cache.get("wife-e2e", None)
+        self.assertEqual(lookup.status, PERSONA_CACHE_STALE)
+        self.assertEqual(lookup.persona, "persona-v1")
+
+    async def test_refetches_entries_past_stale_window(self) -> None:
+        clock = FakeClock()
+        loader = ScriptedLoader(
+            PersonaFetchResult("persona-v1"),
+            PersonaFetchResult("persona-v2"),
+        )
+        cache = make_cache(loader, clock)
+
+        await cache.get("wife-e2e", None)
+        clock.now += 1_000
+        lookup = await cache.get("wife-e2e", None)
+
+        self.assertEqual(lookup.status, PERSONA_CACHE_MISS)
+        self.assertEqual(lookup.persona, "persona-v2")
+
+    async def test_concurrent_misses_share_one_request(self) -> None:
+        release = asyncio.Event()
+        calls = []
+
+        async def loader(persona_id, user_id, etag):
+            calls.append((persona_id, user_id, etag))
+            await release.wait()
+            return PersonaFetchResult("persona-v1")
+
+        cache = PersonaConfigCache(
+            loader, ttl_seconds=60, stale_seconds=600, clock=FakeClock()
+        )
+        lookups = asyncio.gather(*(cache.get("wife-e2e", "user-1") for _ in range(3)))
+        await asyncio.sleep(0)
+        release.set()
+
+        results = await lookups
+
+        self.assertEqual(calls, [("wife-e2e", "user-1", None)])
+        self.assertEqual([lookup.persona for lookup in results], ["persona-v1"] * 3)
+        self.assertEqual(cache.stats.misses, 3)
+        self.assertEqual(cache.stats.coalesced, 2)
+
+    async def test_concurrent_misses_share_the_failure(self) -> None:
+        loader = ScriptedLoader(RuntimeError("offline"), PersonaFetchResult("v1"))
+        cache = make_cache(loader, FakeClock())
+
+        results = await asyncio.gather(
+            cache.get("wife-e2e", None),
+            cache.get("wife-e2e", None),
+            return_exceptions=True,
+        )
+
+        self.assertEqual(len(loader.calls), 1)
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertEqual((await cache.get("wife-e2e", None)).persona, "v1")
+
+    async def test_serve_stale_predicate_forces_revalidation(self) -> None:
+        clock = FakeClock()
+        loader = ScriptedLoader(
+            PersonaFetchResult("cloned-voice", '"v1"'),
+            PersonaFetchResult("default-voice", '"v2"'),
+        )
+        cache = PersonaConfigCache(
+            loader,
+            ttl_seconds=60,
+            stale_seconds=600,
+            clock=clock,
+            serve_stale=lambda persona: persona != "cloned-voice",
+        )
+
+        await cache.get("wife-e2e", None)
+        clock.now += 120
+        lookup = await cache.get("wife-e2e", None)
+
+        self.assertEqual(lookup.status, PERSONA_CACHE_MISS)
+        self.assertEqual(lookup.persona, "default-voice")
+        self.assertEqual(loader.calls[1], ("wife-e2e", None, '"v1"'))
+        self.assertEqual(cache.stats.stale_hits, 0)
+
+    async def test_does_not_cache_fallback_results(self) -> None:
+        loader = ScriptedLoader(
+            PersonaFetchResult("fallback", cacheable=False),
+            PersonaFetchResult("persona-v1"),
+        )
+        cache = make_cache(loader, FakeClock())
+
+        await cache.get("portfolio-agent", None)
+        lookup = await cache.get("portfolio-agent", None)
+
+        self.assertEqual(lookup.status, PERSONA_CACHE_MISS)
+        self.assertEqual(lookup.persona, "persona-v1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,7 +13,11 @@ from agent import (  # noqa: E402
     PortfolioAgent,
 )
 from agent_web_search import SearchToolStatusNotifier  # noqa: E402
-from web_search import SearchResult, WebSearchSettings  # noqa: E402
+from web_search import (  # noqa: E402
+    SearchCostBudget,
+    SearchResult,
+    WebSearchSettings,
+)
 
 
 class FakeProvider:
@@ -40,13 +44,20 @@ class FakeHttpClient:
     def __init__(self) -> None:
         self.closed = False
 
-    async def __aenter__(self) -> "FakeHttpClient":
-        return self
-
-    async def __aexit__(self, exc_type, exc, tb) -> None:
+    async def aclose(self) -> None:
         self.closed = True
 
 
+class FakeHttpClientPool:
+    def __init__(self) -> None:
+        self.http_client = FakeHttpClient()
+        self.requested_providers: list[str] = []
+
+    def client(self, provider: str) -> FakeHttpClient:
+        self.requested_providers.append(provider)
+        return self.http_client
+
+
 class RecordingNotifier(SearchToolStatusNotifier):
     def __init__(self) -> None:
         self.started_calls: list[tuple[str, str]] = []
@@ -166,9 +177,15 @@ class PortfolioAgentToolTests(unittest.IsolatedAsyncioTestCase):
                     instructions="Test agent.",
                 )
 
-    async def test_search_web_closes_default_http_client(self) -> None:
+    async def test_search_web_reuses_pooled_http_client_across_calls(self) -> None:
         notifier = RecordingNotifier()
-        http_client = FakeHttpClient()
+        http_client_pool = FakeHttpClientPool()
+        provider_clients: list[object] = []
+
+        def provider_factory(_settings, http_client):
+            provider_clients.append(http_client)
+            return FakeProvider()
+
         agent = PortfolioAgent(
             agent_id="dennis-portfolio-agent",
             instructions="Test agent.",
@@ -178,18 +195,41 @@ class PortfolioAgentToolTests(unittest.IsolatedAsyncioTestCase):
                 max_results=3,
                 timeout_seconds=2,
             ),
-            http_client_factory=lambda: http_client,
-            provider_factory=lambda _settings, _http_client: FakeProvider(),
+            http_client_pool=http_client_pool,
+            provider_factory=provider_factory,
             notifier_factory=lambda: notifier,
         )
 
-        await agent.search_web(
-            context=None,
-            summary="Find current LiveKit tool docs",
-            query="LiveKit Python function_tool docs",
+        for _ in range(2):
+            await agent.search_web(
+                context=None,
+                summary="Find current LiveKit tool docs",
+                query="LiveKit Python function_tool docs",
+            )
+
+        self.assertEqual(provider_clients, [http_client_pool, http_client_pool])
+        self.assertFalse(http_client_pool.http_client.closed)
+
+    def test_prefetch_provider_charges_the_prefetch_budget(self) -> None:
+        settings = WebSearchSettings(
+            provider="race",
+            api_key="parallel-key",
+            max_results=3,
+            timeout_seconds=2,
+            provider_api_keys={"parallel": "parallel-key", "exa": "exa-key"},
         )
+        agent = PortfolioAgent(
+            agent_id="dennis-portfolio-agent",
+            instructions="Test agent.",
+            search_settings=settings,
+            http_client_pool=FakeHttpClientPool(),
+        )
+        prefetch_budget = SearchCostBudget(0.02)
+
+        provider = agent._prefetch_search_provider(prefetch_budget)
 
-        self.assertTrue(http_client.closed)
+        self.assertIs(provider.budget, prefetch_budget)
+        self.assertIsNot(provider.budget, agent.search_budget)
 
 
 if __name__ == "__main__":
@@ -1,16 +1,24 @@
 from __future__ import annotations
 
+import asyncio
+import gc
 import json
 import sys
 import unittest
 from pathlib import Path
+from types import SimpleNamespace
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
 from agent_web_search import (  # noqa: E402
     LIVEKIT_RPC_MAX_PAYLOAD_BYTES,
+    MAX_STATUS_RPC_CHUNKS,
     MAX_STATUS_RPC_PAYLOAD_BYTES,
     LiveKitRpcSearchToolStatusNotifier,
+    ToolStatusSender,
+    _chunk_rpc_payload,
+    create_tool_status_sender,
+    _encode_status_messages,
 )
 from web_search import SearchResult  # noqa: E402
 
@@ -55,6 +63,45 @@ class FailingLocalParticipant(FakeLocalParticipant):
         raise TimeoutError("browser did not respond")
 
 
+class ConcurrencyTrackingParticipant(FakeLocalParticipant):
+    def __init__(self) -> None:
+        super().__init__()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def perform_rpc(self, **kwargs: object) -> str:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            return await super().perform_rpc(**kwargs)
+        finally:
+            self.in_flight -= 1
+
+
+class GatedLocalParticipant(FakeLocalParticipant):
+    def __init__(self) -> None:
+        super().__init__()
+        self.entered = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def perform_rpc(self, **kwargs: object) -> str:
+        self.entered.set()
+        await self.release.wait()
+        return await super().perform_rpc(**kwargs)
+
+
+class SlowDestinationParticipant(FakeLocalParticipant):
+    def __init__(self, slow_identity: str) -> None:
+        super().__init__()
+        self.slow_identity = slow_identity
+
+    async def perform_rpc(self, **kwargs: object) -> str:
+        if kwargs["destination_identity"] == self.slow_identity:
+            await asyncio.sleep(10)
+        return await super().perform_rpc(**kwargs)
+
+
 class FakeRoom:
     def __init__(self) -> None:
         self.local_participant = FakeLocalParticipant()
@@ -73,6 +120,7 @@ class RpcSearchToolNotifierTests(unittest.IsolatedAsyncioTestCase):
         notifier = LiveKitRpcSearchToolStatusNotifier(room)
 
         await notifier.started("Comparing search provider pricing", "parallel")
+        await notifier.flush()
 
         call = room.local_participant.calls[0]
         self.assertEqual(call["destination_identity"], "browser-user")
@@ -104,6 +152,7 @@ class RpcSearchToolNotifierTests(unittest.IsolatedAsyncioTestCase):
                 )
             ]
         )
+        await notifier.flush()
 
         self.assertEqual(
             room.local_participant.calls[-1]["payload"],
@@ -123,38 +172,45 @@ class RpcSearchToolNotifierTests(unittest.IsolatedAsyncioTestCase):
             },
         )
 
-    async def test_finished_bounds_sources_payload_for_livekit_rpc(self) -> None:
+    async def test_finished_sends_every_source_in_full(self) -> None:
         room = FakeRoom()
         notifier = LiveKitRpcSearchToolStatusNotifier(room)
+        results = [
+            SearchResult(
+                title=f"Argentina beats England with a very long headline {index}"
+                * 10,
+                url=f"https://example.com/argentina-england-{index}",
+                snippet="Argentina beat England 2-1 after goals from " * 100,
+                published_at=None,
+                provider="parallel",
+            )
+            for index in range(10)
+        ]
 
         await notifier.started("Find today's match result", "parallel")
-        await notifier.finished(
-            [
-                SearchResult(
-                    title=f"Argentina beats England with a very long headline {index}"
-                    * 10,
-                    url=f"https://example.com/argentina-england-{index}",
-                    snippet="Argentina beat England 2-1 after goals from " * 100,
-                    published_at=None,
-                    provider="parallel",
-                )
-                for index in range(10)
-            ]
+        await notifier.flush()
+        calls_before_finished = len(room.local_participant.calls)
+        await notifier.finished(results)
+        await notifier.flush()
+
+        chunks = [
+            call["payload"]
+            for call in room.local_participant.calls[calls_before_finished:]
+        ]
+        payload = json.loads("".join(chunk["data"] for chunk in chunks))
+        self.assertEqual(
+            [(source["title"], source["description"]) for source in payload["sources"]],
+            [(result.title, result.snippet) for result in results],
         )
 
-        payload = room.local_participant.calls[-1]["payload"]
-        self.assertLess(room.local_participant.calls[-1]["payload_bytes"], 4_000)
-        self.assertEqual(len(payload["sources"]), 5)
-        self.assertLessEqual(len(payload["sources"][0]["title"]), 160)
-        self.assertLessEqual(len(payload["sources"][0]["description"]), 280)
-
-    async def test_finished_keeps_serialized_payload_under_livekit_rpc_limit(
-        self,
-    ) -> None:
+    async def test_finished_streams_oversized_payload_in_chunks(self) -> None:
         room = FakeRoom()
         notifier = LiveKitRpcSearchToolStatusNotifier(room)
+        summary = "Searching " + ("fresh scores " * 4_000)
 
-        await notifier.started("Searching " + ("fresh scores " * 4_000), "parallel")
+        await notifier.started(summary, "parallel")
+        await notifier.flush()
+        calls_before_finished = len(room.local_participant.calls)
         await notifier.finished(
             [
                 SearchResult(
@@ -167,17 +223,36 @@ class RpcSearchToolNotifierTests(unittest.IsolatedAsyncioTestCase):
                 for index in range(20)
             ]
         )
-
-        completed_call = room.local_participant.calls[-1]
-        self.assertLessEqual(
-            completed_call["payload_bytes"],
-            MAX_STATUS_RPC_PAYLOAD_BYTES,
+        await notifier.flush()
+
+        calls = room.local_participant.calls[calls_before_finished:]
+        for call in room.local_participant.calls:
+            self.assertLessEqual(call["payload_bytes"], MAX_STATUS_RPC_PAYLOAD_BYTES)
+            self.assertLessEqual(call["payload_bytes"], LIVEKIT_RPC_MAX_PAYLOAD_BYTES)
+        chunks = [call["payload"] for call in calls]
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(len({chunk["chunk_id"] for chunk in chunks}), 1)
+        self.assertEqual(
+            [chunk["chunk_index"] for chunk in chunks], list(range(len(chunks)))
         )
-        self.assertLessEqual(
-            completed_call["payload_bytes"],
-            LIVEKIT_RPC_MAX_PAYLOAD_BYTES,
+        self.assertEqual({chunk["chunk_count"] for chunk in chunks}, {len(chunks)})
+        payload = json.loads("".join(chunk["data"] for chunk in chunks))
+        self.assertEqual(payload["state"], "completed")
+        self.assertEqual(payload["summary"], summary)
+        self.assertEqual(len(payload["sources"]), 20)
+
+    async def test_chunks_are_sent_without_waiting_for_each_response(self) -> None:
+        room = FakeRoom()
+        room.local_participant = ConcurrencyTrackingParticipant()
+        notifier = LiveKitRpcSearchToolStatusNotifier(room)
+
+        await notifier.started("Searching " + ("fresh scores " * 4_000), "parallel")
+        await notifier.flush()
+
+        self.assertGreater(len(room.local_participant.calls), 1)
+        self.assertEqual(
+            room.local_participant.max_in_flight, len(room.local_participant.calls)
         )
-        self.assertEqual(completed_call["payload"]["state"], "completed")
 
     async def test_finished_drops_overlong_source_urls_from_rpc_payload(self) -> None:
         room = FakeRoom()
@@ -202,6 +277,7 @@ class RpcSearchToolNotifierTests(unittest.IsolatedAsyncioTestCase):
                 ),
             ]
         )
+        await notifier.flush()
 
         payload = room.local_participant.calls[-1]["payload"]
         self.assertEqual(
@@ -217,12 +293,49 @@ class RpcSearchToolNotifierTests(unittest.IsolatedAsyncioTestCase):
             ],
         )
 
+    async def test_progress_sends_partial_sources_while_running(self) -> None:
+        room = FakeRoom()
+        notifier = LiveKitRpcSearchToolStatusNotifier(room)
+        first = SearchResult(
+            title="First result",
+            url="https://example.com/1",
+            snippet="First.",
+            published_at=None,
+            provider="parallel",
+        )
+        second = SearchResult(
+            title="Second result",
+            url="https://example.com/2",
+            snippet="Second.",
+            published_at=None,
+            provider="parallel",
+        )
+
+        await notifier.started("Find today's match result", "parallel")
+        await notifier.flush()
+        await notifier.progress([first])
+        await notifier.flush()
+        await notifier.progress([first])
+        await notifier.finished([first, second])
+        await notifier.flush()
+
+        states = [call["payload"]["state"] for call in room.local_participant.calls]
+        self.assertEqual(states, ["running", "running", "completed"])
+        progress_payload = room.local_participant.calls[1]["payload"]
+        self.assertEqual(progress_payload["summary"], "Find today's match result")
+        self.assertEqual(
+            [source["url"] for source in progress_payload["sources"]],
+            ["https://example.com/1"],
+        )
+        self.assertEqual(len(room.local_participant.calls[-1]["payload"]["sources"]), 2)
+
     async def test_failed_sends_provider_summary_and_error(self) -> None:
         room = FakeRoom()
         notifier = LiveKitRpcSearchToolStatusNotifier(room)
 
         await notifier.started("Comparing search provider pricing", "parallel")
         await notifier.failed("provider timed out")
+        await notifier.flush()
 
         self.assertEqual(
             room.local_participant.calls[-1]["payload"],
@@ -240,9 +353,254 @@ class RpcSearchToolNotifierTests(unittest.IsolatedAsyncioTestCase):
 
         with self.assertLogs("agent_web_search", level="WARNING") as logs:
             await notifier.started("Comparing search provider pricing", "parallel")
+            await notifier.flush()
 
         self.assertEqual(len(room.local_participant.calls), 1)
         self.assertIn("Failed to send LiveKit tool status RPC", logs.output[0])
+        self.assertEqual(notifier.sender.stats.failed, 1)
+
+    async def test_status_updates_do_not_wait_for_slow_browser(self) -> None:
+        room = FakeRoom()
+        room.local_participant = GatedLocalParticipant()
+        notifier = LiveKitRpcSearchToolStatusNotifier(room)
+
+        await notifier.started("Find today's match result", "parallel")
+        await room.local_participant.entered.wait()
+        await notifier.finished([])
+
+        self.assertEqual(room.local_participant.calls, [])
+        self.assertEqual(notifier.sender.queue_depth, 1)
+        room.local_participant.release.set()
+        await notifier.flush()
+        states = [call["payload"]["state"] for call in room.local_participant.calls]
+        self.assertEqual(states, ["running", "completed"])
+        self.assertEqual(notifier.sender.queue_depth, 0)
+
+
+class ToolStatusSenderTests(unittest.IsolatedAsyncioTestCase):
+    async def test_terminal_state_supersedes_queued_running_updates(self) -> None:
+        room = FakeRoom()
+        sender = ToolStatusSender(room)
+
+        sender.enqueue({"state": "running", "summary": "Search"})
+        sender.enqueue({"state": "running", "summary": "Search", "sources": []})
+        sender.enqueue({"state": "completed", "summary": "Search"})
+        await sender.drain()
+
+        states = [call["payload"]["state"] for call in room.local_participant.calls]
+        self.assertEqual(states, ["completed"])
+        self.assertEqual(sender.stats.enqueued, 3)
+        self.assertEqual(sender.stats.coalesced, 2)
+        self.assertEqual(sender.stats.sent, 1)
+
+    async def test_running_update_does_not_replace_queued_terminal_state(
+        self,
+    ) -> None:
+        room = FakeRoom()
+        sender = ToolStatusSender(room)
+
+        sender.enqueue({"state": "failed", "summary": "First search"})
+        sender.enqueue({"state": "running", "summary": "Second search"})
+        await sender.drain()
+
+        summaries = [call["payload"]["summary"] for call in room.local_participant.calls]
+        self.assertEqual(summaries, ["First search", "Second search"])
+        self.assertEqual(sender.stats.coalesced, 0)
+
+    async def test_full_queue_of_terminal_states_keeps_every_update(self) -> None:
+        room = FakeRoom()
+        sender = ToolStatusSender(room, max_queue=2)
+
+        for index in range(4):
+            sender.enqueue({"state": "completed", "summary": f"Search {index}"})
+        self.assertEqual(sender.queue_depth, 4)
+        await sender.drain()
+
+        summaries = [call["payload"]["summary"] for call in room.local_participant.calls]
+        self.assertEqual(summaries, [f"Search {index}" for index in range(4)])
+        self.assertEqual(sender.stats.dropped, 0)
+
+    async def test_full_queue_drops_running_updates(self) -> None:
+        room = FakeRoom()
+        sender = ToolStatusSender(room, max_queue=2)
+
+        sender.enqueue({"state": "failed", "summary": "First search"})
+        sender.enqueue({"state": "completed", "summary": "Second search"})
+        sender.enqueue({"state": "running", "summary": "Third search"})
+        sender.enqueue({"state": "completed", "summary": "Third search"})
+        await sender.drain()
+
+        states = [
+            (call["payload"]["summary"], call["payload"]["state"])
+            for call in room.local_participant.calls
+        ]
+        self.assertEqual(
+            states,
+            [
+                ("First search", "failed"),
+                ("Second search", "completed"),
+                ("Third search", "completed"),
+            ],
+        )
+        self.assertEqual(sender.stats.dropped, 1)
+
+    async def test_aclose_drops_updates_that_miss_the_deadline(self) -> None:
+        room = FakeRoom()
+        room.local_participant = GatedLocalParticipant()
+        sender = ToolStatusSender(room)
+
+        sender.enqueue({"state": "completed", "summary": "First"})
+        sender.enqueue({"state": "completed", "summary": "Second"})
+        await sender.aclose(timeout_seconds=0.001)
+
+        self.assertEqual(sender.queue_depth, 0)
+        self.assertEqual(sender.stats.dropped, 1)
+        self.assertEqual(room.local_participant.calls, [])
+
+
+
+class ToolStatusBroadcastTests(unittest.IsolatedAsyncioTestCase):
+    def broadcast_room(self) -> FakeRoom:
+        room = FakeRoom()
+        room.remote_participants = {
+            "browser-user": SimpleNamespace(kind="standard"),
+            "observer": SimpleNamespace(kind="standard"),
+            "recorder": SimpleNamespace(kind="egress"),
+        }
+        return room
+
+    async def test_default_sends_only_to_first_participant(self) -> None:
+        room = self.broadcast_room()
+        sender = ToolStatusSender(room)
+
+        sender.enqueue({"state": "running", "summary": "Search"})
+        await sender.drain()
+
+        self.assertEqual(
+            [call["destination_identity"] for call in room.local_participant.calls],
+            ["browser-user"],
+        )
+
+    async def test_broadcast_sends_same_chunks_to_filtered_participants(self) -> None:
+        room = self.broadcast_room()
+        sender = ToolStatusSender(
+            room,
+            broadcast=True,
+            destination_filter=lambda participant: participant.kind != "egress",
+        )
+
+        sender.enqueue(
+            {"state": "running", "summary": "Searching " + ("fresh scores " * 4_000)}
+        )
+        await sender.drain()
+
+        by_destination: dict[str, list[object]] = {}
+        for call in room.local_participant.calls:
+            by_destination.setdefault(call["destination_identity"], []).append(
+                call["payload"]
+            )
+        self.assertEqual(set(by_destination), {"browser-user", "observer"})
+        self.assertGreater(len(by_destination["browser-user"]), 1)
+        self.assertEqual(by_destination["browser-user"], by_destination["observer"])
+        self.assertEqual(sender.stats.sent, 1)
+
+    async def test_slow_participant_times_out_without_delaying_others(self) -> None:
+        room = self.broadcast_room()
+        room.local_participant = SlowDestinationParticipant("observer")
+        sender = ToolStatusSender(room, broadcast=True, response_timeout_seconds=0.05)
+
+        sender.enqueue({"state": "completed", "summary": "Search"})
+        with self.assertLogs("agent_web_search", level="WARNING"):
+            await asyncio.wait_for(sender.drain(), 1)
+
+        self.assertEqual(
+            sorted(call["destination_identity"] for call in room.local_participant.calls),
+            ["browser-user", "recorder"],
+        )
+        self.assertEqual(sender.stats.failed, 1)
+
+    async def test_cancelled_destination_counts_as_failed(self) -> None:
+        class CancellingParticipant(FakeLocalParticipant):
+            async def perform_rpc(self, **kwargs: object) -> str:
+                if kwargs["destination_identity"] == "observer":
+                    raise asyncio.CancelledError
+                return await super().perform_rpc(**kwargs)
+
+        room = self.broadcast_room()
+        room.local_participant = CancellingParticipant()
+        sender = ToolStatusSender(room, broadcast=True)
+
+        sender.enqueue({"state": "completed", "summary": "Search"})
+        with self.assertLogs("agent_web_search", level="WARNING"):
+            await sender.drain()
+
+        self.assertEqual(sender.stats.failed, 1)
+        self.assertEqual(sender.stats.sent, 0)
+
+    async def test_aclose_cancellation_leaves_no_unretrieved_futures(self) -> None:
+        loop = asyncio.get_running_loop()
+        loop.set_debug(True)
+        unhandled: list[dict[str, object]] = []
+        loop.set_exception_handler(lambda _loop, context: unhandled.append(context))
+        room = self.broadcast_room()
+        room.local_participant = GatedLocalParticipant()
+        sender = ToolStatusSender(room, broadcast=True)
+
+        sender.enqueue(
+            {"state": "running", "summary": "Searching " + ("fresh scores " * 4_000)}
+        )
+        await room.local_participant.entered.wait()
+        await sender.aclose(timeout_seconds=0.001)
+        for _ in range(3):
+            await asyncio.sleep(0)
+        gc.collect()
+        await asyncio.sleep(0)
+
+        self.assertEqual([context["message"] for context in unhandled], [])
+
+    def test_broadcast_is_enabled_from_env(self) -> None:
+        room = FakeRoom()
+
+        self.assertFalse(create_tool_status_sender(room, {}).broadcast)
+        self.assertTrue(
+            create_tool_status_sender(
+                room, {"WEB_SEARCH_STATUS_BROADCAST": "true"}
+            ).broadcast
+        )
+
+
+class ChunkRpcPayloadTests(unittest.TestCase):
+    def test_chunks_reassemble_multibyte_and_escaped_text(self) -> None:
+        payload_json = json.dumps(
+            {"state": "running", "summary": '検索 🔎 "quoted" \\ \n\x01 ' * 2_000},
+            ensure_ascii=False,
+        )
+
+        messages = _chunk_rpc_payload(payload_json, chunk_id="abc")
+
+        assert messages is not None
+        chunks = [json.loads(message) for message in messages]
+        self.assertGreater(len(chunks), 1)
+        for message in messages:
+            self.assertLessEqual(
+                len(message.encode("utf-8")), MAX_STATUS_RPC_PAYLOAD_BYTES
+            )
+        self.assertEqual({chunk["chunk_id"] for chunk in chunks}, {"abc"})
+        self.assertEqual("".join(chunk["data"] for chunk in chunks), payload_json)
+
+    def test_logs_an_error_when_too_many_chunks_are_needed(self) -> None:
+        summary = "x" * (MAX_STATUS_RPC_CHUNKS + 1) * MAX_STATUS_RPC_PAYLOAD_BYTES
+
+        with self.assertLogs("agent_web_search", level="ERROR") as logs:
+            messages = _encode_status_messages(
+                {"state": "running", "provider": "parallel", "summary": summary}
+            )
+
+        self.assertIn("web_search_status_payload_too_large", logs.output[0])
+        self.assertEqual(
+            [json.loads(message) for message in messages],
+            [{"state": "running", "provider": "parallel", "summary": "Web search"}],
+        )
 
 
 if __name__ == "__main__":
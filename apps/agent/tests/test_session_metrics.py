@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from session_metrics import (  # noqa: E402
+    METRICS_DIR_ENV,
+    PROMETHEUS_METRIC,
+    STAGE_EOU_DELAY,
+    STAGE_LLM_TTFT,
+    STAGE_TRANSCRIPTION_DELAY,
+    STAGE_TTS_TTFB,
+    LatencyHistogram,
+    LogSampler,
+    MetricsDumper,
+    RingBuffer,
+    TurnMetrics,
+    create_metrics_dumper,
+    load_log_sample_rate,
+)
+
+
+class RingBufferTests(unittest.TestCase):
+    def test_keeps_most_recent_samples_in_order(self) -> None:
+        buffer = RingBuffer(3)
+        buffer.append(1.0)
+        buffer.append(2.0)
+        self.assertEqual(buffer.values(), [1.0, 2.0])
+
+        for value in (3.0, 4.0, 5.0):
+            buffer.append(value)
+
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(buffer.values(), [3.0, 4.0, 5.0])
+
+
+class TurnMetricsTests(unittest.TestCase):
+    def test_histogram_buckets_are_inclusive_upper_bounds(self) -> None:
+        histogram = LatencyHistogram(buckets=(0.1, 0.5), window=2)
+
+        for seconds in (0.1, 0.2, 0.9):
+            histogram.observe(seconds)
+
+        self.assertEqual(histogram.counts.tolist(), [1, 1, 1])
+        self.assertEqual(histogram.count, 3)
+        # Percentiles only use the recent window.
+        self.assertEqual(histogram.percentile(0.0), 0.2)
+
+    def test_records_livekit_turn_metrics(self) -> None:
+        metrics = TurnMetrics()
+
+        metrics.observe_livekit_metrics(
+            SimpleNamespace(
+                type="eou_metrics",
+                end_of_utterance_delay=0.4,
+                transcription_delay=0.2,
+            )
+        )
+        metrics.observe_livekit_metrics(
+            SimpleNamespace(type="llm_metrics", ttft=0.3, cancelled=False)
+        )
+        metrics.observe_livekit_metrics(
+            SimpleNamespace(type="tts_metrics", ttfb=0.15, cancelled=True)
+        )
+        metrics.observe_livekit_metrics(SimpleNamespace(type="vad_metrics"))
+
+        stages = metrics.as_dict()["stages"]
+        self.assertEqual(stages[STAGE_EOU_DELAY]["p50_ms"], 400.0)
+        self.assertEqual(stages[STAGE_TRANSCRIPTION_DELAY]["p50_ms"], 200.0)
+        self.assertEqual(stages[STAGE_LLM_TTFT]["count"], 1)
+        self.assertEqual(stages[STAGE_TTS_TTFB]["count"], 0)
+
+    def test_renders_prometheus_histogram(self) -> None:
+        metrics = TurnMetrics()
+        metrics.observe(STAGE_LLM_TTFT, 0.3)
+        metrics.observe(STAGE_LLM_TTFT, 20.0)
+        metrics.observe(STAGE_LLM_TTFT, -1.0)
+
+        text = metrics.render_prometheus()
+
+        self.assertIn(f"# TYPE {PROMETHEUS_METRIC} histogram", text)
+        labels = f'pid="{os.getpid()}",stage="llm_ttft"'
+        self.assertIn(f'{PROMETHEUS_METRIC}_bucket{{{labels},le="0.25"}} 0', text)
+        self.assertIn(f'{PROMETHEUS_METRIC}_bucket{{{labels},le="0.5"}} 1', text)
+        self.assertIn(f'{PROMETHEUS_METRIC}_bucket{{{labels},le="+Inf"}} 2', text)
+        self.assertIn(f"{PROMETHEUS_METRIC}_count{{{labels}}} 2", text)
+
+    def test_render_prometheus_rejects_bucket_count_mismatch(self) -> None:
+        metrics = TurnMetrics()
+        metrics.observe(STAGE_LLM_TTFT, 0.3)
+        histogram = metrics.histograms[STAGE_LLM_TTFT]
+        histogram.counts.append(0)
+
+        with self.assertRaises(ValueError):
+            metrics.render_prometheus()
+
+    def test_dumper_writes_json_and_prometheus_files(self) -> None:
+        metrics = TurnMetrics()
+        metrics.observe(STAGE_LLM_TTFT, 0.3)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dumper = create_metrics_dumper(metrics, {METRICS_DIR_ENV: temp_dir})
+            assert dumper is not None
+            dumper.dump()
+            files = sorted(path.name for path in Path(temp_dir).iterdir())
+            report = json.loads(next(Path(temp_dir).glob("*.json")).read_text())
+
+        pid = os.getpid()
+        self.assertEqual(
+            files, [f"turn-metrics-{pid}.json", f"turn-metrics-{pid}.prom"]
+        )
+        self.assertEqual(report["stages"][STAGE_LLM_TTFT]["count"], 1)
+        self.assertIsNone(create_metrics_dumper(metrics, {}))
+
+    def test_dumper_removes_its_files_and_dead_process_files(self) -> None:
+        metrics = TurnMetrics()
+
+        async def run(dumper: MetricsDumper) -> None:
+            dumper.start()
+            dumper.dump()
+            await dumper.aclose()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            directory = Path(temp_dir)
+            dead, alive = "turn-metrics-999999999", f"turn-metrics-{os.getppid()}"
+            for name in (dead, alive):
+                (directory / f"{name}.json").write_text("{}")
+                (directory / f"{name}.prom").write_text("")
+            asyncio.run(run(MetricsDumper(metrics, directory)))
+            files = sorted(path.name for path in directory.iterdir())
+
+        self.assertEqual(files, [f"{alive}.json", f"{alive}.prom"])
+
+
+class LogSamplerTests(unittest.TestCase):
+    def test_samples_by_rate(self) -> None:
+        values = iter([0.05, 0.5])
+        sampler = LogSampler(0.1, random_fn=lambda: next(values))
+
+        self.assertTrue(sampler.sample())
+        self.assertFalse(sampler.sample())
+        self.assertTrue(LogSampler(1.0).sample())
+        self.assertFalse(LogSampler(0.0).sample())
+
+    def test_loads_sample_rate_from_env(self) -> None:
+        self.assertEqual(load_log_sample_rate({}), 0.1)
+        self.assertEqual(
+            load_log_sample_rate({"LIVEKIT_AGENT_LOG_SAMPLE_RATE": "1"}), 1.0
+        )
+        with self.assertLogs("session_metrics", level="WARNING"):
+            self.assertEqual(
+                load_log_sample_rate({"LIVEKIT_AGENT_LOG_SAMPLE_RATE": "often"}), 0.1
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from startup_trace import StartupTrace  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 10.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class StartupTraceTests(unittest.IsolatedAsyncioTestCase):
+    async def test_records_overlapping_stages_relative_to_job_start(self) -> None:
+        clock = FakeClock()
+        trace = StartupTrace("job-123", clock=clock)
+        connect_started = asyncio.Event()
+        release_connect = asyncio.Event()
+
+        async def connect() -> str:
+            connect_started.set()
+            await release_connect.wait()
+            return "connected"
+
+        connect_task = asyncio.create_task(trace.run("room_connect", connect()))
+        await connect_started.wait()
+        clock.now += 0.05
+        with trace.stage("session_models"):
+            clock.now += 0.02
+        release_connect.set()
+        clock.now += 0.1
+
+        self.assertEqual(await connect_task, "connected")
+        trace.mark("greeting_requested")
+
+        payload = trace.as_dict()
+        self.assertEqual(payload["job_id"], "job-123")
+        self.assertEqual(payload["total_ms"], 170.0)
+        self.assertEqual(
+            [
+                (stage["name"], stage["start_ms"], stage["duration_ms"])
+                for stage in payload["stages"]
+            ],
+            [
+                ("room_connect", 0.0, 170.0),
+                ("session_models", 50.0, 20.0),
+                ("greeting_requested", 170.0, 0.0),
+            ],
+        )
+
+    async def test_marks_failed_stages(self) -> None:
+        trace = StartupTrace("job-123", clock=FakeClock())
+
+        async def fail() -> None:
+            raise RuntimeError("persona offline")
+
+        with self.assertRaises(RuntimeError):
+            await trace.run("persona_fetch", fail())
+
+        self.assertFalse(trace.stages[0].ok)
+
+    async def test_tracks_background_tasks_until_they_finish(self) -> None:
+        clock = FakeClock()
+        trace = StartupTrace("job-123", clock=clock)
+        release = asyncio.Event()
+        task = asyncio.create_task(release.wait())
+
+        trace.track("search_warm_up", task)
+        self.assertIsNone(trace.stages[0].duration_ms)
+        clock.now += 0.3
+        release.set()
+        await task
+        await asyncio.sleep(0)
+
+        self.assertEqual(round(trace.stages[0].duration_ms), 300)
+
+    def test_logs_trace_as_single_json_line(self) -> None:
+        trace = StartupTrace("job-123", clock=FakeClock())
+        trace.mark("greeting_requested")
+
+        with self.assertLogs("startup_trace", level="INFO") as logs:
+            trace.log()
+
+        message = logs.records[0].getMessage()
+        self.assertTrue(message.startswith("portfolio_agent_startup_trace "))
+        payload = json.loads(message.removeprefix("portfolio_agent_startup_trace "))
+        self.assertEqual(payload["stages"][0]["name"], "greeting_requested")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from tts_pool import TtsEnginePool, TtsSwitchLatency  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeEngine:
+    def __init__(self, voice_id: str | None) -> None:
+        self.voice_id = voice_id
+        self.prewarmed = False
+        self.closed = False
+
+    def prewarm(self) -> None:
+        self.prewarmed = True
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+def make_persona(voice_id: str, **options: object) -> SimpleNamespace:
+    return SimpleNamespace(
+        tts_model="cartesia/sonic-3.5",
+        tts_voice_id=voice_id,
+        tts_language="en",
+        tts_options=options,
+        requires_cartesia_plugin=True,
+    )
+
+
+def make_pool(clock: FakeClock, max_size: int = 2) -> TtsEnginePool:
+    return TtsEnginePool(
+        lambda persona: FakeEngine(persona.tts_voice_id),
+        max_size=max_size,
+        idle_seconds=300,
+        clock=clock,
+    )
+
+
+class TtsEnginePoolTests(unittest.IsolatedAsyncioTestCase):
+    async def test_reuses_prewarmed_engine_for_same_voice_settings(self) -> None:
+        pool = make_pool(FakeClock())
+
+        first, first_hit = pool.acquire(make_persona("voice-a", speed=1.1))
+        pool.release(first)
+        second, second_hit = pool.acquire(make_persona("voice-a", speed=1.1))
+
+        self.assertIs(first, second)
+        self.assertTrue(first.prewarmed)
+        self.assertFalse(first_hit)
+        self.assertTrue(second_hit)
+        self.assertEqual((pool.stats.hits, pool.stats.misses), (1, 1))
+
+    async def test_distinguishes_voice_options(self) -> None:
+        pool = make_pool(FakeClock())
+
+        slow, _ = pool.acquire(make_persona("voice-a", speed=0.9))
+        fast, hit = pool.acquire(make_persona("voice-a", speed=1.2))
+
+        self.assertIsNot(slow, fast)
+        self.assertFalse(hit)
+
+    async def test_evicts_least_recently_used_released_engine(self) -> None:
+        pool = make_pool(FakeClock(), max_size=2)
+
+        voice_a, _ = pool.acquire(make_persona("voice-a"))
+        pool.release(voice_a)
+        voice_b, _ = pool.acquire(make_persona("voice-b"))
+        pool.release(voice_b)
+        pool.acquire(make_persona("voice-a"))
+        pool.acquire(make_persona("voice-c"))
+        await asyncio.sleep(0)
+
+        self.assertEqual(len(pool), 2)
+        self.assertTrue(voice_b.closed)
+        self.assertFalse(voice_a.closed)
+        self.assertEqual(pool.stats.evictions, 1)
+
+    async def test_never_evicts_engines_in_use(self) -> None:
+        pool = make_pool(FakeClock(), max_size=1)
+
+        voice_a, _ = pool.acquire(make_persona("voice-a"))
+        pool.acquire(make_persona("voice-b"))
+        await asyncio.sleep(0)
+
+        self.assertFalse(voice_a.closed)
+        self.assertEqual(len(pool), 2)
+
+    async def test_closes_released_engines_after_idle_timeout(self) -> None:
+        clock = FakeClock()
+        pool = make_pool(clock)
+
+        voice_a, _ = pool.acquire(make_persona("voice-a"))
+        pool.release(voice_a)
+        clock.now += 301
+        pool.close_idle()
+        await asyncio.sleep(0)
+
+        self.assertTrue(voice_a.closed)
+        self.assertEqual(len(pool), 0)
+        self.assertEqual(pool.stats.idle_closed, 1)
+
+
+class TtsSwitchLatencyTests(unittest.TestCase):
+    def test_measures_switch_to_next_speech_once(self) -> None:
+        clock = FakeClock()
+        latency = TtsSwitchLatency(clock=clock)
+
+        self.assertIsNone(latency.speech_started())
+        latency.switched(pool_hit=True)
+        clock.now += 0.25
+
+        self.assertEqual(latency.speech_started(), (250.0, True))
+        self.assertIsNone(latency.speech_started())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+import httpx
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+)
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from agent_web_search import (  # noqa: E402
+    STATUS_RPC_SPAN,
+    LiveKitRpcSearchToolStatusNotifier,
+    SearchToolStatusNotifier,
+    run_web_search_tool,
+)
+from analyze_traces import main as analyze_traces_main  # noqa: E402
+from analyze_traces import iter_span_records, summarize_spans  # noqa: E402
+from voice_tracing import (  # noqa: E402
+    VOICE_TURN_SPAN,
+    JsonLinesSpanExporter,
+    TurnSpanRecorder,
+    set_voice_tracer_provider,
+    tracer,
+)
+from web_search import SearchProviderConfig, SearchResult  # noqa: E402
+from web_search_cache import SearchCacheSettings, SearchResultCache  # noqa: E402
+from web_search_providers import (  # noqa: E402
+    PROVIDER_REQUEST_SPAN,
+    ExaSearchProvider,
+)
+
+EXA_PAYLOAD = {
+    "results": [
+        {
+            "title": "Exa Search",
+            "url": "https://exa.ai",
+            "text": "Neural search API.",
+        }
+    ]
+}
+
+
+class TracingTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(self.exporter))
+        set_voice_tracer_provider(provider)
+
+    def tearDown(self) -> None:
+        set_voice_tracer_provider(None)
+
+    def spans_by_name(self) -> dict[str, object]:
+        return {span.name: span for span in self.exporter.get_finished_spans()}
+
+
+class QuietNotifier(SearchToolStatusNotifier):
+    pass
+
+
+class FakeRoom:
+    def __init__(self) -> None:
+        self.remote_participants = {"browser": object()}
+        self.local_participant = SimpleNamespace(perform_rpc=self.perform_rpc)
+
+    async def perform_rpc(self, **kwargs: object) -> str:
+        return "ok"
+
+
+class TurnSpanRecorderTests(TracingTestCase):
+    def test_builds_turn_span_with_stage_children(self) -> None:
+        recorder = TurnSpanRecorder()
+
+        recorder.speech_ended(100.0)
+        recorder.add_livekit_metrics(
+            SimpleNamespace(
+                type="eou_metrics",
+                end_of_utterance_delay=0.4,
+                transcription_delay=0.2,
+            )
+        )
+        recorder.agent_speaking(101.2)
+        # LLM metrics can arrive after the agent has started speaking.
+        recorder.add_livekit_metrics(
+            SimpleNamespace(
+                type="llm_metrics",
+                timestamp=101.5,
+                duration=1.0,
+                ttft=0.3,
+                total_tokens=42,
+                cancelled=False,
+            )
+        )
+
+        spans = self.spans_by_name()
+        turn = spans[VOICE_TURN_SPAN]
+        llm = spans[f"{VOICE_TURN_SPAN}.llm_ttft"]
+        self.assertEqual(turn.attributes["voice_turn.response_ms"], 1200.0)
+        self.assertEqual(turn.end_time - turn.start_time, 1_200_000_000)
+        for name in ("eou_delay", "transcription_delay", "llm_ttft"):
+            child = spans[f"{VOICE_TURN_SPAN}.{name}"]
+            self.assertEqual(child.parent.span_id, turn.context.span_id)
+        self.assertEqual(llm.start_time, 100_500_000_000)
+        self.assertEqual(llm.attributes["llm.total_tokens"], 42)
+
+    def test_close_ends_unanswered_turn(self) -> None:
+        recorder = TurnSpanRecorder()
+
+        recorder.speech_ended(10.0)
+        recorder.speech_ended(12.0)
+        recorder.close(13.0)
+        recorder.agent_speaking(14.0)
+
+        turns = self.exporter.get_finished_spans()
+        self.assertEqual(len(turns), 2)
+        self.assertEqual(
+            [turn.attributes["voice_turn.completed"] for turn in turns],
+            [False, False],
+        )
+
+
+class SearchSpanTests(TracingTestCase, unittest.IsolatedAsyncioTestCase):
+    async def test_provider_span_records_status_and_bytes(self) -> None:
+        body = json.dumps(EXA_PAYLOAD).encode("utf-8")
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(200, stream=httpx.ByteStream(body))
+        )
+        async with httpx.AsyncClient(transport=transport) as http_client:
+            provider = ExaSearchProvider(
+                SearchProviderConfig(api_key="exa-key"), http_client=http_client
+            )
+            with tracer().start_as_current_span("search_web"):
+                await provider.search("exa", max_results=3, timeout_seconds=5)
+
+        spans = self.spans_by_name()
+        request_span = spans[PROVIDER_REQUEST_SPAN]
+        self.assertEqual(
+            request_span.parent.span_id, spans["search_web"].context.span_id
+        )
+        self.assertEqual(request_span.attributes["web_search.provider"], "exa")
+        self.assertEqual(request_span.attributes["http.response.status_code"], 200)
+        self.assertEqual(
+            request_span.attributes["web_search.bytes_received"], len(body)
+        )
+        self.assertEqual(request_span.attributes["web_search.result_count"], 1)
+
+    async def test_search_span_records_cache_status(self) -> None:
+        class Provider:
+            name = "parallel"
+
+            async def search(self, query, max_results, timeout_seconds):
+                return [
+                    SearchResult(
+                        title="Parallel",
+                        url="https://parallel.ai",
+                        snippet="Search API.",
+                        published_at=None,
+                        provider="parallel",
+                    )
+                ]
+
+        cache = SearchResultCache(
+            SearchCacheSettings(
+                enabled=True,
+                max_entries=10,
+                max_bytes=100_000,
+                ttl_seconds=300,
+                live_ttl_seconds=60,
+                reference_ttl_seconds=1_800,
+            )
+        )
+        for _ in range(2):
+            with tracer().start_as_current_span("search_web"):
+                await run_web_search_tool(
+                    summary="Parallel",
+                    query="parallel search api",
+                    provider=Provider(),
+                    notifier=QuietNotifier(),
+                    max_results=5,
+                    timeout_seconds=8,
+                    cache=cache,
+                )
+
+        statuses = [
+            span.attributes["web_search.cache_status"]
+            for span in self.exporter.get_finished_spans()
+        ]
+        self.assertEqual(statuses, ["miss", "hit"])
+
+    async def test_status_rpc_span_records_payload_fit_time(self) -> None:
+        notifier = LiveKitRpcSearchToolStatusNotifier(FakeRoom())
+
+        await notifier.started("Searching", "parallel")
+        await notifier.flush()
+
+        span = self.spans_by_name()[STATUS_RPC_SPAN]
+        self.assertEqual(span.attributes["web_search.status_state"], "running")
+        self.assertGreaterEqual(span.attributes["web_search.fit_rpc_payload_ms"], 0)
+        self.assertGreater(span.attributes["rpc.payload_bytes"], 0)
+
+
+class TraceExportAnalysisTests(TracingTestCase):
+    def test_file_export_feeds_percentile_report(self) -> None:
+        recorder = TurnSpanRecorder()
+        for index in range(10):
+            recorder.speech_ended(float(index * 10))
+            recorder.agent_speaking(index * 10 + (index + 1) / 10)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "traces.jsonl"
+            JsonLinesSpanExporter(str(path)).export(self.exporter.get_finished_spans())
+            records = list(iter_span_records(path.read_text().splitlines()))
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                exit_code = analyze_traces_main([str(path)])
+
+        self.assertEqual(exit_code, 0)
+        self.assertIn(VOICE_TURN_SPAN, output.getvalue())
+        self.assertEqual(
+            summarize_spans(records),
+            [
+                {
+                    "span": VOICE_TURN_SPAN,
+                    "count": 10,
+                    "p50_ms": 600.0,
+                    "p95_ms": 1000.0,
+                    "p99_ms": 1000.0,
+                }
+            ],
+        )
+
+    def test_reads_otlp_json_export(self) -> None:
+        line = json.dumps(
+            {
+                "resourceSpans": [
+                    {
+                        "scopeSpans": [
+                            {
+                                "spans": [
+                                    {
+                                        "name": "llm_node",
+                                        "startTimeUnixNano": "1000000000",
+                                        "endTimeUnixNano": "1250000000",
+                                    }
+                                ]
+                            }
+                        ]
+                    }
+                ]
+            }
+        )
+
+        summaries = summarize_spans(iter_span_records([line, "not json", ""]))
+
+        self.assertEqual(summaries[0]["span"], "llm_node")
+        self.assertEqual(summaries[0]["p50_ms"], 250.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from web_search import SearchResult  # noqa: E402
+from web_search_cache import (  # noqa: E402
+    SearchCacheSettings,
+    SearchResultCache,
+    SqliteSearchResultStore,
+    create_search_cache,
+    load_search_cache_settings,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_settings(**overrides: object) -> SearchCacheSettings:
+    values: dict[str, object] = {
+        "enabled": True,
+        "max_entries": 10,
+        "max_bytes": 1_000_000,
+        "ttl_seconds": 300.0,
+        "live_ttl_seconds": 60.0,
+        "reference_ttl_seconds": 1_800.0,
+    }
+    values.update(overrides)
+    return SearchCacheSettings(**values)  # type: ignore[arg-type]
+
+
+def make_result(title: str, snippet: str = "Snippet.") -> SearchResult:
+    return SearchResult(
+        title=title,
+        url=f"https://example.com/{title}",
+        snippet=snippet,
+        published_at=None,
+        provider="parallel",
+    )
+
+
+class SearchCacheSettingsTests(unittest.TestCase):
+    def test_loads_ttl_classes_from_environment(self) -> None:
+        settings = load_search_cache_settings(
+            {
+                "WEB_SEARCH_CACHE_MAX_ENTRIES": "32",
+                "WEB_SEARCH_CACHE_LIVE_TTL_SECONDS": "15",
+                "WEB_SEARCH_CACHE_REFERENCE_TTL_SECONDS": "600",
+            }
+        )
+
+        self.assertTrue(settings.enabled)
+        self.assertEqual(settings.max_entries, 32)
+        self.assertEqual(settings.live_ttl_seconds, 15)
+        self.assertEqual(settings.reference_ttl_seconds, 600)
+        self.assertEqual(settings.ttl_seconds, 300)
+
+    def test_cache_can_be_disabled(self) -> None:
+        self.assertIsNone(create_search_cache({"WEB_SEARCH_CACHE_ENABLED": "false"}))
+
+
+class SearchResultCacheTests(unittest.IsolatedAsyncioTestCase):
+    async def test_hits_on_normalized_query(self) -> None:
+        cache = SearchResultCache(make_settings(), clock=FakeClock())
+        cache.put("parallel", "Latest Next.js version?", 5, [make_result("next")])
+
+        results = await cache.get("parallel", "  latest next.js   VERSION ", 5)
+
+        self.assertEqual([result.title for result in results or []], ["next"])
+        self.assertIsNone(await cache.get("exa", "latest next.js version", 5))
+        self.assertIsNone(await cache.get("parallel", "latest next.js version", 3))
+        self.assertEqual(cache.stats.hits, 1)
+        self.assertEqual(cache.stats.misses, 2)
+
+    async def test_uses_freshness_class_ttl(self) -> None:
+        clock = FakeClock()
+        cache = SearchResultCache(make_settings(), clock=clock)
+        cache.put("parallel", "weather today in SF", 5, [make_result("weather")])
+        cache.put("parallel", "LiveKit docs", 5, [make_result("docs")])
+
+        clock.now += 61
+
+        self.assertIsNone(await cache.get("parallel", "weather today in SF", 5))
+        self.assertIsNotNone(await cache.get("parallel", "LiveKit docs", 5))
+        self.assertEqual(cache.stats.expirations, 1)
+
+    async def test_evicts_least_recently_used_entry_by_count(self) -> None:
+        cache = SearchResultCache(make_settings(max_entries=2), clock=FakeClock())
+        cache.put("parallel", "first", 5, [make_result("first")])
+        cache.put("parallel", "second", 5, [make_result("second")])
+        await cache.get("parallel", "first", 5)
+
+        cache.put("parallel", "third", 5, [make_result("third")])
+
+        self.assertIsNotNone(await cache.get("parallel", "first", 5))
+        self.assertIsNone(await cache.get("parallel", "second", 5))
+        self.assertEqual(cache.stats.evictions, 1)
+
+    async def test_evicts_entries_to_stay_under_byte_budget(self) -> None:
+        cache = SearchResultCache(make_settings(max_bytes=1_000), clock=FakeClock())
+        cache.put("parallel", "first", 5, [make_result("first", "x" * 500)])
+        cache.put("parallel", "second", 5, [make_result("second", "y" * 500)])
+
+        self.assertEqual(len(cache), 1)
+        self.assertLessEqual(cache.size_bytes, 1_000)
+        self.assertIsNotNone(await cache.get("parallel", "second", 5))
+
+    async def test_skips_entries_larger_than_byte_budget(self) -> None:
+        cache = SearchResultCache(make_settings(max_bytes=100), clock=FakeClock())
+
+        cache.put("parallel", "huge", 5, [make_result("huge", "z" * 500)])
+
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.size_bytes, 0)
+
+
+
+class SqliteSearchResultStoreTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = Path(self.directory.name) / "cache.sqlite3"
+
+    def open_store(self, clock: FakeClock) -> SqliteSearchResultStore:
+        store = SqliteSearchResultStore(self.path, clock=clock)
+        self.addCleanup(store.close)
+        return store
+
+    async def test_shares_results_between_process_caches(self) -> None:
+        clock = FakeClock()
+        writer = SearchResultCache(make_settings(), disk=self.open_store(clock))
+        reader = SearchResultCache(make_settings(), disk=self.open_store(clock))
+
+        writer.put("parallel", "LiveKit docs", 5, [make_result("docs", "Déjà vu.")])
+        writer.disk.flush()
+        results = await reader.get("parallel", "livekit docs", 5)
+
+        self.assertEqual(results, [make_result("docs", "Déjà vu.")])
+        self.assertEqual(reader.stats.disk_hits, 1)
+        self.assertEqual(len(reader), 1)
+
+    def test_skips_and_compacts_expired_rows(self) -> None:
+        clock = FakeClock()
+        store = self.open_store(clock)
+        cache = SearchResultCache(make_settings(), disk=store)
+        cache.put("parallel", "weather today", 5, [make_result("weather")])
+        cache.put("parallel", "LiveKit docs", 5, [make_result("docs")])
+        store.flush()
+
+        clock.now += 61
+
+        self.assertIsNone(store.get(("parallel", "weather today", 5)))
+        self.assertEqual(store.compact(), 1)
+        self.assertIsNotNone(store.get(("parallel", "livekit docs", 5)))
+
+    async def test_put_does_not_wait_for_a_locked_database(self) -> None:
+        store = self.open_store(FakeClock())
+        cache = SearchResultCache(make_settings(), disk=store)
+        blocker = sqlite3.connect(self.path, isolation_level=None)
+        self.addCleanup(blocker.close)
+        blocker.execute("BEGIN IMMEDIATE")
+
+        started = time.perf_counter()
+        cache.put("parallel", "LiveKit docs", 5, [make_result("docs")])
+        elapsed = time.perf_counter() - started
+        blocker.execute("ROLLBACK")
+        await asyncio.to_thread(store.flush)
+
+        self.assertLess(elapsed, 0.1)
+        self.assertIsNotNone(store.get(("parallel", "livekit docs", 5)))
+
+    def test_close_writes_out_queued_results(self) -> None:
+        clock = FakeClock()
+        store = SqliteSearchResultStore(self.path, clock=clock)
+        cache = SearchResultCache(make_settings(), disk=store)
+
+        cache.put("parallel", "LiveKit docs", 5, [make_result("docs")])
+        cache.close()
+
+        self.assertIsNone(cache.disk)
+        self.assertIsNotNone(
+            self.open_store(clock).get(("parallel", "livekit docs", 5))
+        )
+
+    async def test_concurrent_lookups_share_the_reader_connection(self) -> None:
+        clock = FakeClock()
+        store = self.open_store(clock)
+        cache = SearchResultCache(make_settings(), disk=store)
+        cache.put("parallel", "LiveKit docs", 5, [make_result("docs")])
+        store.flush()
+
+        rows = await asyncio.gather(
+            *(
+                asyncio.to_thread(store.get, ("parallel", "livekit docs", 5))
+                for _ in range(16)
+            )
+        )
+
+        self.assertTrue(all(row is not None for row in rows))
+
+    def test_uses_wal_journal_mode(self) -> None:
+        store = self.open_store(FakeClock())
+
+        mode = store._connection.execute("PRAGMA journal_mode").fetchone()[0]
+
+        self.assertEqual(mode, "wal")
+
+    def test_create_search_cache_attaches_disk_store_from_environment(self) -> None:
+        cache = create_search_cache({"WEB_SEARCH_CACHE_DIR": self.directory.name})
+        assert cache is not None and cache.disk is not None
+        self.addCleanup(cache.disk.close)
+
+        self.assertTrue(cache.disk.path.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,21 +1,40 @@
 from __future__ import annotations
 
+import asyncio
 import sys
 import unittest
 from pathlib import Path
 
+import httpx
+
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
 from web_search import (  # noqa: E402
+    SharedHttpClientPool,
     create_default_http_client,
     create_search_provider,
     load_web_search_settings,
 )
-from web_search_providers import ParallelSearchProvider  # noqa: E402
+from web_search_health import (  # noqa: E402
+    CircuitBreakerSettings,
+    ProviderHealthRegistry,
+)
+from web_search_providers import (  # noqa: E402
+    AdaptiveSearchProvider,
+    CircuitBreakerSearchProvider,
+    FailoverSearchProvider,
+    HedgedSearchProvider,
+    ParallelSearchProvider,
+)
 
 
 class FakeHttpClient:
-    pass
+    def __init__(self, event_hooks=None) -> None:
+        self.event_hooks = event_hooks or {}
+        self.is_closed = False
+
+    async def aclose(self) -> None:
+        self.is_closed = True
 
 
 class WebSearchConfigTests(unittest.TestCase):
@@ -47,6 +66,22 @@ class WebSearchConfigTests(unittest.TestCase):
 
         self.assertIsInstance(provider, ParallelSearchProvider)
 
+    def test_single_provider_gets_circuit_breaker_when_health_is_tracked(self) -> None:
+        settings = load_web_search_settings({"PARALLEL_API_KEY": "parallel-key"})
+        health = ProviderHealthRegistry(
+            CircuitBreakerSettings(failure_threshold=3, reset_seconds=30)
+        )
+
+        provider = create_search_provider(
+            settings,
+            http_client=FakeHttpClient(),
+            health=health,
+        )
+
+        self.assertIsInstance(provider, CircuitBreakerSearchProvider)
+        self.assertIsInstance(provider.provider, ParallelSearchProvider)
+        self.assertIs(provider.health, health.get("parallel"))
+
     def test_selected_provider_requires_its_matching_api_key(self) -> None:
         with self.assertRaisesRegex(ValueError, "EXA_API_KEY is missing"):
             load_web_search_settings(
@@ -65,10 +100,157 @@ class WebSearchConfigTests(unittest.TestCase):
                 }
             )
 
+    def test_race_mode_loads_every_provider_with_a_key_in_order(self) -> None:
+        settings = load_web_search_settings(
+            {
+                "WEB_SEARCH_PROVIDER": "race",
+                "WEB_SEARCH_RACE_PROVIDERS": "exa, parallel, perplexity",
+                "WEB_SEARCH_HEDGE_DELAY_SECONDS": "0.5",
+                "WEB_SEARCH_SESSION_BUDGET_USD": "0.02",
+                "PARALLEL_API_KEY": "parallel-key",
+                "EXA_API_KEY": "exa-key",
+            }
+        )
+
+        provider = create_search_provider(settings, http_client=FakeHttpClient())
+
+        self.assertEqual(
+            dict(settings.provider_api_keys),
+            {"exa": "exa-key", "parallel": "parallel-key"},
+        )
+        self.assertIsInstance(provider, HedgedSearchProvider)
+        self.assertEqual(
+            [child.name for child in provider.providers],
+            ["exa", "parallel"],
+        )
+        self.assertEqual(provider.hedge_delay_seconds, 0.5)
+        self.assertEqual(provider.budget.limit_usd, 0.02)
+
+    def test_failover_mode_uses_failover_provider_chain(self) -> None:
+        settings = load_web_search_settings(
+            {
+                "WEB_SEARCH_PROVIDER": "failover",
+                "WEB_SEARCH_FAILOVER_PROVIDERS": "perplexity,parallel",
+                "PARALLEL_API_KEY": "parallel-key",
+                "PERPLEXITY_API_KEY": "perplexity-key",
+            }
+        )
+
+        provider = create_search_provider(settings, http_client=FakeHttpClient())
+
+        self.assertIsInstance(provider, FailoverSearchProvider)
+        self.assertEqual(
+            [child.name for child in provider.providers],
+            ["perplexity", "parallel"],
+        )
+
+    def test_adaptive_mode_loads_exploration_and_cost_weight(self) -> None:
+        settings = load_web_search_settings(
+            {
+                "WEB_SEARCH_PROVIDER": "adaptive",
+                "WEB_SEARCH_EXPLORATION_RATE": "0.2",
+                "WEB_SEARCH_COST_WEIGHT_MS_PER_CENT": "50",
+                "PARALLEL_API_KEY": "parallel-key",
+                "EXA_API_KEY": "exa-key",
+            }
+        )
+
+        provider = create_search_provider(settings, http_client=FakeHttpClient())
+
+        self.assertIsInstance(provider, AdaptiveSearchProvider)
+        self.assertEqual(provider.exploration_rate, 0.2)
+        self.assertEqual(provider.cost_weight_ms_per_cent, 50)
+        self.assertEqual(
+            [child.name for child in provider.providers],
+            ["parallel", "exa"],
+        )
+
+    def test_race_mode_requires_at_least_one_provider_key(self) -> None:
+        with self.assertRaisesRegex(ValueError, "No web search provider API keys"):
+            load_web_search_settings({"WEB_SEARCH_PROVIDER": "race"})
+
     def test_default_http_client_uses_httpx_async_client(self) -> None:
         client = create_default_http_client()
 
         self.assertEqual(client.__class__.__name__, "AsyncClient")
+        self.assertTrue(client._transport._pool._http2)
+
+
+
+class SharedHttpClientPoolTests(unittest.IsolatedAsyncioTestCase):
+    async def test_reuses_one_client_per_provider(self) -> None:
+        pool = SharedHttpClientPool(client_factory=FakeHttpClient)
+
+        parallel_client = pool.client("parallel")
+
+        self.assertIs(pool.client("parallel"), parallel_client)
+        self.assertIsNot(pool.client("exa"), parallel_client)
+        self.assertEqual(pool.stats.clients_created, 2)
+        self.assertEqual(pool.stats.client_hits, 1)
+
+    async def test_chain_modes_give_each_provider_its_own_pooled_client(self) -> None:
+        pool = SharedHttpClientPool(client_factory=FakeHttpClient)
+        settings = load_web_search_settings(
+            {
+                "WEB_SEARCH_PROVIDER": "race",
+                "WEB_SEARCH_RACE_PROVIDERS": "exa,parallel",
+                "PARALLEL_API_KEY": "parallel-key",
+                "EXA_API_KEY": "exa-key",
+            }
+        )
+
+        provider = create_search_provider(settings, http_client=pool)
+
+        exa, parallel = (child.provider for child in provider.providers)
+        self.assertIs(exa.http_client, pool.client("exa"))
+        self.assertIs(parallel.http_client, pool.client("parallel"))
+        self.assertIsNot(exa.http_client, parallel.http_client)
+        self.assertEqual(pool.stats.clients_created, 2)
+
+    async def test_replaces_closed_clients(self) -> None:
+        pool = SharedHttpClientPool(client_factory=FakeHttpClient)
+        client = pool.client("parallel")
+
+        await pool.aclose()
+
+        self.assertTrue(client.is_closed)
+        self.assertIsNot(pool.client("parallel"), client)
+        self.assertEqual(pool.stats.clients_created, 2)
+
+    async def test_counts_requests_and_new_connections(self) -> None:
+        pool = SharedHttpClientPool(client_factory=FakeHttpClient)
+        client = pool.client("parallel")
+        request_hook = client.event_hooks["request"][0]
+
+        for _ in range(3):
+            request = httpx.Request("POST", "https://api.parallel.ai/v1/search")
+            await request_hook(request)
+        await request.extensions["trace"]("connection.connect_tcp.started", {})
+
+        self.assertEqual(pool.stats.requests, 3)
+        self.assertEqual(pool.stats.new_connections, 1)
+        self.assertEqual(pool.stats.reused_connections, 2)
+
+
+class SharedHttpClientPoolLoopTests(unittest.TestCase):
+    def test_new_event_loop_gets_fresh_clients(self) -> None:
+        pool = SharedHttpClientPool(client_factory=FakeHttpClient)
+
+        async def get_client() -> FakeHttpClient:
+            return pool.client("parallel")
+
+        async def get_client_after_close() -> FakeHttpClient:
+            client = pool.client("parallel")
+            await asyncio.sleep(0)
+            return client
+
+        first = asyncio.run(get_client())
+        second = asyncio.run(get_client_after_close())
+
+        self.assertIsNot(first, second)
+        self.assertTrue(first.is_closed)
+        self.assertFalse(second.is_closed)
+        self.assertEqual(pool.stats.clients_created, 2)
 
 
 if __name__ == "__main__":
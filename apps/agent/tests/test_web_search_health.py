@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from web_search_health import (  # noqa: E402
+    CIRCUIT_CLOSED,
+    CIRCUIT_HALF_OPEN,
+    CIRCUIT_OPEN,
+    CircuitBreakerSettings,
+    CircuitOpenError,
+    ProviderHealth,
+    load_circuit_breaker_settings,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_health(clock: FakeClock) -> ProviderHealth:
+    return ProviderHealth(
+        "parallel",
+        CircuitBreakerSettings(failure_threshold=2, reset_seconds=30),
+        clock=clock,
+    )
+
+
+class ProviderHealthTests(unittest.TestCase):
+    def test_loads_breaker_settings_from_environment(self) -> None:
+        settings = load_circuit_breaker_settings(
+            {
+                "WEB_SEARCH_CIRCUIT_FAILURE_THRESHOLD": "5",
+                "WEB_SEARCH_CIRCUIT_RESET_SECONDS": "12.5",
+            }
+        )
+
+        self.assertEqual(settings.failure_threshold, 5)
+        self.assertEqual(settings.reset_seconds, 12.5)
+
+    def test_opens_after_consecutive_failures(self) -> None:
+        health = make_health(FakeClock())
+
+        health.record_failure(8_000)
+        self.assertEqual(health.state, CIRCUIT_CLOSED)
+        health.record_failure(8_000)
+
+        self.assertEqual(health.state, CIRCUIT_OPEN)
+        with self.assertRaisesRegex(CircuitOpenError, "parallel circuit is open"):
+            health.acquire()
+
+    def test_success_resets_consecutive_failures(self) -> None:
+        health = make_health(FakeClock())
+
+        health.record_failure(100)
+        health.record_success(100)
+        health.record_failure(100)
+
+        self.assertEqual(health.state, CIRCUIT_CLOSED)
+
+    def test_half_open_allows_one_probe_after_reset_window(self) -> None:
+        clock = FakeClock()
+        health = make_health(clock)
+        health.record_failure(100)
+        health.record_failure(100)
+
+        clock.now += 31
+        health.acquire()
+
+        self.assertEqual(health.state, CIRCUIT_HALF_OPEN)
+        with self.assertRaises(CircuitOpenError):
+            health.acquire()
+
+        health.record_success(200)
+        self.assertEqual(health.state, CIRCUIT_CLOSED)
+
+    def test_failed_probe_reopens_circuit(self) -> None:
+        clock = FakeClock()
+        health = make_health(clock)
+        health.record_failure(100)
+        health.record_failure(100)
+        clock.now += 31
+        health.acquire()
+
+        health.record_failure(100)
+
+        self.assertEqual(health.state, CIRCUIT_OPEN)
+        self.assertTrue(health.is_open())
+
+    def test_tracks_rolling_latency_and_error_rate(self) -> None:
+        health = make_health(FakeClock())
+
+        health.record_success(100)
+        health.record_success(200)
+        health.record_failure(1_000)
+
+        self.assertAlmostEqual(health.latency_ewma_ms or 0, 296.0)
+        self.assertAlmostEqual(health.error_rate_ewma, 0.2)
+        self.assertTrue(health.healthy)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from web_search import SearchResult  # noqa: E402
+from web_search_prefetch import (  # noqa: E402
+    SearchPrefetcher,
+    SearchPrefetchSettings,
+    create_search_prefetcher,
+    is_freshness_sensitive,
+    load_search_prefetch_settings,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RecordingProvider:
+    def __init__(self, name: str = "parallel") -> None:
+        self.name = name
+        self.queries: list[str] = []
+
+    async def search(
+        self,
+        query: str,
+        max_results: int,
+        timeout_seconds: float,
+    ) -> list[SearchResult]:
+        self.queries.append(query)
+        return [
+            SearchResult(
+                title="Paris weather",
+                url="https://example.com/paris-weather",
+                snippet="Sunny.",
+                published_at=None,
+                provider=self.name,
+            )
+        ]
+
+
+def make_prefetcher(
+    provider: RecordingProvider,
+    max_per_session: int = 3,
+    budget_usd: float = 0.02,
+    clock: FakeClock | None = None,
+) -> SearchPrefetcher:
+    return SearchPrefetcher(
+        SearchPrefetchSettings(
+            enabled=True,
+            max_per_session=max_per_session,
+            budget_usd=budget_usd,
+        ),
+        lambda _budget: provider,
+        max_results=5,
+        timeout_seconds=8,
+        clock=clock or FakeClock(),
+    )
+
+
+class SearchPrefetchSettingsTests(unittest.TestCase):
+    def test_prefetch_is_disabled_by_default(self) -> None:
+        settings = load_search_prefetch_settings({})
+
+        self.assertFalse(settings.enabled)
+        self.assertIsNone(create_search_prefetcher({}, RecordingProvider, 5, 8))
+
+    def test_loads_prefetch_caps_from_environment(self) -> None:
+        settings = load_search_prefetch_settings(
+            {
+                "WEB_SEARCH_PREFETCH_ENABLED": "true",
+                "WEB_SEARCH_PREFETCH_MAX_PER_SESSION": "5",
+                "WEB_SEARCH_PREFETCH_BUDGET_USD": "0.01",
+            }
+        )
+
+        self.assertTrue(settings.enabled)
+        self.assertEqual(settings.max_per_session, 5)
+        self.assertEqual(settings.budget_usd, 0.01)
+
+    def test_detects_freshness_sensitive_intent(self) -> None:
+        self.assertTrue(is_freshness_sensitive("What's the weather in Paris"))
+        self.assertTrue(is_freshness_sensitive("latest LiveKit release"))
+        self.assertFalse(is_freshness_sensitive("Tell me a joke about cats"))
+
+
+class SearchPrefetcherTests(unittest.IsolatedAsyncioTestCase):
+    async def test_prefetches_once_per_utterance_from_interim_transcripts(
+        self,
+    ) -> None:
+        provider = RecordingProvider()
+        prefetcher = make_prefetcher(provider)
+
+        self.assertIsNone(prefetcher.on_transcript("what's the", is_final=False))
+        first = prefetcher.on_transcript("what's the weather in Paris today", False)
+        second = prefetcher.on_transcript("what's the weather in Paris today", False)
+        final = prefetcher.on_transcript("what's the weather in Paris today", True)
+        await first
+
+        self.assertIsNotNone(first)
+        self.assertIsNone(second)
+        self.assertIsNone(final)
+        self.assertEqual(provider.queries, ["what's the weather in Paris today"])
+
+    async def test_final_transcript_with_new_words_prefetches_again(self) -> None:
+        provider = RecordingProvider()
+        prefetcher = make_prefetcher(provider)
+
+        prefetcher.on_transcript("weather in Paris today", is_final=False)
+        final = prefetcher.on_transcript("weather in Paris today and tomorrow", True)
+        await final
+
+        self.assertEqual(prefetcher.stats.prefetches, 2)
+
+    async def test_caps_prefetches_per_session(self) -> None:
+        provider = RecordingProvider()
+        prefetcher = make_prefetcher(provider, max_per_session=1)
+
+        prefetcher.on_transcript("weather in Paris today", is_final=True)
+        prefetcher.on_transcript("latest stock price for Apple", is_final=True)
+        await asyncio.sleep(0)
+
+        self.assertEqual(prefetcher.stats.prefetches, 1)
+        self.assertEqual(prefetcher.stats.skipped, 1)
+
+    async def test_caps_prefetches_by_estimated_spend(self) -> None:
+        provider = RecordingProvider("exa")
+        prefetcher = make_prefetcher(provider, budget_usd=0.01)
+
+        prefetcher.on_transcript("weather in Paris today", is_final=True)
+        prefetcher.on_transcript("latest stock price for Apple", is_final=True)
+        await asyncio.sleep(0)
+
+        self.assertEqual(prefetcher.stats.prefetches, 1)
+        self.assertAlmostEqual(prefetcher.budget.spent_usd, 0.007)
+
+    async def test_claim_matches_normalized_query_and_tracks_hit_rate(self) -> None:
+        provider = RecordingProvider()
+        prefetcher = make_prefetcher(provider)
+
+        prefetcher.on_transcript("what's the weather like in Paris today", True)
+        prefetcher.on_transcript("latest LiveKit agents release notes", True)
+        weather = await prefetcher.claim(
+            "parallel", "What's the weather like in  Paris today?", 5
+        )
+        similar = await prefetcher.claim("parallel", "LiveKit agents release notes", 5)
+
+        self.assertEqual(weather[0].url, "https://example.com/paris-weather")
+        self.assertIsNone(similar)
+        self.assertEqual(prefetcher.stats.hits, 1)
+        self.assertEqual(prefetcher.stats.misses, 1)
+        self.assertEqual(prefetcher.stats.hit_rate, 0.5)
+
+    async def test_provider_factory_receives_the_prefetch_budget(self) -> None:
+        provider = RecordingProvider()
+        budgets = []
+
+        def provider_factory(budget):
+            budgets.append(budget)
+            return provider
+
+        prefetcher = SearchPrefetcher(
+            SearchPrefetchSettings(enabled=True, max_per_session=3, budget_usd=0.02),
+            provider_factory,
+            max_results=5,
+            timeout_seconds=8,
+        )
+
+        await prefetcher.on_transcript("weather in Paris today", is_final=True)
+
+        self.assertEqual(budgets, [prefetcher.budget])
+
+    async def test_claim_ignores_stale_prefetches(self) -> None:
+        clock = FakeClock()
+        provider = RecordingProvider()
+        prefetcher = make_prefetcher(provider, clock=clock)
+
+        prefetcher.on_transcript("weather in Paris today", is_final=True)
+        clock.now += 120
+
+        self.assertIsNone(
+            await prefetcher.claim("parallel", "weather in Paris today", 5)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,15 +1,26 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import random
 import sys
 import unittest
 from pathlib import Path
+from contextlib import asynccontextmanager
 from typing import Any
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
-from web_search import SearchProviderConfig
+from agent_web_search import _format_results
+from web_search import SearchCostBudget, SearchProviderConfig, SearchResult
+from web_search_health import CircuitBreakerSettings, ProviderHealthRegistry
 from web_search_providers import (  # noqa: E402
+    _ResultsArrayParser,
+    AdaptiveSearchProvider,
+    CircuitBreakerSearchProvider,
     ExaSearchProvider,
+    FailoverSearchProvider,
+    HedgedSearchProvider,
     ParallelSearchProvider,
     PerplexitySearchProvider,
 )
@@ -34,6 +45,10 @@ class FakeHttpClient:
         self.calls.append({"args": args, "kwargs": kwargs})
         return FakeResponse(self.payload, self.status_code)
 
+    async def head(self, *args: Any, **kwargs: Any) -> FakeResponse:
+        self.calls.append({"args": args, "kwargs": kwargs, "method": "HEAD"})
+        return FakeResponse({}, 405)
+
 
 class MalformedHttpClient(FakeHttpClient):
     async def post(self, *args: Any, **kwargs: Any) -> FakeResponse:
@@ -41,6 +56,74 @@ class MalformedHttpClient(FakeHttpClient):
         return FakeResponse({"unexpected": []})
 
 
+class UnreachableHttpClient(FakeHttpClient):
+    async def head(self, *args: Any, **kwargs: Any) -> FakeResponse:
+        raise OSError("connection refused")
+
+
+class FakeStreamResponse:
+    def __init__(self, chunks: list[bytes], status_code: int = 200) -> None:
+        self.chunks = chunks
+        self.status_code = status_code
+
+    async def aiter_bytes(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+class StreamingHttpClient(FakeHttpClient):
+    def __init__(self, chunks: list[bytes], status_code: int = 200) -> None:
+        super().__init__({}, status_code)
+        self.chunks = chunks
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, **kwargs: Any):
+        self.calls.append({"args": (method, url), "kwargs": kwargs})
+        yield FakeStreamResponse(self.chunks, self.status_code)
+
+
+def split_every(data: bytes, size: int) -> list[bytes]:
+    return [data[index : index + size] for index in range(0, len(data), size)]
+
+
+class ScriptedProvider:
+    def __init__(
+        self,
+        name: str,
+        delay: float = 0,
+        error: Exception | None = None,
+    ) -> None:
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.started = 0
+        self.cancelled = False
+
+    async def search(
+        self,
+        query: str,
+        max_results: int,
+        timeout_seconds: float,
+    ) -> list[SearchResult]:
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise self.error
+        return [
+            SearchResult(
+                title=f"{self.name} result",
+                url=f"https://example.com/{self.name}",
+                snippet="",
+                published_at=None,
+                provider=self.name,
+            )
+        ]
+
+
 class SearchProviderTests(unittest.IsolatedAsyncioTestCase):
     async def test_parallel_search_returns_normalized_results(self) -> None:
         http_client = FakeHttpClient(
@@ -200,6 +283,33 @@ class SearchProviderTests(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(results[0].snippet, "Search API charges per request only.")
         self.assertEqual(results[0].published_at, "2026-07-02")
 
+    async def test_long_excerpts_reach_the_tool_output_in_full(self) -> None:
+        excerpts = ["a" * 400, "b" * 400, "c" * 400]
+        provider = ParallelSearchProvider(
+            SearchProviderConfig(api_key="parallel-key"),
+            http_client=FakeHttpClient(
+                {
+                    "results": [
+                        {
+                            "title": "Long",
+                            "url": "https://a.example",
+                            "excerpts": excerpts,
+                        }
+                    ]
+                }
+            ),
+        )
+
+        results = await provider.search(
+            query="long excerpts",
+            max_results=5,
+            timeout_seconds=8,
+        )
+
+        self.assertEqual(results[0].snippet, " ".join(excerpts))
+        self.assertIn(" ".join(excerpts), _format_results(results))
+        self.assertFalse(hasattr(results[0], "__dict__"))
+
     async def test_missing_provider_key_returns_safe_provider_error(self) -> None:
         provider = ParallelSearchProvider(
             SearchProviderConfig(api_key=""),
@@ -227,5 +337,393 @@ class SearchProviderTests(unittest.IsolatedAsyncioTestCase):
             )
 
 
+    async def test_warm_up_sends_head_to_provider_endpoint(self) -> None:
+        http_client = FakeHttpClient({})
+        provider = ExaSearchProvider(
+            SearchProviderConfig(api_key="exa-key"),
+            http_client=http_client,
+        )
+
+        warmed = await provider.warm_up(timeout_seconds=3)
+
+        self.assertTrue(warmed)
+        self.assertEqual(
+            http_client.calls,
+            [
+                {
+                    "args": ("https://api.exa.ai/search",),
+                    "kwargs": {"timeout": 3},
+                    "method": "HEAD",
+                }
+            ],
+        )
+
+    async def test_warm_up_swallows_connection_errors(self) -> None:
+        provider = ParallelSearchProvider(
+            SearchProviderConfig(api_key="parallel-key"),
+            http_client=UnreachableHttpClient({}),
+        )
+
+        self.assertFalse(await provider.warm_up(timeout_seconds=3))
+
+
+
+class ResultsArrayParserTests(unittest.TestCase):
+    def test_extracts_items_across_arbitrary_chunk_boundaries(self) -> None:
+        body = json.dumps(
+            {
+                "search_id": "abc",
+                "other": [{"title": "not a result"}],
+                "results": [
+                    {"title": 'Quote " and brace } inside', "excerpts": ["a", "b"]},
+                    {"title": "Zürich café ☕", "meta": {"nested": [1, {"x": 2}]}},
+                ],
+                "usage": [{"name": "sku", "count": 1}],
+            },
+            ensure_ascii=False,
+        ).encode("utf-8")
+
+        for size in (1, 2, 3, 7, len(body)):
+            parser = _ResultsArrayParser()
+            items = []
+            for chunk in split_every(body, size):
+                items.extend(parser.feed(chunk))
+
+            self.assertEqual(
+                [item["title"] for item in items],
+                ['Quote " and brace } inside', "Zürich café ☕"],
+            )
+            self.assertTrue(parser.finished_results)
+
+    def test_reports_missing_results_array(self) -> None:
+        parser = _ResultsArrayParser()
+
+        parser.feed(b'{"unexpected": []}')
+
+        self.assertFalse(parser.finished_results)
+
+
+class StreamingSearchTests(unittest.IsolatedAsyncioTestCase):
+    async def test_streams_partial_results_to_progress_callback(self) -> None:
+        body = json.dumps(
+            {
+                "results": [
+                    {"title": "First", "url": "https://example.com/1", "excerpts": ["a"]},
+                    {"title": "Second", "url": "https://example.com/2", "excerpts": ["b"]},
+                ]
+            }
+        ).encode("utf-8")
+        first_item_end = body.index(b"}") + 1
+        http_client = StreamingHttpClient([body[:first_item_end], body[first_item_end:]])
+        provider = ParallelSearchProvider(
+            SearchProviderConfig(api_key="parallel-key"),
+            http_client=http_client,
+        )
+        progress: list[list[str]] = []
+
+        async def on_progress(results: list[SearchResult]) -> None:
+            progress.append([result.title for result in results])
+
+        results = await provider.search(
+            query="streaming",
+            max_results=5,
+            timeout_seconds=8,
+            on_progress=on_progress,
+        )
+
+        self.assertEqual([result.title for result in results], ["First", "Second"])
+        self.assertEqual(progress, [["First"], ["First", "Second"]])
+        self.assertEqual(
+            http_client.calls[0]["args"],
+            ("POST", "https://api.parallel.ai/v1/search"),
+        )
+
+    async def test_streamed_http_errors_raise_provider_error(self) -> None:
+        provider = ExaSearchProvider(
+            SearchProviderConfig(api_key="exa-key"),
+            http_client=StreamingHttpClient([b"{}"], status_code=503),
+        )
+
+        async def on_progress(results: list[SearchResult]) -> None:
+            return None
+
+        with self.assertRaisesRegex(ValueError, "exa search failed with HTTP 503"):
+            await provider.search(
+                query="streaming",
+                max_results=5,
+                timeout_seconds=8,
+                on_progress=on_progress,
+            )
+
+    async def test_streamed_malformed_body_raises_provider_error(self) -> None:
+        provider = PerplexitySearchProvider(
+            SearchProviderConfig(api_key="perplexity-key"),
+            http_client=StreamingHttpClient([b'{"unexpected": []}']),
+        )
+
+        async def on_progress(results: list[SearchResult]) -> None:
+            return None
+
+        with self.assertRaisesRegex(ValueError, "perplexity returned malformed data"):
+            await provider.search(
+                query="streaming",
+                max_results=5,
+                timeout_seconds=8,
+                on_progress=on_progress,
+            )
+
+
+class HedgedSearchProviderTests(unittest.IsolatedAsyncioTestCase):
+    async def search(self, provider: HedgedSearchProvider) -> list[SearchResult]:
+        return await provider.search(
+            query="latest Next.js version",
+            max_results=5,
+            timeout_seconds=8,
+        )
+
+    async def test_fast_primary_answers_without_hedging(self) -> None:
+        primary = ScriptedProvider("parallel")
+        backup = ScriptedProvider("exa")
+        provider = HedgedSearchProvider(
+            [primary, backup],
+            hedge_delay_seconds=0.05,
+            budget=SearchCostBudget(1),
+        )
+
+        results = await self.search(provider)
+
+        self.assertEqual(results[0].provider, "parallel")
+        self.assertEqual(backup.started, 0)
+        self.assertAlmostEqual(provider.budget.spent_usd, 0.001)
+
+    async def test_slow_primary_is_hedged_and_cancelled(self) -> None:
+        primary = ScriptedProvider("parallel", delay=5)
+        backup = ScriptedProvider("exa")
+        provider = HedgedSearchProvider(
+            [primary, backup],
+            hedge_delay_seconds=0.01,
+            budget=SearchCostBudget(1),
+        )
+
+        results = await self.search(provider)
+
+        self.assertEqual(results[0].provider, "exa")
+        self.assertTrue(primary.cancelled)
+
+    async def test_budget_prevents_hedging_slow_primary(self) -> None:
+        primary = ScriptedProvider("parallel", delay=0.05)
+        backup = ScriptedProvider("exa")
+        provider = HedgedSearchProvider(
+            [primary, backup],
+            hedge_delay_seconds=0.01,
+            budget=SearchCostBudget(0.005),
+        )
+
+        results = await self.search(provider)
+
+        self.assertEqual(results[0].provider, "parallel")
+        self.assertEqual(backup.started, 0)
+
+    async def test_failed_primary_falls_through_to_next_provider(self) -> None:
+        provider = HedgedSearchProvider(
+            [
+                ScriptedProvider("parallel", error=ValueError("parallel down")),
+                ScriptedProvider("exa", error=ValueError("exa down")),
+                ScriptedProvider("perplexity"),
+            ],
+            hedge_delay_seconds=10,
+            budget=SearchCostBudget(1),
+        )
+
+        results = await self.search(provider)
+
+        self.assertEqual(results[0].provider, "perplexity")
+
+    async def test_failed_primary_does_not_fall_through_past_budget(self) -> None:
+        backup = ScriptedProvider("exa")
+        provider = HedgedSearchProvider(
+            [ScriptedProvider("parallel", error=ValueError("parallel down")), backup],
+            hedge_delay_seconds=10,
+            budget=SearchCostBudget(0.005),
+        )
+
+        with self.assertRaisesRegex(ValueError, "parallel down"):
+            await self.search(provider)
+
+        self.assertEqual(backup.started, 0)
+        self.assertAlmostEqual(provider.budget.spent_usd, 0.001)
+
+    async def test_exhausted_budget_starts_no_provider(self) -> None:
+        primary = ScriptedProvider("parallel")
+        provider = HedgedSearchProvider(
+            [primary],
+            hedge_delay_seconds=10,
+            budget=SearchCostBudget(0),
+        )
+
+        with self.assertRaisesRegex(ValueError, "budget is exhausted"):
+            await self.search(provider)
+
+        self.assertEqual(primary.started, 0)
+        self.assertEqual(provider.budget.spent_usd, 0)
+
+    async def test_raises_last_error_when_every_provider_fails(self) -> None:
+        provider = HedgedSearchProvider(
+            [
+                ScriptedProvider("parallel", error=ValueError("parallel down")),
+                ScriptedProvider("exa", error=ValueError("exa down")),
+            ],
+            hedge_delay_seconds=10,
+            budget=SearchCostBudget(1),
+        )
+
+        with self.assertRaisesRegex(ValueError, "exa down"):
+            await self.search(provider)
+
+
+
+class FailoverSearchProviderTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.health = ProviderHealthRegistry(
+            CircuitBreakerSettings(failure_threshold=1, reset_seconds=60)
+        )
+
+    def wrap(self, provider: ScriptedProvider) -> CircuitBreakerSearchProvider:
+        return CircuitBreakerSearchProvider(provider, self.health.get(provider.name))
+
+    async def search(self, provider: FailoverSearchProvider) -> list[SearchResult]:
+        return await provider.search(
+            query="weather today",
+            max_results=5,
+            timeout_seconds=8,
+        )
+
+    async def test_fails_over_and_then_skips_open_circuit(self) -> None:
+        primary = ScriptedProvider("parallel", error=TimeoutError("timed out"))
+        backup = ScriptedProvider("exa")
+        provider = FailoverSearchProvider([self.wrap(primary), self.wrap(backup)])
+
+        first = await self.search(provider)
+        second = await self.search(provider)
+
+        self.assertEqual(first[0].provider, "exa")
+        self.assertEqual(second[0].provider, "exa")
+        self.assertEqual(primary.started, 1)
+        self.assertEqual(self.health.get("parallel").state, "open")
+
+    async def test_raises_when_every_circuit_is_open(self) -> None:
+        primary = ScriptedProvider("parallel", error=TimeoutError("timed out"))
+        provider = FailoverSearchProvider([self.wrap(primary)])
+
+        with self.assertRaisesRegex(TimeoutError, "timed out"):
+            await self.search(provider)
+        with self.assertRaisesRegex(ValueError, "circuit is open"):
+            await self.search(provider)
+
+    async def test_cancelled_search_does_not_count_as_failure(self) -> None:
+        primary = ScriptedProvider("parallel", delay=5)
+        wrapped = self.wrap(primary)
+        task = asyncio.create_task(
+            wrapped.search(query="q", max_results=5, timeout_seconds=8)
+        )
+        await asyncio.sleep(0)
+
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        self.assertEqual(wrapped.health.failures, 0)
+        self.assertEqual(wrapped.health.state, "closed")
+
+    async def test_hedged_search_skips_open_circuits(self) -> None:
+        self.health.get("parallel").record_failure(8_000)
+        primary = ScriptedProvider("parallel")
+        backup = ScriptedProvider("exa")
+        provider = HedgedSearchProvider(
+            [self.wrap(primary), self.wrap(backup)],
+            hedge_delay_seconds=10,
+            budget=SearchCostBudget(1),
+        )
+
+        results = await provider.search(
+            query="weather today",
+            max_results=5,
+            timeout_seconds=8,
+        )
+
+        self.assertEqual(results[0].provider, "exa")
+        self.assertEqual(primary.started, 0)
+
+
+
+class FixedRandom(random.Random):
+    def __init__(self, value: float) -> None:
+        super().__init__(0)
+        self.value = value
+
+    def random(self) -> float:
+        return self.value
+
+
+class AdaptiveSearchProviderTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.health = ProviderHealthRegistry(
+            CircuitBreakerSettings(failure_threshold=3, reset_seconds=60)
+        )
+        self.providers = [
+            CircuitBreakerSearchProvider(
+                ScriptedProvider(name),
+                self.health.get(name),
+            )
+            for name in ("parallel", "exa", "perplexity")
+        ]
+
+    def make_router(self, rng_value: float = 1.0) -> AdaptiveSearchProvider:
+        return AdaptiveSearchProvider(
+            self.providers,
+            exploration_rate=0.1,
+            cost_weight_ms_per_cent=100,
+            rng=FixedRandom(rng_value),
+        )
+
+    def test_routes_to_fastest_provider_after_cost_and_errors(self) -> None:
+        self.health.get("parallel").record_success(900)
+        self.health.get("exa").record_success(300)
+        self.health.get("perplexity").record_success(250)
+        self.health.get("perplexity").record_failure(250)
+
+        order = [provider.name for provider in self.make_router().ordered_providers()]
+
+        # exa: 300 + 0.7c * 100 = 370; perplexity: 250 / 0.8 + 50 = 362.5.
+        self.assertEqual(order, ["perplexity", "exa", "parallel"])
+
+    def test_unsampled_providers_are_tried_first(self) -> None:
+        self.health.get("parallel").record_success(100)
+
+        order = [provider.name for provider in self.make_router().ordered_providers()]
+
+        self.assertEqual(order[-1], "parallel")
+
+    def test_exploration_promotes_a_non_best_provider(self) -> None:
+        for name, latency in (("parallel", 100), ("exa", 400), ("perplexity", 500)):
+            self.health.get(name).record_success(latency)
+
+        order = [
+            provider.name
+            for provider in self.make_router(rng_value=0.0).ordered_providers()
+        ]
+
+        self.assertNotEqual(order[0], "parallel")
+        self.assertEqual(sorted(order), ["exa", "parallel", "perplexity"])
+
+    async def test_live_searches_feed_routing_stats(self) -> None:
+        router = self.make_router()
+
+        await router.search(query="weather today", max_results=5, timeout_seconds=8)
+
+        self.assertEqual(self.health.get("parallel").successes, 1)
+        self.assertIsNotNone(self.health.get("parallel").latency_ewma_ms)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -31,6 +31,48 @@ describe("createToolCallStatusRpcHandler", () => {
     ]);
   });
 
+  it("dispatches partial sources while the search is still running", async () => {
+    const actions: ToolCallStatusAction[] = [];
+    const handler = createToolCallStatusRpcHandler((action) => {
+      actions.push(action);
+    });
+
+    const response = await handler({
+      payload: JSON.stringify({
+        provider: "parallel",
+        sources: [
+          {
+            description: "Argentina beat England 2-1.",
+            provider: "parallel",
+            published_at: null,
+            title: "Argentina beats England",
+            url: "https://example.com/argentina-england",
+          },
+        ],
+        state: "running",
+        summary: "Find today's match result",
+      }),
+    });
+
+    expect(response).toBe("ok");
+    expect(actions).toEqual([
+      {
+        provider: "parallel",
+        sources: [
+          {
+            description: "Argentina beat England 2-1.",
+            provider: "parallel",
+            publishedAt: undefined,
+            title: "Argentina beats England",
+            url: "https://example.com/argentina-england",
+          },
+        ],
+        summary: "Find today's match result",
+        type: "progress",
+      },
+    ]);
+  });
+
   it("dispatches completion from agent RPC payload", async () => {
     const dispatch = vi.fn();
     const handler = createToolCallStatusRpcHandler(dispatch);
@@ -171,6 +213,75 @@ describe("createToolCallStatusRpcHandler", () => {
     expect(dispatch).not.toHaveBeenCalled();
   });
 
+  it("reassembles chunked status payloads received out of order", async () => {
+    const actions: ToolCallStatusAction[] = [];
+    const handler = createToolCallStatusRpcHandler((action) => {
+      actions.push(action);
+    });
+    const payload = JSON.stringify({
+      provider: "parallel",
+      state: "completed",
+      summary: "検索 🔎 ".repeat(40),
+    });
+    const third = Math.ceil(payload.length / 3);
+    const chunks = [0, 1, 2].map((index) =>
+      JSON.stringify({
+        chunk_count: 3,
+        chunk_id: "status-1",
+        chunk_index: index,
+        data: payload.slice(index * third, (index + 1) * third),
+      }),
+    );
+
+    expect(await handler({ payload: chunks[2]! })).toBe("ok");
+    expect(await handler({ payload: chunks[0]! })).toBe("ok");
+    expect(actions).toEqual([]);
+    expect(await handler({ payload: chunks[1]! })).toBe("ok");
+
+    expect(actions).toEqual([
+      {
+        provider: "parallel",
+        sources: undefined,
+        summary: "検索 🔎 ".repeat(40),
+        type: "completed",
+      },
+    ]);
+  });
+
+  it("rejects chunks with an out of range index", async () => {
+    const dispatch = vi.fn();
+    const handler = createToolCallStatusRpcHandler(dispatch);
+
+    const response = await handler({
+      payload: JSON.stringify({
+        chunk_count: 2,
+        chunk_id: "status-1",
+        chunk_index: 2,
+        data: "{}",
+      }),
+    });
+
+    expect(response).toBe("invalid");
+    expect(dispatch).not.toHaveBeenCalled();
+  });
+
+  it("rejects chunk sets larger than the agent sends", async () => {
+    const dispatch = vi.fn();
+    const handler = createToolCallStatusRpcHandler(dispatch);
+
+    const response = await handler({
+      payload: JSON.stringify({
+        chunk_count: 65,
+        chunk_id: "status-1",
+        chunk_index: 0,
+        data: "{}",
+      }),
+    });
+
+    expect(response).toBe("invalid");
+    expect(dispatch).not.toHaveBeenCalled();
+  });
+
   it("rejects invalid JSON without throwing", async () => {
     const dispatch = vi.fn();
     const handler = createToolCallStatusRpcHandler(dispatch);
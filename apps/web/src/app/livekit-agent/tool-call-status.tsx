@@ -20,6 +20,12 @@ export type ToolCallStatusAction =
       summary: string;
       type: "started";
     }
+  | {
+      provider: ToolCallStatus["provider"];
+      sources: ToolCallSource[];
+      summary: string;
+      type: "progress";
+    }
   | {
       provider: ToolCallStatus["provider"];
       sources?: ToolCallSource[];
@@ -39,8 +45,21 @@ type ToolCallStatusRpcRequest = {
   payload: string;
 };
 
+type ToolCallStatusChunk = {
+  chunk_count: number;
+  chunk_id: string;
+  chunk_index: number;
+  data: string;
+};
+
+// Oversized statuses arrive as several chunk messages sent concurrently.
+// Keep only a few partial payloads so a lost chunk cannot grow the buffer.
+const MAX_PENDING_STATUS_CHUNK_SETS = 4;
+// Must match MAX_STATUS_RPC_CHUNKS in apps/agent/src/agent_web_search.py.
+const MAX_STATUS_CHUNKS = 64;
+
 export function toolCallStatusReducer(
-  _status: ToolCallStatus | null,
+  status: ToolCallStatus | null,
   action: ToolCallStatusAction,
 ): ToolCallStatus | null {
   switch (action.type) {
@@ -51,6 +70,14 @@ export function toolCallStatusReducer(
         state: "running",
         summary: action.summary,
       };
+    case "progress":
+      return {
+        provider: action.provider,
+        sources: action.sources,
+        startedAt: status?.state === "running" ? status.startedAt : Date.now(),
+        state: "running",
+        summary: action.summary,
+      };
     case "failed":
       return {
         error: action.error,
@@ -136,9 +163,21 @@ export function ToolCallStatusPanel({
 export function createToolCallStatusRpcHandler(
   dispatch: (action: ToolCallStatusAction) => void,
 ) {
+  const pendingChunks = new Map<string, string[]>();
+
   return async ({ payload }: ToolCallStatusRpcRequest) => {
     try {
-      const parsed = JSON.parse(payload) as {
+      let message: unknown = JSON.parse(payload);
+
+      if (isToolCallStatusChunk(message)) {
+        const assembled = collectToolCallStatusChunk(pendingChunks, message);
+        if (assembled === undefined) {
+          return "ok";
+        }
+        message = JSON.parse(assembled);
+      }
+
+      const parsed = message as {
         error?: unknown;
         provider?: unknown;
         sources?: unknown;
@@ -169,6 +208,17 @@ export function createToolCallStatusRpcHandler(
         typeof parsed.provider === "string" &&
         typeof parsed.summary === "string"
       ) {
+        const sources = parseToolCallSources(parsed.sources);
+        if (sources?.length) {
+          dispatch({
+            provider: parsed.provider,
+            sources,
+            summary: parsed.summary,
+            type: "progress",
+          });
+          return "ok";
+        }
+
         dispatch({
           provider: parsed.provider,
           summary: parsed.summary,
@@ -199,6 +249,56 @@ export function createToolCallStatusRpcHandler(
   };
 }
 
+function isToolCallStatusChunk(value: unknown): value is ToolCallStatusChunk {
+  if (!value || typeof value !== "object") {
+    return false;
+  }
+
+  const chunk = value as Partial<ToolCallStatusChunk>;
+  return (
+    typeof chunk.chunk_id === "string" &&
+    typeof chunk.data === "string" &&
+    Number.isInteger(chunk.chunk_count) &&
+    Number.isInteger(chunk.chunk_index)
+  );
+}
+
+function collectToolCallStatusChunk(
+  pendingChunks: Map<string, string[]>,
+  chunk: ToolCallStatusChunk,
+): string | undefined {
+  if (
+    chunk.chunk_count < 1 ||
+    chunk.chunk_count > MAX_STATUS_CHUNKS ||
+    chunk.chunk_index < 0 ||
+    chunk.chunk_index >= chunk.chunk_count
+  ) {
+    throw new Error("invalid tool status chunk");
+  }
+
+  let parts = pendingChunks.get(chunk.chunk_id);
+  if (!parts) {
+    if (pendingChunks.size >= MAX_PENDING_STATUS_CHUNK_SETS) {
+      const oldest = pendingChunks.keys().next().value;
+      if (oldest !== undefined) {
+        pendingChunks.delete(oldest);
+      }
+    }
+    parts = new Array<string>(chunk.chunk_count);
+    pendingChunks.set(chunk.chunk_id, parts);
+  }
+  parts[chunk.chunk_index] = chunk.data;
+
+  for (let index = 0; index < chunk.chunk_count; index += 1) {
+    if (parts[index] === undefined) {
+      return undefined;
+    }
+  }
+
+  pendingChunks.delete(chunk.chunk_id);
+  return parts.join("");
+}
+
 function parseToolCallSources(value: unknown): ToolCallSource[] | null {
   if (!Array.isArray(value)) {
     return null;